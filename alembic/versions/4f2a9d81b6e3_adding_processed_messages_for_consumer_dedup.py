@@ -0,0 +1,34 @@
+"""adding processed_messages for consumer redelivery dedup
+
+Revision ID: 4f2a9d81b6e3
+Revises: cc0eeb3669c5
+Create Date: 2026-10-17 14:37:05.118254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9d81b6e3'
+down_revision: Union[str, None] = 'cc0eeb3669c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('processed_messages',
+    sa.Column('idempotency_key', sa.String(length=200), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('idempotency_key')
+    )
+    op.create_index('ix_processed_messages_processed_at', 'processed_messages', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_processed_messages_processed_at', table_name='processed_messages')
+    op.drop_table('processed_messages')
@@ -0,0 +1,63 @@
+"""adding indexes and unique constraints for teams and members lookups
+
+Revision ID: cc0eeb3669c5
+Revises: 7326178919a0
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'cc0eeb3669c5'
+down_revision: Union[str, None] = '7326178919a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TEAMS = sa.table('teams', sa.column('campus_code'), sa.column('name'), sa.column('abbreviation'))
+
+
+def duplicate_teams(column_name: str) -> list[str]:
+    """Valores de (campus_code, column_name) repetidos em teams, já formatados para a mensagem de erro."""
+    column = TEAMS.c[column_name]
+    duplicates = op.get_bind().execute(
+        sa.select(TEAMS.c.campus_code, column, sa.func.count())
+        .group_by(TEAMS.c.campus_code, column)
+        .having(sa.func.count() > 1)
+        .order_by(TEAMS.c.campus_code, column)
+    ).all()
+    return [f"campus_code={campus_code!r}, {column_name}={value!r} ({count} equipes)"
+            for campus_code, value, count in duplicates]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Equipes repetidas fariam a criação das constraints únicas falhar sem dizer quais são. Elas têm
+    # membros e solicitações associadas, então a migração para antes de qualquer alteração e a
+    # correção fica a cargo de quem opera o banco. team_members não precisa da verificação:
+    # (team_id, user_id) já é a chave primária.
+    duplicates = duplicate_teams('name') + duplicate_teams('abbreviation')
+    if duplicates:
+        raise RuntimeError(
+            f"Não é possível criar as constraints únicas de teams: há {len(duplicates)} valor(es) repetido(s) "
+            f"por campus. Renomeie as equipes repetidas (fechadas também contam) e rode a migração de novo. "
+            f"Repetidos: {'; '.join(duplicates[:20])}"
+        )
+
+    op.create_unique_constraint('uq_teams_campus_code_name', 'teams', ['campus_code', 'name'])
+    op.create_unique_constraint('uq_teams_campus_code_abbreviation', 'teams', ['campus_code', 'abbreviation'])
+    op.create_index('ix_teams_campus_code_created_at_id', 'teams', ['campus_code', 'created_at', 'id'], unique=False)
+    op.create_index('ix_teams_campus_code_status_created_at_id', 'teams', ['campus_code', 'status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_team_members_user_id', 'team_members', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_team_members_user_id', table_name='team_members')
+    op.drop_index('ix_teams_campus_code_status_created_at_id', table_name='teams')
+    op.drop_index('ix_teams_campus_code_created_at_id', table_name='teams')
+    op.drop_constraint('uq_teams_campus_code_abbreviation', 'teams', type_='unique')
+    op.drop_constraint('uq_teams_campus_code_name', 'teams', type_='unique')
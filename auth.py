@@ -4,11 +4,21 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from typing import List, Optional
 
+import hashlib
 import os
+import time
+
+from shared.cache import TTLCache
 
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
 ALGORITHM = "HS256"
 
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_MAX_SIZE', '10000'))
+TOKEN_CACHE_MAX_TTL = float(os.environ.get('AUTH_TOKEN_CACHE_MAX_TTL', '300'))
+
+# sha256(token) -> dados do usuário já verificados. Compartilhado pelas duas dependências.
+verified_token_cache = TTLCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_MAX_TTL)
+
 class OptionalHTTPBearer(HTTPBearer):
     async def __call__(self, request: Request) -> Optional[HTTPAuthorizationCredentials]:
         authorization: str = request.headers.get("Authorization")
@@ -20,28 +30,68 @@ optional_security = OptionalHTTPBearer()
 
 security = HTTPBearer()
 
-def get_current_user(
+
+def decode_token(token: str) -> tuple[Optional[dict], Optional[float]]:
+    """
+    Verifica o JWT e monta os dados do usuário.
+    Retorna (usuário, exp) ou (None, None) se faltarem claims obrigatórias.
+    Lança JWTError se o token for inválido ou estiver expirado.
+    """
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    user_matricula: str = payload.get("matricula")
+    campus: str = payload.get("campus")
+    groups: List[str] = payload.get("groups")
+
+    if user_matricula is None or campus is None:
+        return None, None
+
+    user = {
+        "user_matricula": user_matricula,
+        "campus": campus,
+        "groups": groups,
+        "access_token": token
+    }
+
+    return user, payload.get("exp")
+
+
+def get_verified_user(token: str) -> Optional[dict]:
+    """
+    Versão com cache de decode_token. A entrada nunca vive além do `exp` do token
+    nem de TOKEN_CACHE_MAX_TTL. Tokens inválidos ou incompletos não são cacheados.
+    """
+    cache_key = hashlib.sha256(token.encode()).digest()
+
+    user = verified_token_cache.get(cache_key)
+    if user is not None:
+        return dict(user)
+
+    user, expires_at = decode_token(token)
+    if user is None:
+        return None
+
+    ttl = TOKEN_CACHE_MAX_TTL
+    if expires_at is not None:
+        ttl = min(ttl, float(expires_at) - time.time())
+    verified_token_cache.set(cache_key, user, ttl=ttl)
+
+    return dict(user)
+
+
+async def get_current_user(
         credentials: HTTPAuthorizationCredentials = Depends(security)
     ):
 
     token = credentials.credentials
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-        user_matricula: str = payload.get("matricula")
-        campus: str = payload.get("campus")
-        groups: List[str] = payload.get("groups")
+        user = get_verified_user(token)
 
-        if user_matricula is None or campus is None:
+        if user is None:
             raise ValueError("Dados incompletos no token")
 
-        return {
-            "user_matricula": user_matricula,
-            "campus": campus,
-            "groups": groups,
-            "access_token": token
-        }
+        return user
 
     except JWTError:
         raise HTTPException(
@@ -58,21 +108,7 @@ async def get_current_user_optional(
 
     token = credentials.credentials
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-        user_matricula: str = payload.get("matricula")
-        campus: str = payload.get("campus")
-        groups: List[str] = payload.get("groups")
-
-        if user_matricula is None or campus is None:
-            return None
-
-        return {
-            "user_matricula": user_matricula,
-            "campus": campus,
-            "groups": groups,
-            "access_token": token
-        }
+        return get_verified_user(token)
 
     except JWTError:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,81 @@
+"""
+Microbenchmark do custo de autenticação por requisição.
+
+Compara, para o mesmo bearer token, a verificação completa (jwt.decode + montagem
+do usuário, como antes) com a dependência get_current_user usando o cache de tokens
+verificados. Também mede a dependência resolvida pelo FastAPI em uma rota mínima,
+para incluir o custo do despacho.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.auth_overhead --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+import auth
+
+
+def build_token() -> str:
+    claims = {
+        "matricula": "20231012030011",
+        "campus": "BENCH",
+        "groups": ["Jogador"],
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(claims, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+
+def per_call_us(elapsed: float, iterations: int) -> float:
+    return round(elapsed / iterations * 1_000_000, 3)
+
+
+async def run_benchmark(iterations: int) -> dict:
+    token = build_token()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        auth.decode_token(token)
+    uncached = time.perf_counter() - started
+
+    auth.verified_token_cache.clear()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await auth.get_current_user(credentials)
+    cached = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "uncached_decode_us_per_call": per_call_us(uncached, iterations),
+        "cached_dependency_us_per_call": per_call_us(cached, iterations),
+        "speedup": round(uncached / cached, 2) if cached else None,
+        "cache": auth.verified_token_cache.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", help="Arquivo JSON para salvar o resultado")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.iterations))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
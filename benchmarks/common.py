@@ -0,0 +1,92 @@
+import os
+import statistics
+import string
+import tempfile
+import uuid
+
+from jose import jwt
+
+ABBREVIATION_ALPHABET = string.digits + string.ascii_uppercase
+CAMPUS_CODE = "BENCH"
+
+
+def configure_environment(database_name: str) -> None:
+    """
+    Aponta o serviço para um SQLite temporário e define a chave JWT dos benchmarks,
+    sem sobrescrever o que já estiver no ambiente. Precisa ser chamada antes de
+    importar shared.database, que lê SQLALCHEMY_DATABASE_URL na importação.
+    """
+    os.environ.setdefault(
+        "SQLALCHEMY_DATABASE_URL",
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), database_name)}"
+    )
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict:
+    """
+    Resume uma lista de latências (em segundos) em milissegundos.
+    """
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def abbreviation_for(index: int) -> str:
+    """
+    Gera uma abreviação única de 3 caracteres (base 36) para o índice informado,
+    respeitando a constraint de abreviação única por campus.
+    """
+    chars = []
+    for _ in range(3):
+        index, remainder = divmod(index, len(ABBREVIATION_ALPHABET))
+        chars.append(ABBREVIATION_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def seed_database(teams: int, members_per_team: int) -> list[tuple[uuid.UUID, list[str]]]:
+    """
+    Recria o schema e semeia N equipes ativas no campus dos benchmarks, cada uma com
+    `members_per_team` membros. Retorna o ID e as matrículas dos membros de cada equipe.
+    """
+    from shared.database import Base, engine, SessionLocal
+    from teams.models import Team, TeamMember
+    from teams.models.teams import TeamStatusEnum
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    seeded = []
+    with SessionLocal() as db:
+        for i in range(teams):
+            team_id = uuid.uuid4()
+            member_ids = [f"{i:06d}{j:02d}" for j in range(members_per_team)]
+            db.add(Team(
+                id=team_id,
+                name=f"Equipe {i}",
+                abbreviation=abbreviation_for(i),
+                campus_code=CAMPUS_CODE,
+                status=TeamStatusEnum.active,
+                members=[TeamMember(user_id=member_id) for member_id in member_ids]
+            ))
+            seeded.append((team_id, member_ids))
+        db.commit()
+
+    return seeded
+
+
+def build_token(user_id: str, groups: list[str]) -> str:
+    claims = {"matricula": user_id, "campus": CAMPUS_CODE, "groups": groups}
+    return jwt.encode(claims, os.environ["JWT_SECRET_KEY"], algorithm="HS256")
@@ -0,0 +1,97 @@
+"""
+Benchmark de throughput com requisições concorrentes.
+
+Dispara requisições concorrentes contra a listagem de equipes enquanto mede,
+em paralelo, a latência do endpoint /health. Como tudo roda no mesmo event
+loop (transporte ASGI do httpx), qualquer chamada bloqueante ao banco dentro
+de uma rota aparece como aumento de latência do /health.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.concurrent_requests --teams 500 --requests 400 --concurrency 50
+
+Para comparar antes/depois, rode o mesmo comando nos dois commits e compare
+o JSON impresso (ou salvo com --output).
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.common import CAMPUS_CODE, configure_environment, seed_database, summarize
+
+configure_environment("teams_service_concurrent_bench.db")
+
+import httpx
+
+
+async def run_benchmark(total_requests: int, concurrency: int) -> dict:
+    from main import app
+    from shared.database import async_engine
+
+    transport = httpx.ASGITransport(app=app)
+    list_latencies: list[float] = []
+    health_latencies: list[float] = []
+    loop_lags: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def list_teams():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE})
+                list_latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        async def probe_health():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - started)
+
+                sleep_started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                loop_lags.append(max(0.0, time.perf_counter() - sleep_started - 0.005))
+
+        probe = asyncio.create_task(probe_health())
+        started = time.perf_counter()
+        await asyncio.gather(*(list_teams() for _ in range(total_requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    await async_engine.dispose()
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 2),
+        "list_teams": summarize(list_latencies),
+        "health_during_load": summarize(health_latencies),
+        "event_loop_lag": summarize(loop_lags),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--members-per-team", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="Arquivo JSON para salvar o resultado")
+    args = parser.parse_args()
+
+    seed_database(args.teams, args.members_per_team)
+    result = asyncio.run(run_benchmark(args.requests, args.concurrency))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
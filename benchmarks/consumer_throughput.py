@@ -0,0 +1,245 @@
+"""
+Benchmark de throughput do consumidor, sem RabbitMQ.
+
+Gera uma mistura configurável de mensagens approve_team, delete_team, add_team_member e
+remove_team_member sobre equipes semeadas no banco e as entrega, por um broker em
+memória que respeita o prefetch, ao mesmo handler usado em produção:
+messaging.consumers.on_message atrás do TeamPartitionedDispatcher (modo single) ou o
+BatchingConsumer (modo batch), chegando a services.crud. Retentativas, DLQ e auditoria
+publicam no PublisherStandIn.
+
+Reporta mensagens por segundo, latência do handler por tipo (da entrega ao ack) e
+consultas SQL por mensagem (por tipo no modo single, em que cada mensagem é uma unidade).
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.consumer_throughput --messages 2000 --concurrency 10
+    python -m benchmarks.consumer_throughput --mode batch --batch-size 100 --output consumer.json
+    python -m benchmarks.consumer_throughput --mix approve_team=0,add_team_member=1
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import random
+import sys
+import uuid
+
+from benchmarks.common import CAMPUS_CODE, abbreviation_for, configure_environment, summarize
+
+configure_environment("teams_service_consumer_bench.db")
+
+from sqlalchemy import event
+
+from benchmarks.stand_ins import InMemoryBroker, InMemoryIncomingMessage, PublisherStandIn
+from messaging import consumers
+from messaging.audit_publisher import audit_pipeline
+from messaging.publishers import publisher
+from shared.database import Base, engine, SessionLocal
+from shared.metrics import QueryStats, current_query_stats
+from teams.models import Team, TeamMember
+from teams.models.teams import TeamStatusEnum
+
+DEFAULT_MIX = "approve_team=1,delete_team=1,add_team_member=2,remove_team_member=2"
+ROUTING_KEY_BY_TYPE = {
+    "approve_team": consumers.TEAM_CREATION_REQUEST_ROUTING_KEY,
+    "delete_team": consumers.TEAM_DELETION_REQUEST_ROUTING_KEY,
+    "add_team_member": consumers.MEMBER_ADD_REQUEST_ROUTING_KEY,
+    "remove_team_member": consumers.MEMBER_DELETION_REQUEST_ROUTING_KEY,
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        request_type, _, weight = item.partition("=")
+        request_type = request_type.strip()
+        if request_type not in ROUTING_KEY_BY_TYPE:
+            raise ValueError(f"Tipo de mensagem desconhecido: {request_type}")
+        mix[request_type] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("A mistura precisa ter ao menos um peso positivo")
+    return mix
+
+
+def split_counts(total: int, mix: dict[str, float]) -> dict[str, int]:
+    weight_sum = sum(mix.values())
+    counts = {request_type: int(total * weight / weight_sum) for request_type, weight in mix.items()}
+    # O resto da divisão vai para o tipo de maior peso.
+    counts[max(mix, key=mix.get)] += total - sum(counts.values())
+    return counts
+
+
+def seed_and_build_messages(counts: dict[str, int], member_teams: int, seed: int) -> list[InMemoryIncomingMessage]:
+    """
+    Semeia equipes suficientes para que toda mensagem seja válida (cada approve/delete tem
+    a sua equipe; add/remove se espalham por `member_teams` equipes ativas) e monta as
+    mensagens em ordem aleatória.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    member_teams = max(1, member_teams)
+    removable_per_team = math.ceil(counts.get("remove_team_member", 0) / member_teams)
+    payloads: list[tuple[str, dict]] = []
+    team_index = 0
+
+    def new_team(status: TeamStatusEnum, member_ids: list[str]) -> Team:
+        nonlocal team_index
+        team = Team(
+            id=uuid.uuid4(),
+            name=f"Equipe {team_index}",
+            abbreviation=abbreviation_for(team_index),
+            campus_code=CAMPUS_CODE,
+            status=status,
+            members=[TeamMember(user_id=member_id) for member_id in member_ids]
+        )
+        team_index += 1
+        return team
+
+    def payload(team: Team, request_type: str, user_id: str | None = None) -> dict:
+        data = {"team_id": str(team.id), "campus_code": CAMPUS_CODE, "request_type": request_type,
+                "status": "approved"}
+        if user_id is not None:
+            data["user_id"] = user_id
+        return data
+
+    with SessionLocal() as db:
+        for _ in range(counts.get("approve_team", 0)):
+            team = new_team(TeamStatusEnum.pendent, [])
+            db.add(team)
+            payloads.append(("approve_team", payload(team, "approve_team")))
+
+        for _ in range(counts.get("delete_team", 0)):
+            team = new_team(TeamStatusEnum.active, [])
+            db.add(team)
+            payloads.append(("delete_team", payload(team, "delete_team")))
+
+        pool = []
+        for i in range(member_teams):
+            team = new_team(TeamStatusEnum.active, [f"seed-{i}-{j}" for j in range(removable_per_team)])
+            db.add(team)
+            pool.append(team)
+
+        for i in range(counts.get("add_team_member", 0)):
+            payloads.append(("add_team_member", payload(pool[i % len(pool)], "add_team_member", f"added-{i}")))
+
+        for i in range(counts.get("remove_team_member", 0)):
+            team_position, member_position = i % len(pool), i // len(pool)
+            payloads.append(("remove_team_member", payload(
+                pool[team_position], "remove_team_member", f"seed-{team_position}-{member_position}"
+            )))
+
+        db.commit()
+
+    random.Random(seed).shuffle(payloads)
+    return [
+        InMemoryIncomingMessage(json.dumps(data).encode(), ROUTING_KEY_BY_TYPE[request_type], kind=request_type)
+        for request_type, data in payloads
+    ]
+
+
+async def run_benchmark(args, messages: list[InMemoryIncomingMessage]) -> dict:
+    publisher_stand_in = PublisherStandIn(latency=args.publish_latency_ms / 1000)
+    publisher_stand_in.install(publisher)
+    await audit_pipeline.start()
+
+    statements = 0
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def count_statements(*_):
+        nonlocal statements
+        statements += 1
+
+    stats_by_message: dict[int, QueryStats] = {}
+
+    def message_context(message: InMemoryIncomingMessage) -> contextvars.Context:
+        # Cada entrega roda em um contexto próprio; asyncio.to_thread o propaga até o CRUD.
+        context = contextvars.copy_context()
+        stats = stats_by_message[id(message)] = QueryStats()
+        context.run(current_query_stats.set, stats)
+        return context
+
+    batching_consumer = None
+    if args.mode == "batch":
+        batching_consumer = consumers.BatchingConsumer(args.batch_size, args.batch_window_ms / 1000)
+        handler = batching_consumer.on_message
+    else:
+        handler = consumers.TeamPartitionedDispatcher(consumers.on_message, args.concurrency).on_message
+
+    broker = InMemoryBroker(args.prefetch, context_factory=message_context if args.mode == "single" else None)
+    elapsed = await broker.deliver_all(messages, handler)
+
+    if batching_consumer is not None:
+        await batching_consumer.close()
+    await audit_pipeline.stop()
+    event.remove(engine, "after_cursor_execute", count_statements)
+
+    by_type = {}
+    for request_type in ROUTING_KEY_BY_TYPE:
+        of_type = [message for message in messages if message.kind == request_type]
+        if not of_type:
+            continue
+        by_type[request_type] = {
+            "messages": len(of_type),
+            "handler_latency": summarize([message.settled_at - message.delivered_at for message in of_type]),
+            "db_statements_per_message": (
+                round(sum(stats_by_message[id(message)].count for message in of_type) / len(of_type), 2)
+                if args.mode == "single" else None
+            ),
+        }
+
+    return {
+        "mode": args.mode,
+        "messages": len(messages),
+        "concurrency": args.concurrency if args.mode == "single" else None,
+        "batch_size": args.batch_size if args.mode == "batch" else None,
+        "prefetch": args.prefetch,
+        "database": engine.dialect.name,
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_second": round(len(messages) / elapsed, 2) if elapsed else None,
+        "db_statements_per_message": round(statements / len(messages), 2) if messages else 0,
+        "acked": sum(1 for message in messages if message.outcome == "ack"),
+        "published_by_exchange": publisher_stand_in.by_exchange,
+        "audit_pipeline": audit_pipeline.stats(),
+        "by_type": by_type,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Pesos por tipo de mensagem (tipo=peso,...)")
+    parser.add_argument("--mode", choices=("single", "batch"), default="single")
+    parser.add_argument("--concurrency", type=int, default=consumers.CONSUMER_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-window-ms", type=float, default=consumers.CONSUMER_BATCH_WINDOW * 1000)
+    parser.add_argument("--prefetch", type=int, default=None,
+                        help="Mensagens não confirmadas em voo (padrão: CONSUMER_PREFETCH_COUNT, ou o tamanho do lote)")
+    parser.add_argument("--member-teams", type=int, default=100,
+                        help="Equipes ativas sobre as quais as mensagens de membros se distribuem")
+    parser.add_argument("--publish-latency-ms", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON para salvar o resultado")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.prefetch is None:
+        args.prefetch = max(consumers.CONSUMER_PREFETCH_COUNT, args.batch_size if args.mode == "batch" else 0)
+
+    messages = seed_and_build_messages(split_counts(args.messages, mix), args.member_teams, args.seed)
+    result = asyncio.run(run_benchmark(args, messages))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
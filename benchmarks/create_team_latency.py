@@ -0,0 +1,109 @@
+"""
+Benchmark de latência do POST /api/v1/teams/ com stand-ins locais para authapi e
+competitionsapi, cada um com atraso injetado.
+
+Com as verificações em sequência, a latência fica próxima da soma dos atrasos; com
+as verificações concorrentes, fica próxima do maior deles. A publicação no broker é
+substituída por uma função vazia.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.create_team_latency --auth-latency-ms 80 --competitions-latency-ms 120
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+from benchmarks.common import abbreviation_for, build_token, configure_environment, seed_database, summarize
+
+configure_environment("teams_service_create_bench.db")
+
+import httpx
+
+from benchmarks.stand_ins import AuthServiceStandIn, CompetitionsServiceStandIn
+from services.http_clients import downstream_clients, AUTH_SERVICE, COMPETITIONS_SERVICE
+
+
+async def noop_publish(*args, **kwargs):
+    return None
+
+
+async def run_benchmark(requests: int, auth_latency: float, competitions_latency: float,
+                        auth_invalid_ratio: float) -> dict:
+    import teams.routers.teams_router as teams_router
+    from main import app
+    from shared.database import async_engine
+
+    teams_router.publish_team_creation_requested = noop_publish
+
+    auth_stand_in = AuthServiceStandIn(latency=auth_latency, invalid_ids={"invalid-member"})
+    competitions_stand_in = CompetitionsServiceStandIn(latency=competitions_latency)
+    downstream_clients.set_transport(AUTH_SERVICE, auth_stand_in.transport())
+    downstream_clients.set_transport(COMPETITIONS_SERVICE, competitions_stand_in.transport())
+    await downstream_clients.close()
+
+    headers = {"Authorization": f"Bearer {build_token('bench-organizer', ['Organizador'])}"}
+    latencies: dict[int, list[float]] = {}
+    invalid_every = int(1 / auth_invalid_ratio) if auth_invalid_ratio else 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for index in range(requests):
+            members = [f"member-{index}-{j}" for j in range(3)]
+            if invalid_every and index % invalid_every == 0:
+                members.append("invalid-member")
+
+            payload = {
+                "name": f"Equipe bench {index}",
+                "abbreviation": abbreviation_for(index),
+                "competition_id": str(uuid.uuid4()),
+                "members": members,
+            }
+
+            started = time.perf_counter()
+            response = await client.post("/api/v1/teams/", json=payload, headers=headers)
+            latencies.setdefault(response.status_code, []).append(time.perf_counter() - started)
+
+    await downstream_clients.close()
+    await async_engine.dispose()
+
+    return {
+        "requests": requests,
+        "auth_latency_ms": auth_latency * 1000,
+        "competitions_latency_ms": competitions_latency * 1000,
+        "sum_of_latencies_ms": (auth_latency + competitions_latency) * 1000,
+        "competitions_calls_cancelled": competitions_stand_in.cancelled,
+        "by_status": {str(status_code): summarize(samples) for status_code, samples in latencies.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--auth-latency-ms", type=float, default=80)
+    parser.add_argument("--competitions-latency-ms", type=float, default=120)
+    parser.add_argument("--auth-invalid-ratio", type=float, default=0.0,
+                        help="Fração das requisições com um membro inválido (testa o cancelamento)")
+    parser.add_argument("--output", help="Arquivo JSON para salvar o resultado")
+    args = parser.parse_args()
+
+    # Recria o schema sem equipes: seed_database importa os modelos antes do drop/create.
+    seed_database(0, 0)
+
+    result = asyncio.run(run_benchmark(
+        args.requests,
+        args.auth_latency_ms / 1000,
+        args.competitions_latency_ms / 1000,
+        args.auth_invalid_ratio
+    ))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Suíte de carga ponta a ponta das rotas da API.
+
+Roda main.app em processo (transporte ASGI do httpx) contra o banco configurado em
+SQLALCHEMY_DATABASE_URL (Postgres local) ou, se ausente, um SQLite temporário. O
+authapi e o competitionsapi são substituídos por stand-ins com latência e taxa de
+erro configuráveis, e a publicação no RabbitMQ por um stand-in sem broker.
+
+Cenários: list, detail, create, add_member e remove_member. Para cada um são
+reportados throughput, p50/p95/p99 e a contagem por status HTTP.
+
+No SQLite as escritas são serializadas por um lock do arquivo: com concorrência alta o
+cenário create passa a registrar 500 ("database is locked") e latências de segundos.
+Para números de escrita representativos, use o Postgres.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.load_suite --requests 500 --concurrency 50 --output results/HEAD.json
+    python -m benchmarks.load_suite --scenarios list,detail --compare results/HEAD~1.json
+
+Para comparar commits, salve o resultado de cada um com --output e passe o arquivo
+anterior em --compare: as variações de throughput e percentis são impressas no stderr.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+
+from benchmarks.common import (
+    CAMPUS_CODE, abbreviation_for, build_token, configure_environment, seed_database, summarize
+)
+
+configure_environment("teams_service_load_bench.db")
+
+import httpx
+
+from benchmarks.stand_ins import AuthServiceStandIn, CompetitionsServiceStandIn, PublisherStandIn
+from services.http_clients import downstream_clients, AUTH_SERVICE, COMPETITIONS_SERVICE
+from shared.database import engine
+
+SCENARIOS = ("list", "detail", "create", "add_member", "remove_member")
+# Quantas equipes recebem requisições de detalhe/membros (cada uma com o token do seu primeiro membro).
+HOT_TEAMS = 200
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_scenarios(seeded: list[tuple[uuid.UUID, list[str]]]) -> dict:
+    """Cada cenário é uma função (client, índice) -> resposta."""
+    hot_teams = [
+        (team_id, member_ids, {"Authorization": f"Bearer {build_token(member_ids[0], ['Jogador'])}"})
+        for team_id, member_ids in seeded[:HOT_TEAMS]
+    ]
+    organizer_headers = {"Authorization": f"Bearer {build_token('bench-organizer', ['Organizador'])}"}
+    # O aquecimento e a medição reusam os mesmos índices: as abreviações novas vêm de um
+    # contador próprio para não colidir com UNIQUE(campus_code, abbreviation).
+    new_team_numbers = itertools.count(len(seeded))
+
+    async def list_teams(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        return await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE})
+
+    async def team_detail(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        team_id, _, headers = hot_teams[index % len(hot_teams)]
+        return await client.get(f"/api/v1/teams/{team_id}", headers=headers)
+
+    async def create_team(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        team_number = next(new_team_numbers)
+        payload = {
+            "name": f"Equipe carga {team_number}",
+            "abbreviation": abbreviation_for(team_number),
+            "competition_id": str(uuid.uuid4()),
+            "members": [f"new-{index}-{j}" for j in range(3)],
+        }
+        return await client.post("/api/v1/teams/", json=payload, headers=organizer_headers)
+
+    async def add_member(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        team_id, _, headers = hot_teams[index % len(hot_teams)]
+        return await client.post(f"/api/v1/teams/{team_id}/members/", json={"user_id": f"add-{index}"},
+                                 headers=headers)
+
+    async def remove_member(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        team_id, member_ids, headers = hot_teams[index % len(hot_teams)]
+        return await client.request("DELETE", f"/api/v1/teams/{team_id}/members/{member_ids[-1]}",
+                                    json={"reason": "benchmark"}, headers=headers)
+
+    return {
+        "list": list_teams,
+        "detail": team_detail,
+        "create": create_team,
+        "add_member": add_member,
+        "remove_member": remove_member,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await scenario(client, index)
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "statuses": statuses,
+        **summarize(latencies),
+    }
+
+
+async def run_benchmark(args, seeded: list[tuple[uuid.UUID, list[str]]]) -> dict:
+    from main import app
+    from messaging.publishers import publisher
+    from shared.database import async_engine
+
+    auth_stand_in = AuthServiceStandIn(latency=args.auth_latency_ms / 1000, error_rate=args.auth_error_rate,
+                                       seed=args.seed)
+    competitions_stand_in = CompetitionsServiceStandIn(latency=args.competitions_latency_ms / 1000,
+                                                       error_rate=args.competitions_error_rate, seed=args.seed)
+    publisher_stand_in = PublisherStandIn(latency=args.publish_latency_ms / 1000)
+
+    downstream_clients.set_transport(AUTH_SERVICE, auth_stand_in.transport())
+    downstream_clients.set_transport(COMPETITIONS_SERVICE, competitions_stand_in.transport())
+    await downstream_clients.close()
+    publisher_stand_in.install(publisher)
+
+    scenarios = build_scenarios(seeded)
+    results = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name in args.scenarios:
+            # Aquecimento: popula caches, pools e o cache de tokens antes de medir.
+            await run_scenario(client, scenarios[name], min(args.warmup, args.requests), args.concurrency)
+            results[name] = await run_scenario(client, scenarios[name], args.requests, args.concurrency)
+
+    await downstream_clients.close()
+    await async_engine.dispose()
+
+    return {
+        "metadata": {
+            "git_revision": git_revision(),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "teams": args.teams,
+            "members_per_team": args.members_per_team,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "auth_latency_ms": args.auth_latency_ms,
+            "auth_error_rate": args.auth_error_rate,
+            "competitions_latency_ms": args.competitions_latency_ms,
+            "competitions_error_rate": args.competitions_error_rate,
+            "publish_latency_ms": args.publish_latency_ms,
+            "messages_published": publisher_stand_in.published,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(result: dict, baseline: dict) -> list[str]:
+    """Variação percentual de cada métrica em relação ao resultado anterior."""
+
+    def delta(current, previous) -> str:
+        if not previous:
+            return "n/a"
+        return f"{(current - previous) / previous * 100:+.1f}%"
+
+    lines = [f"Comparação com {baseline['metadata'].get('git_revision')}:"]
+    for name, current in result["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        lines.append(
+            f"  {name:<14} rps {delta(current['throughput_rps'], previous['throughput_rps']):>8}"
+            f"  p50 {delta(current['p50_ms'], previous['p50_ms']):>8}"
+            f"  p95 {delta(current['p95_ms'], previous['p95_ms']):>8}"
+            f"  p99 {delta(current['p99_ms'], previous['p99_ms']):>8}"
+        )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--members-per-team", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=300, help="Requisições medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=30, help="Requisições de aquecimento por cenário")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--auth-latency-ms", type=float, default=20)
+    parser.add_argument("--auth-error-rate", type=float, default=0.0)
+    parser.add_argument("--competitions-latency-ms", type=float, default=30)
+    parser.add_argument("--competitions-error-rate", type=float, default=0.0)
+    parser.add_argument("--publish-latency-ms", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=42, help="Semente das falhas injetadas nos stand-ins")
+    parser.add_argument("--output", help="Arquivo JSON para salvar o resultado")
+    parser.add_argument("--compare", help="Resultado JSON anterior para comparação")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+    if args.members_per_team < 2:
+        parser.error("--members-per-team deve ser pelo menos 2 (um solicitante e um membro a remover)")
+
+    seeded = seed_database(args.teams, args.members_per_team)
+    result = asyncio.run(run_benchmark(args, seeded))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            print("\n".join(compare(result, json.load(baseline_file))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
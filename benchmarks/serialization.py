@@ -0,0 +1,140 @@
+"""
+Microbenchmark da leitura e serialização de listas de equipes.
+
+Semeia N equipes (padrão: 1k e 10k) com seus membros e mede, para cada estratégia, o
+tempo de leitura do banco e o de serialização da resposta, usando a mesma maquinaria do
+FastAPI (serialize_response com o response_model e a classe de resposta):
+
+- orm_from_attributes: select(Team) + selectinload, validado por TeamListResponse com
+  from_attributes e renderizado pelo JSONResponse (caminho antigo de get_teams_by_campus).
+- orm_jsonable_encoder: os mesmos objetos ORM passados pelo jsonable_encoder, sem
+  response_model (caminho antigo de get_team_by_id e get_team_members_by_team_id).
+- rows_response_model: tuplas (services.team_reads) validadas pelo response_model e
+  renderizadas pelo ORJSONResponse.
+- rows_orjson: as mesmas tuplas renderizadas direto pelo ORJSONResponse, que é o caminho
+  atual das rotas de leitura.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --sizes 1000,10000 --members-per-team 5 --output serialization.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.common import CAMPUS_CODE, configure_environment, seed_database
+
+configure_environment("teams_service_serialization_bench.db")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from services.team_reads import TEAM_COLUMNS, load_teams
+from shared.database import engine, AsyncSessionLocal, async_engine
+from teams.models import Team
+from teams.schemas.teams import TeamListResponse
+
+STRATEGIES = ("orm_from_attributes", "orm_jsonable_encoder", "rows_response_model", "rows_orjson")
+
+list_response_field = create_model_field(name="Response_bench", type_=TeamListResponse, mode="serialization")
+
+
+async def load_orm(db) -> list[Team]:
+    return (await db.execute(
+        select(Team)
+        .options(selectinload(Team.members))
+        .filter(Team.campus_code == CAMPUS_CODE)
+        .order_by(Team.created_at, Team.id)
+    )).scalars().all()
+
+
+async def load_rows(db) -> list[dict]:
+    return await load_teams(
+        db, select(*TEAM_COLUMNS).filter(Team.campus_code == CAMPUS_CODE).order_by(Team.created_at, Team.id)
+    )
+
+
+async def serialize(strategy: str, teams) -> bytes:
+    if strategy == "orm_from_attributes":
+        content = await serialize_response(field=list_response_field,
+                                           response_content={"items": teams, "next_cursor": None})
+        return JSONResponse(content).body
+    if strategy == "orm_jsonable_encoder":
+        return JSONResponse(jsonable_encoder(teams)).body
+    if strategy == "rows_response_model":
+        content = await serialize_response(field=list_response_field,
+                                           response_content={"items": teams, "next_cursor": None})
+        return ORJSONResponse(content).body
+    return ORJSONResponse({"items": teams, "next_cursor": None}).body
+
+
+async def measure(strategy: str, repeat: int) -> dict:
+    load_times, serialize_times = [], []
+    size = 0
+
+    for _ in range(repeat):
+        # Sessão nova a cada rodada: o identity map não pode reaproveitar objetos já carregados.
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            teams = await (load_orm(db) if strategy.startswith("orm_") else load_rows(db))
+            loaded = time.perf_counter()
+            body = await serialize(strategy, teams)
+            serialized = time.perf_counter()
+
+        load_times.append(loaded - started)
+        serialize_times.append(serialized - loaded)
+        size = len(body)
+
+    load_ms = statistics.median(load_times) * 1000
+    serialize_ms = statistics.median(serialize_times) * 1000
+    return {
+        "load_ms": round(load_ms, 2),
+        "serialize_ms": round(serialize_ms, 2),
+        "total_ms": round(load_ms + serialize_ms, 2),
+        "bytes": size,
+    }
+
+
+async def run_benchmark(args) -> dict:
+    results = {}
+    for teams in args.sizes:
+        seed_database(teams, args.members_per_team)
+        results[str(teams)] = {strategy: await measure(strategy, args.repeat) for strategy in STRATEGIES}
+
+    await async_engine.dispose()
+    return {
+        "database": engine.dialect.name,
+        "members_per_team": args.members_per_team,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Quantidades de equipes separadas por vírgula")
+    parser.add_argument("--members-per-team", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas por estratégia (reporta a mediana)")
+    parser.add_argument("--output", help="Arquivo JSON para salvar o resultado")
+    args = parser.parse_args()
+
+    args.sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    result = asyncio.run(run_benchmark(args))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Stand-ins locais (em processo) para os serviços downstream usados pelas rotas:
+authapi (validação de membros) e competitionsapi (verificação de inscrição).
+
+Cada stand-in é um httpx.MockTransport assíncrono com latência e taxa de erro
+configuráveis, instalado via services.http_clients.downstream_clients.set_transport.
+
+Também há stand-ins do lado do RabbitMQ: PublisherStandIn (publicação sem broker) e
+InMemoryBroker (entrega de mensagens ao consumidor respeitando o prefetch).
+"""
+import asyncio
+import contextvars
+import json
+import random
+import time
+import uuid
+
+import httpx
+
+
+class ServiceStandIn:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.cancelled = 0
+        self._random = random.Random(seed)
+
+    def respond(self, request: httpx.Request) -> dict:
+        raise NotImplementedError
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            return httpx.Response(503, json={"detail": "stand-in: erro injetado"})
+
+        return httpx.Response(200, json=self.respond(request))
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+
+class AuthServiceStandIn(ServiceStandIn):
+    """Considera válidos todos os ids, exceto os listados em invalid_ids."""
+
+    def __init__(self, invalid_ids: set[str] | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.invalid_ids = invalid_ids or set()
+
+    def respond(self, request: httpx.Request) -> dict:
+        user_ids = json.loads(request.content).get("user_ids", [])
+        invalid = [user_id for user_id in user_ids if user_id in self.invalid_ids]
+        return {"all_exist": not invalid, "invalid_ids": invalid}
+
+
+class CompetitionsServiceStandIn(ServiceStandIn):
+    """Sempre permite a inscrição; as equipes já inscritas são `team_uuids` (nenhuma, por padrão)."""
+
+    def __init__(self, min_members: int = 1, team_uuids: list | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_members = min_members
+        self.team_uuids = team_uuids or []
+
+    def respond(self, request: httpx.Request) -> dict:
+        return {
+            "can_be_inscribed": True,
+            "message": "stand-in",
+            "data": {"team_uuids": self.team_uuids, "min_members_per_team": self.min_members},
+        }
+
+
+class PublisherStandIn:
+    """
+    Substitui RabbitMQPublisher.publish/publish_many/publish_each: a mensagem é montada normalmente
+    por publish_command, mas a "confirmação do broker" é apenas um atraso configurável.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.published = 0
+        self.by_exchange: dict[str, int] = {}
+
+    async def publish(self, exchange_name: str, routing_key: str, message) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.published += 1
+        self.by_exchange[exchange_name] = self.by_exchange.get(exchange_name, 0) + 1
+
+    async def publish_many(self, exchange_name: str, messages: list) -> int:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.published += len(messages)
+        self.by_exchange[exchange_name] = self.by_exchange.get(exchange_name, 0) + len(messages)
+        return len(messages)
+
+    async def publish_each(self, exchange_name: str, messages: list) -> list[bool]:
+        return [True] * await self.publish_many(exchange_name, messages)
+
+    def install(self, publisher) -> None:
+        publisher.publish = self.publish
+        publisher.publish_many = self.publish_many
+        publisher.publish_each = self.publish_each
+
+
+class InMemoryIncomingMessage:
+    """Subconjunto de aio_pika.IncomingMessage usado pelo consumidor e pela política de retentativa."""
+
+    def __init__(self, body: bytes, routing_key: str, headers: dict | None = None, message_id: str | None = None,
+                 kind: str | None = None):
+        self.body = body
+        self.routing_key = routing_key
+        self.headers = headers or {}
+        self.message_id = message_id or str(uuid.uuid4())
+        self.correlation_id = None
+        self.content_type = "application/json"
+        self.redelivered = False
+        self.kind = kind
+        self.outcome: str | None = None
+        self.delivered_at: float | None = None
+        self.settled_at: float | None = None
+        self._on_settled = None
+
+    def _settle(self, outcome: str) -> None:
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        self.settled_at = time.perf_counter()
+        if self._on_settled is not None:
+            self._on_settled(self)
+
+    async def ack(self, multiple: bool = False) -> None:
+        self._settle("ack")
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        self._settle("nack")
+
+    async def reject(self, requeue: bool = False) -> None:
+        self._settle("reject")
+
+
+class InMemoryBroker:
+    """
+    Entrega as mensagens ao handler como o aio_pika faz (uma task por mensagem), sem
+    ultrapassar prefetch_count mensagens entregues e ainda não confirmadas.
+
+    `context_factory`, se informado, é chamado por mensagem e retorna um
+    contextvars.Context no qual a task do handler é criada (ex.: estatísticas por mensagem).
+    """
+
+    def __init__(self, prefetch_count: int, context_factory=None):
+        self.prefetch_count = prefetch_count
+        self.context_factory = context_factory
+
+    async def deliver_all(self, messages: list[InMemoryIncomingMessage], handler) -> float:
+        """Entrega todas as mensagens e espera até que todas sejam confirmadas. Retorna o tempo total."""
+        slots = asyncio.Semaphore(self.prefetch_count)
+        all_settled = asyncio.Event()
+        pending = len(messages)
+        tasks = set()
+
+        def on_settled(_message):
+            nonlocal pending
+            slots.release()
+            pending -= 1
+            if pending == 0:
+                all_settled.set()
+
+        started = time.perf_counter()
+        for message in messages:
+            await slots.acquire()
+            message._on_settled = on_settled
+            message.delivered_at = time.perf_counter()
+
+            context = self.context_factory(message) if self.context_factory else contextvars.copy_context()
+            task = context.run(asyncio.create_task, handler(message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda done, message=message: self._settle_on_error(done, message))
+
+        if messages:
+            await all_settled.wait()
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _settle_on_error(task: asyncio.Task, message: InMemoryIncomingMessage) -> None:
+        # Handler que levantou exceção sem confirmar: o broker real reentregaria a mensagem.
+        if not task.cancelled() and task.exception() is not None:
+            message._settle("error")
@@ -4,45 +4,75 @@ import asyncio
 
 import uvicorn
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 
+from auth import verified_token_cache
+from messaging.audit_publisher import audit_pipeline
+from messaging.cache_invalidation import team_cache_broadcaster
 from messaging.consumers import main_consumer
+from messaging.dedup import processed_messages
+from messaging.publishers import publisher
+from services.http_clients import downstream_clients
+from services.team_cache import team_cache
+from services.validate_members_http import member_existence_cache
+from shared.database import async_engine
 from shared.exceptions import NotFound, Conflict
 from shared.exceptions_handler import not_found_exception_handler, conflict_exception_handler
+from shared.log import get_logger
+from shared.metrics import registry, MetricsMiddleware, PROMETHEUS_CONTENT_TYPE
 
 from teams.routers import teams_router, team_members_router
 
+logger = get_logger(__name__)
+
 consumer_task = None
 
 
 @asynccontextmanager
 async def lifespan_manager(app: FastAPI):
     global consumer_task
-    print("INFO:     [requests_service] Lifespan: Iniciando consumidor RabbitMQ...")
+    logger.info("Lifespan: Conectando publisher RabbitMQ...")
+    try:
+        await publisher.connect()
+    except Exception as e:
+        logger.warning("Lifespan: Publisher indisponível, nova tentativa será feita na primeira publicação: %s", e)
+
+    await audit_pipeline.start()
+    team_cache_broadcaster.start()
+    downstream_clients.start()
+
+    logger.info("Lifespan: Iniciando consumidor RabbitMQ...")
     try:
         consumer_task = asyncio.create_task(main_consumer())
-        print("INFO:     [requests_service] Lifespan: Tarefa do consumidor RabbitMQ criada e agendada.")
+        logger.info("Lifespan: Tarefa do consumidor RabbitMQ criada e agendada.")
     except Exception as e:
-        print(f"ERRO CRÍTICO: [requests_service] Lifespan: Falha ao iniciar a tarefa do consumidor: {e}")
+        logger.critical("Lifespan: Falha ao iniciar a tarefa do consumidor: %s", e)
 
     yield
 
-    print("INFO:     [requests_service] Lifespan: Finalizando. Solicitando cancelamento da tarefa do consumidor...")
+    logger.info("Lifespan: Finalizando. Solicitando cancelamento da tarefa do consumidor...")
     if consumer_task and not consumer_task.done():
         consumer_task.cancel()
         try:
             await consumer_task
         except asyncio.CancelledError:
-            print("INFO:     [requests_service] Lifespan: Tarefa do consumidor RabbitMQ cancelada com sucesso.")
+            logger.info("Lifespan: Tarefa do consumidor RabbitMQ cancelada com sucesso.")
         except Exception as e:
-            print(f"ERRO: [requests_service] Lifespan: Erro durante o cancelamento da tarefa do consumidor: {e}")
+            logger.error("Lifespan: Erro durante o cancelamento da tarefa do consumidor: %s", e)
     else:
-        print(
-            "INFO:     [requests_service] Lifespan: Tarefa do consumidor não estava ativa ou já havia sido concluída.")
-    print("INFO:     [requests_service] Lifespan: Processo de shutdown concluído.")
+        logger.info("Lifespan: Tarefa do consumidor não estava ativa ou já havia sido concluída.")
+
+    await team_cache_broadcaster.stop()
+    await audit_pipeline.stop()
+    await publisher.close()
+    await downstream_clients.close()
+    await async_engine.dispose()
+    logger.info("Lifespan: Processo de shutdown concluído.")
 
 
-app = FastAPI(lifespan=lifespan_manager)
+app = FastAPI(lifespan=lifespan_manager, default_response_class=ORJSONResponse)
 
 app.include_router(teams_router.router)
 
@@ -51,7 +81,56 @@ app.include_router(team_members_router.router)
 app.add_exception_handler(NotFound, not_found_exception_handler)
 app.add_exception_handler(Conflict, conflict_exception_handler)
 
-@app.get("/health")
+app.add_middleware(MetricsMiddleware)
+
+CACHES = {
+    "auth_member": member_existence_cache,
+    "auth_token": verified_token_cache,
+    "team_detail": team_cache,
+    "consumer_dedup": processed_messages,
+}
+
+registry.gauge_collector(
+    "teams_cache_stat", "Estatísticas dos caches em memória.", ("cache", "stat"),
+    lambda: {
+        (cache_name, stat): value
+        for cache_name, cache in CACHES.items()
+        for stat, value in cache.stats().items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+)
+registry.gauge_collector(
+    "teams_audit_pipeline_stat", "Fila e contadores do pipeline de auditoria.", ("stat",),
+    lambda: {(stat,): value for stat, value in audit_pipeline.stats().items()}
+)
+registry.gauge_collector(
+    "teams_downstream_http_stat", "Requisições e conexões HTTP dos serviços externos.", ("service", "stat"),
+    lambda: {
+        (service, stat): transport_stats[stat]
+        for service, transport_stats in downstream_clients.stats().items()
+        for stat in ("requests", "active", "peak_active", "connections_opened")
+    }
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class HealthResponse(BaseModel):
+    service: str
+    status: str
+    consumer_task_status: str
+    audit_pipeline: dict
+    downstream_http_pools: dict
+    auth_member_cache: dict
+    auth_token_cache: dict
+    team_detail_cache: dict
+    consumer_dedup: dict
+
+
+@app.get("/health", response_model=HealthResponse)
 async def health_check():
     task_status = "não iniciada ou já concluída"
     if consumer_task:
@@ -68,7 +147,13 @@ async def health_check():
     return {
         "service": "requests_service",
         "status": "healthy_api",
-        "consumer_task_status": task_status
+        "consumer_task_status": task_status,
+        "audit_pipeline": audit_pipeline.stats(),
+        "downstream_http_pools": downstream_clients.stats(),
+        "auth_member_cache": member_existence_cache.stats(),
+        "auth_token_cache": verified_token_cache.stats(),
+        "team_detail_cache": team_cache.stats(),
+        "consumer_dedup": processed_messages.stats()
     }
 
 if __name__ == "__main__":
@@ -2,35 +2,20 @@ import asyncio
 import aio_pika
 import json
 import os
+import queue
+import threading
 import uuid
 from datetime import datetime, timezone
 
-RABBITMQ_USER_DEFAULT = "guest"
-RABBITMQ_PASSWORD_DEFAULT = "guest"
-RABBITMQ_HOST_DEFAULT = "rabbitmq"
-RABBITMQ_PORT_DEFAULT = "5672"
-RABBITMQ_VHOST_DEFAULT = "/"
-
-RABBITMQ_URL = os.getenv("RABBITMQ_URL")
-
-if not RABBITMQ_URL:
-    user = os.getenv("RABBITMQ_USER", RABBITMQ_USER_DEFAULT)
-    password = os.getenv("RABBITMQ_PASSWORD", RABBITMQ_PASSWORD_DEFAULT)
-    host = os.getenv("RABBITMQ_HOST", RABBITMQ_HOST_DEFAULT)
-    port = os.getenv("RABBITMQ_PORT", RABBITMQ_PORT_DEFAULT)
-    vhost = os.getenv("RABBITMQ_VHOST", RABBITMQ_VHOST_DEFAULT)
-
-    if not vhost or vhost == "/":
-        vhost_path = ""
-    elif not vhost.startswith("/"):
-        vhost_path = "/" + vhost
-    else:
-        vhost_path = vhost
+from messaging.publishers import publisher, AUDIT_EXCHANGE
+from shared.log import get_logger
+
+logger = get_logger(__name__)
 
-    RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
-else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+AUDIT_QUEUE_MAX_SIZE = int(os.getenv("AUDIT_QUEUE_MAX_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200")) / 1000
+AUDIT_MAX_ATTEMPTS = int(os.getenv("AUDIT_MAX_ATTEMPTS", "3"))
 
 def generate_log_payload(
     event_type: str,
@@ -40,7 +25,7 @@ def generate_log_payload(
     operation_type: str,
     campus_code: str,
     user_registration: str,
-    request_object,
+    request_object=None,
     old_data: dict | None = None,
     new_data: dict | None = None,
 ) -> dict:
@@ -77,66 +62,221 @@ def generate_log_payload(
 
 # --- Função de Publicação com Routing Key Dinâmica ---
 
-AUDIT_EXCHANGE = "events_exchange"
+def build_audit_message(log_payload: dict) -> tuple[str, aio_pika.Message]:
+    """
+    Monta a mensagem de auditoria no formato de tarefa Celery esperado pelo audit_service.
+
+    :return: Tupla (routing_key, mensagem); a routing key é o event_type do log.
+    """
+    # 1. Montar o corpo no formato Celery: (args, kwargs, options)
+    celery_body = (
+        [log_payload],  # args: seu payload vai aqui
+        {},             # kwargs: vazio neste caso
+        {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+    )
+
+    # 2. Definir os cabeçalhos (headers) essenciais do Celery
+    task_id = str(uuid.uuid4())
+    celery_headers = {
+        'lang': 'py',
+        'task': 'process_audit_log', # O nome exato da sua tarefa
+        'id': task_id,
+        'root_id': task_id,
+        'parent_id': None,
+        'group': None,
+    }
+
+    # 3. Criar a mensagem aio_pika com todas as propriedades
+    message = aio_pika.Message(
+        body=json.dumps(celery_body).encode('utf-8'),
+        headers=celery_headers,
+        content_type='application/json',  # Celery usa JSON por padrão
+        content_encoding='utf-8',
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+    )
+
+    return f'{log_payload["event_type"]}', message
+
 
 async def publish_audit_log(log_payload: dict):
     """
-    Publica uma mensagem de log de auditoria no RabbitMQ com uma routing key específica.
+    Publica imediatamente uma mensagem de log de auditoria no RabbitMQ, usando o
+    publisher persistente. Prefira run_async_audit, que enfileira no pipeline em lote.
 
     :param log_payload: Dados de log a serem publicados.
     """
-    connection = None
     try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        routing_key, message = build_audit_message(log_payload)
+        await publisher.publish(AUDIT_EXCHANGE, routing_key, message)
 
-        async with connection:
-            channel = await connection.channel()
+        logger.debug("Log enviado para exchange '%s' com routing key '%s'", AUDIT_EXCHANGE, routing_key,
+                     extra={"event": "audit.published"})
 
-            exchange = await channel.declare_exchange(
-                AUDIT_EXCHANGE,
-                aio_pika.ExchangeType.TOPIC,
-                durable=True
-            )
+    except aio_pika.exceptions.AMQPConnectionError as e:
+        logger.error("Erro de conexão com RabbitMQ: %s", e, extra={"event": "audit.connection_error"})
+    except Exception as e:
+        logger.error("Erro ao publicar mensagem de auditoria: %s", e, extra={"event": "audit.publish_error"})
 
-             # 1. Montar o corpo no formato Celery: (args, kwargs, options)
-            celery_body = (
-                [log_payload],  # args: seu payload vai aqui
-                {},             # kwargs: vazio neste caso
-                {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
-            )
 
-            # 2. Definir os cabeçalhos (headers) essenciais do Celery
-            task_id = str(uuid.uuid4())
-            celery_headers = {
-                'lang': 'py',
-                'task': 'process_audit_log', # O nome exato da sua tarefa
-                'id': task_id,
-                'root_id': task_id,
-                'parent_id': None,
-                'group': None,
-            }
+class AuditPipeline:
+    """
+    Pipeline de auditoria em lote.
+
+    Os logs podem ser enfileirados de qualquer thread (inclusive das threads de trabalho do
+    consumidor) em uma fila thread-safe e limitada. Uma única tarefa em background, no event
+    loop principal, esvazia a fila em lotes e publica pela conexão persistente do publisher.
+    Quando a fila está cheia o log é descartado e contabilizado, sem bloquear quem produziu.
+    Logs não confirmados pelo broker voltam no próximo ciclo, até max_attempts tentativas;
+    depois disso são registrados em ERROR e contabilizados como falha.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        # Logs (payload, tentativas já feitas) a reenviar; só é acessada pelo event loop.
+        self._retry: list[tuple[dict, int]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._counters_lock = threading.Lock()
+        self.enqueued = 0
+        self.published = 0
+        self.dropped = 0
+        self.retried = 0
+        self.failed = 0
+
+    def submit(self, log_payload: dict) -> bool:
+        """
+        Enfileira um log de auditoria. Pode ser chamado de qualquer thread e nunca bloqueia.
+        Retorna False se o log foi descartado por falta de espaço na fila.
+        """
+        try:
+            self._queue.put_nowait(log_payload)
+        except queue.Full:
+            with self._counters_lock:
+                self.dropped += 1
+            return False
+
+        with self._counters_lock:
+            self.enqueued += 1
 
-            # 3. Criar a mensagem aio_pika com todas as propriedades
-            message = aio_pika.Message(
-                body=json.dumps(celery_body).encode('utf-8'),
-                headers=celery_headers,
-                content_type='application/json',  # Celery usa JSON por padrão
-                content_encoding='utf-8',
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        loop = self._loop
+        if loop is not None and self._queue.qsize() >= self.batch_size:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Loop já encerrado: o log segue na fila até o próximo start().
+                pass
+
+        return True
+
+    async def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Interrompe a tarefa de background e publica o que restou na fila."""
+        if self._task is not None:
+            # Sem cancelar: um lote em publicação seria perdido. A tarefa termina o lote atual e sai.
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self._drain()
+        # Cada passada consome uma tentativa dos logs pendentes, então o laço é limitado por max_attempts.
+        while self._retry:
+            await self._drain()
+        self._loop = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self._drain()
+
+    async def _drain(self) -> None:
+        # Os reenvios ficam para o próximo ciclo: com o broker fora, não se tenta de novo em laço.
+        retries, self._retry = self._retry, []
+        while True:
+            batch, retries = retries[:self.batch_size], retries[self.batch_size:]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append((self._queue.get_nowait(), 0))
+                except queue.Empty:
+                    break
+
+            if not batch:
+                return
+
+            await self._publish_batch(batch)
+
+    async def _publish_batch(self, batch: list[tuple[dict, int]]) -> None:
+        try:
+            confirmations = await publisher.publish_each(
+                AUDIT_EXCHANGE,
+                [build_audit_message(log_payload) for log_payload, _ in batch]
             )
+        except Exception as e:
+            confirmations = [False] * len(batch)
+            logger.error("Erro ao publicar lote de auditoria (%d logs): %s", len(batch), e,
+                         extra={"event": "audit.batch_error"})
 
-            routing_key = f'{log_payload["event_type"]}'
+        retried = failed = 0
+        for (log_payload, attempts), confirmed in zip(batch, confirmations):
+            if confirmed:
+                continue
 
-            # A routing_key agora é o parâmetro recebido pela função
-            await exchange.publish(message, routing_key=routing_key)
+            attempts += 1
+            if attempts < self.max_attempts:
+                self._retry.append((log_payload, attempts))
+                retried += 1
+            else:
+                failed += 1
+                logger.error("Log de auditoria descartado após %d tentativas: %s %s %s (correlation_id %s)",
+                             attempts, log_payload.get("event_type"), log_payload.get("entity_type"),
+                             log_payload.get("entity_id"), log_payload.get("correlation_id"),
+                             extra={"event": "audit.dropped"})
 
-            print(f"[audit_service] Log enviado para exchange '{AUDIT_EXCHANGE}' com routing key '{routing_key}'")
-            print(f"[audit_service] Log payload: {log_payload}")
+        with self._counters_lock:
+            self.published += len(batch) - retried - failed
+            self.retried += retried
+            self.failed += failed
+
+    def stats(self) -> dict:
+        with self._counters_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_max_size": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "published": self.published,
+                "dropped": self.dropped,
+                "retried": self.retried,
+                "failed": self.failed,
+            }
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem de auditoria: {e}")
+
+audit_pipeline = AuditPipeline(
+    max_size=AUDIT_QUEUE_MAX_SIZE,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL,
+    max_attempts=AUDIT_MAX_ATTEMPTS
+)
 
 def model_to_dict(model_instance):
     if not model_instance:
@@ -156,7 +296,9 @@ def convert_values(obj):
         return obj
 
 def run_async_audit(log_payload: dict):
-    try:
-        asyncio.ensure_future(publish_audit_log(log_payload))
-    except Exception as e:
-        print(f"CRITICAL: Falha ao publicar log de auditoria! Erro: {e}")
\ No newline at end of file
+    """
+    Enfileira o log no pipeline de auditoria. Seguro para chamar de qualquer thread.
+    """
+    if not audit_pipeline.submit(log_payload):
+        logger.critical("Fila de auditoria cheia, log descartado! Evento: %s", log_payload.get("event_type"),
+                        extra={"event": "audit.dropped"})
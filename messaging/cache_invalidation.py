@@ -0,0 +1,91 @@
+import asyncio
+import json
+import uuid
+
+import aio_pika
+
+from messaging.publishers import publisher, TEAM_CACHE_INVALIDATION_EXCHANGE
+from services.team_cache import team_cache
+from shared.log import get_logger
+
+logger = get_logger(__name__)
+
+# Identifica esta réplica: as próprias mensagens de invalidação são ignoradas,
+# pois o CRUD já removeu as entradas locais antes de publicar.
+INSTANCE_ID = uuid.uuid4().hex
+
+
+class TeamCacheInvalidationBroadcaster:
+    """
+    Propaga as invalidações do cache de equipes para as demais réplicas por um exchange
+    fanout. `broadcast` pode ser chamado de qualquer thread (o CRUD roda nas threads do
+    consumidor): a publicação é agendada no event loop registrado em start().
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._loop = None
+
+    def broadcast(self, keys: list[tuple[str, str]]) -> None:
+        loop = self._loop
+        if loop is None or not keys:
+            return
+
+        try:
+            loop.call_soon_threadsafe(self._schedule, keys)
+        except RuntimeError:
+            # Loop já encerrado: as outras réplicas dependem do TTL.
+            pass
+
+    def _schedule(self, keys: list[tuple[str, str]]) -> None:
+        task = asyncio.create_task(self._publish(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(self, keys: list[tuple[str, str]]) -> None:
+        body = {"origin": INSTANCE_ID, "keys": [[campus_code, str(team_id)] for campus_code, team_id in keys]}
+        message = aio_pika.Message(
+            body=json.dumps(body).encode(),
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.NOT_PERSISTENT
+        )
+        try:
+            await publisher.publish(TEAM_CACHE_INVALIDATION_EXCHANGE, "", message)
+        except Exception as e:
+            logger.warning("Falha ao propagar invalidação do cache de equipes (%d chave(s)): %s", len(keys), e,
+                           extra={"event": "team_cache.broadcast_failed"})
+
+
+async def on_invalidation_message(message: aio_pika.abc.AbstractIncomingMessage) -> None:
+    """Remove do cache local as equipes alteradas em outra réplica."""
+    try:
+        body = json.loads(message.body.decode())
+        if body.get("origin") != INSTANCE_ID:
+            team_cache.invalidate([tuple(key) for key in body.get("keys", [])], source="broadcast")
+    except (ValueError, TypeError) as e:
+        logger.warning("Mensagem de invalidação de cache inválida: %s", e, extra={"event": "team_cache.invalid_message"})
+
+
+async def bind_invalidation_queue(channel: aio_pika.abc.AbstractChannel) -> None:
+    """
+    Declara o exchange fanout e uma fila exclusiva desta réplica ligada a ele.
+    A fila some com a conexão; como invalidações podem ter sido perdidas enquanto a
+    réplica esteve desconectada, o cache local é esvaziado a cada (re)conexão.
+    """
+    exchange = await channel.declare_exchange(TEAM_CACHE_INVALIDATION_EXCHANGE, aio_pika.ExchangeType.FANOUT,
+                                              durable=True)
+    queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(exchange)
+    await queue.consume(on_invalidation_message, no_ack=True)
+    team_cache.clear()
+
+
+team_cache_broadcaster = TeamCacheInvalidationBroadcaster()
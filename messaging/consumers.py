@@ -2,8 +2,18 @@ import asyncio
 import aio_pika
 import json
 import os
+import time
 
-from services.crud import update_team_from_request_in_db
+from messaging.audit_publisher import audit_pipeline
+from messaging.cache_invalidation import bind_invalidation_queue
+from messaging.dedup import processed_messages, idempotency_key_for
+from messaging.publishers import publisher
+from messaging.retry import retry_policy, RetryPolicy
+from services.crud import update_team_from_request_in_db, update_teams_from_requests_in_db
+from shared.log import get_logger
+from shared.metrics import consumer_messages, consumer_handler_duration, profile_sql
+
+logger = get_logger(__name__)
 
 RABBITMQ_USER_DEFAULT = "guest"
 RABBITMQ_PASSWORD_DEFAULT = "guest"
@@ -28,9 +38,9 @@ if not RABBITMQ_URL:
         vhost_path = vhost
 
     RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
+    logger.info("RABBITMQ_URL não estava definida no ambiente. URL montada: %s", RABBITMQ_URL)
 else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+    logger.info("Usando RABBITMQ_URL definida no ambiente: %s", RABBITMQ_URL)
 
 
 REQUESTS_EVENTS_EXCHANGE = "requests_events_exchange"
@@ -47,41 +57,281 @@ MEMBER_DELETION_REQUEST_ROUTING_KEY = "member.remove.update"
 MEMBER_ADD_REQUEST_QUEUE = "teams_service.queue.member_add"
 MEMBER_ADD_REQUEST_ROUTING_KEY = "member.add.update"
 
+QUEUE_BY_ROUTING_KEY = {
+    TEAM_CREATION_REQUEST_ROUTING_KEY: TEAM_CREATION_REQUEST_QUEUE,
+    TEAM_DELETION_REQUEST_ROUTING_KEY: TEAM_DELETION_REQUEST_QUEUE,
+    MEMBER_DELETION_REQUEST_ROUTING_KEY: MEMBER_DELETION_REQUEST_QUEUE,
+    MEMBER_ADD_REQUEST_ROUTING_KEY: MEMBER_ADD_REQUEST_QUEUE,
+}
+
+# Modo em lote: com CONSUMER_BATCH_SIZE > 1 as mensagens são agrupadas (até N mensagens
+# ou CONSUMER_BATCH_WINDOW_MS) e gravadas em uma única transação.
+CONSUMER_BATCH_SIZE = int(os.getenv("CONSUMER_BATCH_SIZE", "1"))
+CONSUMER_BATCH_WINDOW = float(os.getenv("CONSUMER_BATCH_WINDOW_MS", "50")) / 1000
+
+# Fora do modo em lote, mensagens de equipes diferentes são processadas em paralelo
+# (até CONSUMER_CONCURRENCY) e mensagens da mesma equipe, estritamente em ordem.
+CONSUMER_CONCURRENCY = int(os.getenv("CONSUMER_CONCURRENCY", "10"))
+CONSUMER_PREFETCH_COUNT = int(os.getenv("CONSUMER_PREFETCH_COUNT", str(max(10, CONSUMER_BATCH_SIZE))))
+
+
+def queue_of(message: aio_pika.abc.AbstractIncomingMessage) -> str:
+    return RetryPolicy.original_queue_of(message, QUEUE_BY_ROUTING_KEY)
+
 
 async def on_message(message: aio_pika.IncomingMessage) -> None:
-    async with message.process():
-        try:
-            data = json.loads(message.body.decode())
-            print(f" [requests_service] Received message: {data}")
-            print(f" [requests_service] Routing Key: {message.routing_key}")
+    started_at = time.perf_counter()
+    try:
+        with profile_sql(f"consumer:{queue_of(message)}"):
+            await process_message(message)
+    finally:
+        consumer_handler_duration.labels(queue_of(message)).observe(time.perf_counter() - started_at)
 
-            if hasattr(asyncio, 'to_thread'):
-                db_result = await asyncio.to_thread(update_team_from_request_in_db, data)
-            else:
-                loop = asyncio.get_event_loop()
-                db_result = await loop.run_in_executor(None, update_team_from_request_in_db, data)
 
-            print(f" [requests_service] Resultado do processamento do DB: {db_result}")
+async def process_message(message: aio_pika.IncomingMessage) -> None:
+    try:
+        data = json.loads(message.body.decode())
+        logger.debug("Received message: %s (routing key: %s)", data, message.routing_key,
+                     extra={"event": "consumer.message_received"})
+
+        idempotency_key = idempotency_key_for(message, data)
+        if not is_known_duplicate(message, idempotency_key):
+            db_result = await run_in_thread(update_team_from_request_in_db, data, idempotency_key)
+
+            logger.debug("Resultado do processamento do DB: %s", db_result, extra={"event": "consumer.message_processed"})
+
+    except json.JSONDecodeError as e:
+        logger.warning("Erro ao decodificar JSON: %s. Mensagem será enviada para a DLQ.", e,
+                       extra={"event": "consumer.invalid_json"})
+        await handle_failure(message, e)
+        return
+    except Exception as e:
+        logger.warning("Erro ao processar mensagem ou DB: %s", e, extra={"event": "consumer.message_failed"})
+        await handle_failure(message, e)
+        return
+
+    await message.ack()
+    consumer_messages.labels(queue_of(message), "processed").inc()
+
+
+async def handle_failure(message: aio_pika.abc.AbstractIncomingMessage, error: Exception) -> None:
+    """
+    Em vez de rejeitar (e perder ou reprocessar imediatamente) a mensagem, agenda uma
+    nova tentativa com atraso ou a envia para a DLQ, conforme a política de retentativa.
+    """
+    consumer_messages.labels(queue_of(message), "failed").inc()
+    await retry_policy.handle_failure(message, error, QUEUE_BY_ROUTING_KEY)
+
+
+def is_known_duplicate(message: aio_pika.abc.AbstractIncomingMessage, idempotency_key: str | None) -> bool:
+    """
+    Consulta a camada em memória do armazenamento de deduplicação. Duplicatas são
+    confirmadas (ack) sem tocar no banco; a camada persistente é consultada pelo CRUD.
+    """
+    if idempotency_key is not None and processed_messages.seen_recently(idempotency_key):
+        logger.info("Mensagem %s já processada. Confirmando sem reprocessar.", idempotency_key,
+                    extra={"event": "consumer.duplicate_skipped"})
+        consumer_messages.labels(queue_of(message), "duplicate").inc()
+        return True
+    return False
+
+
+async def run_in_thread(func, *args):
+    if hasattr(asyncio, 'to_thread'):
+        return await asyncio.to_thread(func, *args)
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+class TeamPartitionedDispatcher:
+    """
+    Despacha as mensagens particionadas por team_id: cada equipe tem uma fila
+    implícita (uma cadeia de futures) e a mensagem só começa depois que a anterior da
+    mesma equipe terminou. Equipes diferentes rodam em paralelo, limitadas pelo
+    semáforo de concorrência, o que permite aumentar o prefetch sem perder a ordem.
+    """
+
+    def __init__(self, handler, concurrency: int):
+        self.handler = handler
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tails: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def partition_key(message: aio_pika.abc.AbstractIncomingMessage) -> str | None:
+        try:
+            return json.loads(message.body.decode()).get("team_id")
+        except (ValueError, AttributeError):
+            # Mensagem inválida: sem partição, o handler se encarrega de rejeitá-la.
+            return None
+
+    async def on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        key = self.partition_key(message)
+        if key is None:
+            async with self._semaphore:
+                await self.handler(message)
+            return
+
+        # O registro na cadeia acontece antes de qualquer await, preservando a ordem de entrega.
+        previous = self._tails.get(key)
+        done = asyncio.get_running_loop().create_future()
+        self._tails[key] = done
 
-        except json.JSONDecodeError as e:
-            print(f" [requests_service] Erro ao decodificar JSON: {e}. Mensagem será rejeitada.")
-            raise
-        except Exception as e:
-            print(f" [requests_service] Erro inesperado ao processar mensagem ou DB: {e}")
-            raise
+        try:
+            if previous is not None:
+                await asyncio.shield(previous)
+
+            async with self._semaphore:
+                await self.handler(message)
+        finally:
+            if previous is not None and not previous.done():
+                # Cancelada antes de rodar: a próxima da fila continua esperando a anterior.
+                previous.add_done_callback(lambda _: self._release(key, done))
+            else:
+                self._release(key, done)
+
+    def _release(self, key: str, done: asyncio.Future) -> None:
+        if not done.done():
+            done.set_result(None)
+        if self._tails.get(key) is done:
+            del self._tails[key]
+
+    @property
+    def active_partitions(self) -> int:
+        return len(self._tails)
+
+
+class BatchingConsumer:
+    """
+    Agrupa as mensagens recebidas e as processa em lote com
+    update_teams_from_requests_in_db: uma consulta por tabela, um commit e o ack de
+    todas as mensagens do lote.
+
+    Se o lote falhar, as mensagens são reprocessadas uma a uma, para que apenas a
+    mensagem problemática siga para retentativa ou DLQ. Os lotes são processados em ordem de chegada.
+    """
+
+    def __init__(self, max_size: int, max_wait: float):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: list[aio_pika.abc.AbstractIncomingMessage] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        self._pending.append(message)
+
+        if len(self._pending) >= self.max_size:
+            self._schedule_flush()
+        elif self._flush_timer is None:
+            loop = asyncio.get_running_loop()
+            self._flush_timer = loop.call_later(self.max_wait, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: list[aio_pika.abc.AbstractIncomingMessage]) -> None:
+        async with self._flush_lock:
+            decoded = []
+            for message in batch:
+                try:
+                    data = json.loads(message.body.decode())
+                except json.JSONDecodeError as e:
+                    logger.warning("Erro ao decodificar JSON: %s. Mensagem será enviada para a DLQ.", e,
+                                   extra={"event": "consumer.invalid_json"})
+                    await handle_failure(message, e)
+                    continue
+
+                idempotency_key = idempotency_key_for(message, data)
+                if is_known_duplicate(message, idempotency_key):
+                    await message.ack()
+                    continue
+
+                decoded.append((message, data, idempotency_key))
+
+            if not decoded:
+                return
+
+            logger.debug("Processando lote de %d mensagem(ns)", len(decoded), extra={"event": "consumer.batch_started"})
+
+            started_at = time.perf_counter()
+            try:
+                with profile_sql(f"consumer:batch({len(decoded)})"):
+                    db_results = await run_in_thread(
+                        update_teams_from_requests_in_db,
+                        [data for _, data, _ in decoded],
+                        [idempotency_key for _, _, idempotency_key in decoded]
+                    )
+            except Exception as e:
+                logger.warning("Falha no lote (%s). Reprocessando mensagens individualmente.", e,
+                               extra={"event": "consumer.batch_failed"})
+                await self._process_one_by_one(decoded)
+                return
+
+            consumer_handler_duration.labels("batch").observe(time.perf_counter() - started_at)
+
+            for message, _, _ in decoded:
+                await message.ack()
+                consumer_messages.labels(queue_of(message), "processed").inc()
+
+            logger.debug("Lote confirmado: %d mensagem(ns) processada(s).", len(db_results),
+                         extra={"event": "consumer.batch_committed"})
+
+    async def _process_one_by_one(self, decoded: list[tuple[aio_pika.abc.AbstractIncomingMessage, dict, str | None]]) -> None:
+        for message, data, idempotency_key in decoded:
+            try:
+                db_result = await run_in_thread(update_team_from_request_in_db, data, idempotency_key)
+                logger.debug("Resultado do processamento do DB: %s", db_result, extra={"event": "consumer.message_processed"})
+                await message.ack()
+                consumer_messages.labels(queue_of(message), "processed").inc()
+            except Exception as e:
+                logger.warning("Erro ao processar mensagem ou DB: %s", e, extra={"event": "consumer.message_failed"})
+                await handle_failure(message, e)
+
+    async def close(self) -> None:
+        """
+        Cancela o lote em formação (as mensagens não confirmadas serão reentregues
+        pelo broker) e aguarda os lotes que já estão sendo processados.
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._pending = []
+
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
 
 
 async def main_consumer():
     retry_delay = 10
     while True:
         connection = None
+        batching_consumer = None
         try:
-            print(f"INFO: [requests_service] Consumidor: Tentando conectar ao RabbitMQ em {RABBITMQ_URL}...")
+            logger.info("Consumidor: Tentando conectar ao RabbitMQ em %s...", RABBITMQ_URL)
             connection = await aio_pika.connect_robust(RABBITMQ_URL, timeout=15)
 
             async with connection:
                 channel = await connection.channel()
-                await channel.set_qos(prefetch_count=10)
+                await channel.set_qos(prefetch_count=CONSUMER_PREFETCH_COUNT)
+
+                message_handler = TeamPartitionedDispatcher(on_message, CONSUMER_CONCURRENCY).on_message
+                if CONSUMER_BATCH_SIZE > 1:
+                    batching_consumer = BatchingConsumer(CONSUMER_BATCH_SIZE, CONSUMER_BATCH_WINDOW)
+                    message_handler = batching_consumer.on_message
+                    logger.info("Consumidor: modo em lote (%d mensagens / %.0f ms).",
+                                CONSUMER_BATCH_SIZE, CONSUMER_BATCH_WINDOW * 1000)
 
                 exchange = await channel.declare_exchange(
                     REQUESTS_EVENTS_EXCHANGE,
@@ -89,6 +339,12 @@ async def main_consumer():
                     durable=True
                 )
 
+                # Retentativas com atraso e DLQ
+                requeue_exchange = await retry_policy.declare_topology(channel)
+
+                # Invalidação do cache de equipes vinda das outras réplicas
+                await bind_invalidation_queue(channel)
+
 
                 # Fila para criação de equipe
                 team_creation_queue = await channel.declare_queue(
@@ -97,10 +353,12 @@ async def main_consumer():
                 )
 
                 await team_creation_queue.bind(exchange, routing_key=TEAM_CREATION_REQUEST_ROUTING_KEY)
+                await team_creation_queue.bind(requeue_exchange, routing_key=TEAM_CREATION_REQUEST_QUEUE)
 
-                print(f"INFO: [requests_service] Consumidor: Conectado! '{TEAM_CREATION_REQUEST_QUEUE}' esperando por mensagens com routing key '{TEAM_CREATION_REQUEST_ROUTING_KEY}'. Para sair pressione CTRL+C")
+                logger.info("Consumidor: Conectado! '%s' esperando por mensagens com routing key '%s'.",
+                            TEAM_CREATION_REQUEST_QUEUE, TEAM_CREATION_REQUEST_ROUTING_KEY)
 
-                await team_creation_queue.consume(on_message)
+                await team_creation_queue.consume(message_handler)
 
 
                 # Fila para remoção de equipe
@@ -110,10 +368,11 @@ async def main_consumer():
                 )
 
                 await team_deletion_queue.bind(exchange, routing_key=TEAM_DELETION_REQUEST_ROUTING_KEY)
+                await team_deletion_queue.bind(requeue_exchange, routing_key=TEAM_DELETION_REQUEST_QUEUE)
 
-                print(f"INFO: ... '{TEAM_DELETION_REQUEST_QUEUE}' esperando por '{TEAM_DELETION_REQUEST_ROUTING_KEY}'...")
+                logger.info("... '%s' esperando por '%s'...", TEAM_DELETION_REQUEST_QUEUE, TEAM_DELETION_REQUEST_ROUTING_KEY)
 
-                await team_deletion_queue.consume(on_message)
+                await team_deletion_queue.consume(message_handler)
 
 
                 # Fila para remoção de membro
@@ -123,10 +382,11 @@ async def main_consumer():
                 )
 
                 await member_deletion_queue.bind(exchange, routing_key=MEMBER_DELETION_REQUEST_ROUTING_KEY)
+                await member_deletion_queue.bind(requeue_exchange, routing_key=MEMBER_DELETION_REQUEST_QUEUE)
 
-                print(f"INFO: ... '{MEMBER_DELETION_REQUEST_QUEUE}' esperando por '{MEMBER_DELETION_REQUEST_ROUTING_KEY}'...")
+                logger.info("... '%s' esperando por '%s'...", MEMBER_DELETION_REQUEST_QUEUE, MEMBER_DELETION_REQUEST_ROUTING_KEY)
 
-                await member_deletion_queue.consume(on_message)
+                await member_deletion_queue.consume(message_handler)
 
 
                 # Fila para adição de membro
@@ -136,43 +396,57 @@ async def main_consumer():
                 )
 
                 await member_add_queue.bind(exchange, routing_key=MEMBER_ADD_REQUEST_ROUTING_KEY)
+                await member_add_queue.bind(requeue_exchange, routing_key=MEMBER_ADD_REQUEST_QUEUE)
 
-                print(f"INFO: ... '{MEMBER_ADD_REQUEST_QUEUE}' esperando por '{MEMBER_ADD_REQUEST_ROUTING_KEY}'...")
+                logger.info("... '%s' esperando por '%s'...", MEMBER_ADD_REQUEST_QUEUE, MEMBER_ADD_REQUEST_ROUTING_KEY)
 
-                await member_add_queue.consume(on_message)
+                await member_add_queue.consume(message_handler)
 
 
                 await asyncio.Future()
 
         except aio_pika.exceptions.AMQPConnectionError as e:
-            print(
-                f"AVISO: [requests_service] Consumidor: Falha na conexão com RabbitMQ (AMQPConnectionError): {e}. Tentando novamente em {retry_delay} segundos...")
+            logger.warning(
+                "Consumidor: Falha na conexão com RabbitMQ (AMQPConnectionError): %s. Tentando novamente em %d segundos...",
+                e, retry_delay)
         except ConnectionRefusedError as e:
-            print(
-                f"AVISO: [requests_service] Consumidor: Conexão recusada (ConnectionRefusedError): {e}. Provavelmente o RabbitMQ não está totalmente pronto. Tentando novamente em {retry_delay} segundos...")
+            logger.warning(
+                "Consumidor: Conexão recusada (ConnectionRefusedError): %s. Provavelmente o RabbitMQ não está totalmente pronto. Tentando novamente em %d segundos...",
+                e, retry_delay)
         except asyncio.CancelledError:
-            print("INFO: [requests_service] Consumidor: Tarefa cancelada. Encerrando consumidor.")
+            logger.info("Consumidor: Tarefa cancelada. Encerrando consumidor.")
             break
         except Exception as e:
-            print(
-                f"ERRO: [requests_service] Consumidor: Erro inesperado: {e}. Tentando novamente em {retry_delay} segundos...")
+            logger.error("Consumidor: Erro inesperado: %s. Tentando novamente em %d segundos...", e, retry_delay,
+                         exc_info=True)
         finally:
+            if batching_consumer is not None:
+                await batching_consumer.close()
+
             if connection and not connection.is_closed:
-                print("INFO: [requests_service] Consumidor: Fechando conexão RabbitMQ no finally do loop.")
+                logger.info("Consumidor: Fechando conexão RabbitMQ no finally do loop.")
                 await connection.close()
 
             current_task = asyncio.current_task()
             if current_task and current_task.cancelled():
-                print(
-                    "INFO: [requests_service] Consumidor: Saindo do loop de reconexão devido ao cancelamento (detectado no finally).")
+                logger.info("Consumidor: Saindo do loop de reconexão devido ao cancelamento (detectado no finally).")
                 break
 
-        print(f"INFO: [requests_service] Consumidor: Aguardando {retry_delay}s antes da próxima tentativa de conexão.")
+        logger.info("Consumidor: Aguardando %ds antes da próxima tentativa de conexão.", retry_delay)
         await asyncio.sleep(retry_delay)
 
 
+async def run_standalone_consumer():
+    await audit_pipeline.start()
+    try:
+        await main_consumer()
+    finally:
+        await audit_pipeline.stop()
+        await publisher.close()
+
+
 if __name__ == "__main__":
     try:
-        asyncio.run(main_consumer())
+        asyncio.run(run_standalone_consumer())
     except KeyboardInterrupt:
-        print("Programa encerrado.")
\ No newline at end of file
+        logger.info("Programa encerrado.")
\ No newline at end of file
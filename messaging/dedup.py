@@ -0,0 +1,105 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import aio_pika
+from sqlalchemy import select, delete
+
+from messaging.models import ProcessedMessage
+from shared.cache import TTLCache
+
+DEDUP_CACHE_MAX_SIZE = int(os.getenv("CONSUMER_DEDUP_CACHE_MAX_SIZE", "50000"))
+DEDUP_CACHE_TTL = float(os.getenv("CONSUMER_DEDUP_CACHE_TTL", "3600"))
+DEDUP_PERSISTENT = os.getenv("CONSUMER_DEDUP_PERSISTENT", "false").lower() in ("1", "true", "yes")
+DEDUP_RETENTION = timedelta(hours=float(os.getenv("CONSUMER_DEDUP_RETENTION_HOURS", "72")))
+DEDUP_PURGE_INTERVAL = float(os.getenv("CONSUMER_DEDUP_PURGE_INTERVAL", "3600"))
+
+IDEMPOTENCY_KEY_HEADER = "x-idempotency-key"
+
+
+def idempotency_key_for(message: aio_pika.abc.AbstractIncomingMessage, data: dict) -> str | None:
+    """
+    Chave de idempotência da mensagem, na ordem: message_id AMQP, header
+    x-idempotency-key e campo `idempotency_key` do corpo. Sem nenhum deles, retorna
+    None e a mensagem não é deduplicada: o corpo não serve de chave, porque dois eventos
+    legítimos podem ser idênticos (ex.: adicionar, remover e adicionar de novo o mesmo membro).
+    """
+    if message.message_id:
+        return message.message_id
+
+    header_key = (message.headers or {}).get(IDEMPOTENCY_KEY_HEADER)
+    if header_key:
+        return header_key.decode() if isinstance(header_key, bytes) else str(header_key)
+
+    if isinstance(data, dict) and data.get("idempotency_key"):
+        return str(data["idempotency_key"])
+
+    return None
+
+
+class ProcessedMessageStore:
+    """
+    Armazenamento limitado das chaves já processadas pelo consumidor.
+
+    A camada em memória (LRU com TTL) responde sem tocar no banco. A camada
+    persistente opcional (tabela processed_messages) grava a chave na mesma
+    transação que aplica a mensagem e sobrevive a reinícios; linhas mais antigas
+    que a retenção são removidas periodicamente.
+    """
+
+    def __init__(self, max_size: int, ttl: float, persistent: bool, retention: timedelta, purge_interval: float):
+        self.persistent = persistent
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._recent = TTLCache(max_size=max_size, ttl=ttl)
+        self._last_purge = 0.0
+
+    def seen_recently(self, key: str) -> bool:
+        return self._recent.get(key) is not None
+
+    def remember(self, keys) -> None:
+        for key in keys:
+            if key is not None:
+                self._recent.set(key, True)
+
+    def find_persisted(self, db, keys) -> set[str]:
+        """Das chaves informadas, retorna as que já estão na tabela."""
+        known_keys = {key for key in keys if key is not None}
+        if not self.persistent or not known_keys:
+            return set()
+
+        return set(db.scalars(
+            select(ProcessedMessage.idempotency_key).where(ProcessedMessage.idempotency_key.in_(known_keys))
+        ))
+
+    def persist(self, db, keys) -> None:
+        """Adiciona as chaves à sessão; o commit fica com o chamador."""
+        if not self.persistent:
+            return
+
+        for key in {key for key in keys if key is not None}:
+            db.add(ProcessedMessage(idempotency_key=key))
+
+        self._purge_expired(db)
+
+    def _purge_expired(self, db) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval:
+            return
+
+        self._last_purge = now
+        db.execute(
+            delete(ProcessedMessage).where(ProcessedMessage.processed_at < datetime.now(timezone.utc) - self.retention)
+        )
+
+    def stats(self) -> dict:
+        return {"persistent": self.persistent, **self._recent.stats()}
+
+
+processed_messages = ProcessedMessageStore(
+    max_size=DEDUP_CACHE_MAX_SIZE,
+    ttl=DEDUP_CACHE_TTL,
+    persistent=DEDUP_PERSISTENT,
+    retention=DEDUP_RETENTION,
+    purge_interval=DEDUP_PURGE_INTERVAL
+)
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String, DateTime, Index
+
+from shared.database import Base
+
+
+class ProcessedMessage(Base):
+    """
+    Chaves de idempotência das mensagens já aplicadas pelo consumidor
+    (camada persistente do armazenamento de deduplicação).
+    """
+    __tablename__ = "processed_messages"
+    __table_args__ = (
+        Index("ix_processed_messages_processed_at", "processed_at"),
+    )
+
+    idempotency_key: str = Column(String(200), primary_key=True)
+    processed_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
@@ -1,6 +1,17 @@
+import asyncio
 import aio_pika
 import json
 import os
+import time
+import uuid
+
+from aio_pika.pool import Pool
+from pamqp.commands import Basic
+
+from shared.log import get_logger
+from shared.metrics import publish_duration, publish_failures
+
+logger = get_logger(__name__)
 
 RABBITMQ_USER_DEFAULT = "guest"
 RABBITMQ_PASSWORD_DEFAULT = "guest"
@@ -25,164 +36,250 @@ if not RABBITMQ_URL:
         vhost_path = vhost
 
     RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
+    logger.info("RABBITMQ_URL não estava definida no ambiente. URL montada: %s", RABBITMQ_URL)
 else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+    logger.info("Usando RABBITMQ_URL definida no ambiente: %s", RABBITMQ_URL)
 
 
 TEAMS_COMMANDS_EXCHANGE = "teams_commands_exchange"
+AUDIT_EXCHANGE = "events_exchange"
+TEAM_CACHE_INVALIDATION_EXCHANGE = "teams_service.team_cache_invalidation"
 
-async def publish_team_creation_requested(team_data: dict):
+PUBLISHER_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_PUBLISHER_CHANNEL_POOL_SIZE", "10"))
+PUBLISH_CONFIRM_TIMEOUT = float(os.getenv("RABBITMQ_PUBLISH_CONFIRM_TIMEOUT", "5"))
+
+
+class RabbitMQPublisher:
     """
-    Publica uma mensagem indicando que a criação de uma equipe foi solicitada
-    e requer aprovação.
+    Publicador de longa duração: mantém uma única conexão robusta com o RabbitMQ,
+    um pool de canais com publisher confirms e declara a topologia (exchanges) uma
+    única vez por conexão, em vez de abrir uma conexão por mensagem.
     """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                TEAMS_COMMANDS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
+    def __init__(self, url: str, exchanges: dict[str, aio_pika.ExchangeType], pool_size: int):
+        self.url = url
+        self.exchanges = exchanges
+        self.pool_size = pool_size
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._channel_pool: Pool | None = None
+        self._connect_lock = asyncio.Lock()
 
-            message_body = json.dumps(team_data).encode()
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed
 
-            routing_key = "team.creation.requested"
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if self.is_connected:
+                return
 
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
+            self._connection = await aio_pika.connect_robust(self.url, timeout=15)
+            self._channel_pool = Pool(self._create_channel, max_size=self.pool_size)
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
+            async with self._channel_pool.acquire() as channel:
+                for exchange_name, exchange_type in self.exchanges.items():
+                    await channel.declare_exchange(exchange_name, exchange_type, durable=True)
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
+            logger.info("Publisher conectado ao RabbitMQ (pool de %d canais).", self.pool_size,
+                        extra={"event": "publisher.connected"})
 
+    async def _create_channel(self) -> aio_pika.abc.AbstractChannel:
+        return await self._connection.channel(publisher_confirms=True)
 
-async def publish_team_deletion_requested(team_data: dict):
-    """
-        Publica uma mensagem indicando que a remoção de uma equipe foi solicitada
-        e requer aprovação.
+    async def publish(self, exchange_name: str, routing_key: str, message: aio_pika.Message) -> None:
         """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        Publica a mensagem e aguarda a confirmação do broker.
+        Lança exceção se o broker não confirmar (nack) ou se o timeout estourar.
+        """
+        if not self.is_connected:
+            await self.connect()
+
+        started_at = time.perf_counter()
+        try:
+            async with self._channel_pool.acquire() as channel:
+                exchange = await channel.get_exchange(exchange_name, ensure=False)
+                confirmation = await exchange.publish(message, routing_key=routing_key, timeout=PUBLISH_CONFIRM_TIMEOUT)
+
+            if not isinstance(confirmation, Basic.Ack):
+                raise aio_pika.exceptions.DeliveryError(None, confirmation)
+        except Exception:
+            publish_failures.labels(exchange_name, routing_key).inc()
+            raise
+        finally:
+            publish_duration.labels(exchange_name, routing_key).observe(time.perf_counter() - started_at)
+
+    async def publish_many(self, exchange_name: str, messages: list[tuple[str, aio_pika.Message]]) -> int:
+        """
+        Publica um lote de mensagens (routing_key, mensagem) em um único canal, enviando
+        todas antes de aguardar as confirmações, que chegam em pipeline.
+        Retorna a quantidade de mensagens confirmadas pelo broker.
+        """
+        return sum(await self.publish_each(exchange_name, messages))
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                TEAMS_COMMANDS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
+    async def publish_each(self, exchange_name: str, messages: list[tuple[str, aio_pika.Message]]) -> list[bool]:
+        """
+        Como publish_many, mas retorna, na ordem do lote, se cada mensagem foi confirmada
+        pelo broker, para que quem publica possa reenviar apenas as que faltaram.
+        """
+        if not messages:
+            return []
+
+        if not self.is_connected:
+            await self.connect()
+
+        started_at = time.perf_counter()
+        async with self._channel_pool.acquire() as channel:
+            exchange = await channel.get_exchange(exchange_name, ensure=False)
+            confirmations = await asyncio.gather(
+                *(exchange.publish(message, routing_key=routing_key, timeout=PUBLISH_CONFIRM_TIMEOUT)
+                  for routing_key, message in messages),
+                return_exceptions=True
             )
+        elapsed = time.perf_counter() - started_at
 
-            message_body = json.dumps(team_data).encode()
+        # No lote, cada mensagem é confirmada em pipeline: registra-se a latência do lote para cada routing key.
+        for (routing_key, _), confirmation in zip(messages, confirmations):
+            publish_duration.labels(exchange_name, routing_key).observe(elapsed)
+            if not isinstance(confirmation, Basic.Ack):
+                publish_failures.labels(exchange_name, routing_key).inc()
 
-            routing_key = "team.deletion.requested"
+        return [isinstance(confirmation, Basic.Ack) for confirmation in confirmations]
 
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
+    async def close(self) -> None:
+        if self._channel_pool is not None:
+            await self._channel_pool.close()
+            self._channel_pool = None
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
+        if self._connection is not None and not self._connection.is_closed:
+            await self._connection.close()
+        self._connection = None
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
 
+publisher = RabbitMQPublisher(
+    RABBITMQ_URL,
+    exchanges={
+        TEAMS_COMMANDS_EXCHANGE: aio_pika.ExchangeType.DIRECT,
+        AUDIT_EXCHANGE: aio_pika.ExchangeType.TOPIC,
+        TEAM_CACHE_INVALIDATION_EXCHANGE: aio_pika.ExchangeType.FANOUT,
+    },
+    pool_size=PUBLISHER_CHANNEL_POOL_SIZE
+)
 
-async def publish_remove_member_requested(team_data: dict):
+
+async def publish_command(routing_key: str, team_data: dict):
     """
-        Publica uma mensagem indicando que a remoção de um membro foi solicitada
-        e requer aprovação.
+    Publica um comando JSON persistente no exchange de comandos de equipes.
+    Cada comando leva uma chave de idempotência (message_id e campo `idempotency_key`
+    do corpo), que os consumidores usam para descartar reentregas.
+    Erros são apenas registrados, como nas versões anteriores das funções de publicação.
     """
-    connection = None
     try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        team_data = {**team_data, "idempotency_key": team_data.get("idempotency_key") or str(uuid.uuid4())}
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                TEAMS_COMMANDS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
+        message = aio_pika.Message(
+            body=json.dumps(team_data).encode(),
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            message_id=team_data["idempotency_key"]
+        )
 
-            message_body = json.dumps(team_data).encode()
+        await publisher.publish(TEAMS_COMMANDS_EXCHANGE, routing_key, message)
+        logger.debug("Sent '%s':'%s'", routing_key, team_data, extra={"event": "publisher.command_sent"})
 
-            routing_key = "member.removal.requested"
+    except aio_pika.exceptions.AMQPConnectionError as e:
+        logger.error("Erro de conexão com RabbitMQ: %s", e, extra={"event": "publisher.connection_error"})
+    except Exception as e:
+        logger.error("Erro ao publicar mensagem: %s", e, extra={"event": "publisher.publish_error"})
 
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
+async def publish_commands(routing_key: str, commands: list[dict]) -> int:
+    """
+    Publica vários comandos de uma vez (ver publish_command), com as confirmações do
+    broker em pipeline em um único canal. Retorna quantos foram confirmados; erros são
+    apenas registrados.
+    """
+    if not commands:
+        return 0
+
+    messages = []
+    for team_data in commands:
+        team_data = {**team_data, "idempotency_key": team_data.get("idempotency_key") or str(uuid.uuid4())}
+        messages.append((routing_key, aio_pika.Message(
+            body=json.dumps(team_data).encode(),
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            message_id=team_data["idempotency_key"]
+        )))
 
+    try:
+        confirmed = await publisher.publish_many(TEAMS_COMMANDS_EXCHANGE, messages)
     except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
+        logger.error("Erro de conexão com RabbitMQ: %s", e, extra={"event": "publisher.connection_error"})
+        return 0
     except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
+        logger.error("Erro ao publicar mensagens: %s", e, extra={"event": "publisher.publish_error"})
+        return 0
 
+    if confirmed < len(messages):
+        logger.error("Broker confirmou %d de %d mensagens '%s'", confirmed, len(messages), routing_key,
+                     extra={"event": "publisher.publish_error"})
+    else:
+        logger.debug("Sent %d '%s'", confirmed, routing_key, extra={"event": "publisher.commands_sent"})
+    return confirmed
 
-async def publish_add_member_requested(team_data: dict):
+
+async def publish_team_creation_requested(team_data: dict):
     """
-        Publica uma mensagem indicando que a adição de um membro foi solicitada
+    Publica uma mensagem indicando que a criação de uma equipe foi solicitada
+    e requer aprovação.
+    """
+    await publish_command("team.creation.requested", team_data)
+
+
+async def publish_team_creations_requested(teams_data: list[dict]) -> int:
+    """
+    Publica de uma vez as solicitações de criação de várias equipes (cadastro em lote).
+    """
+    return await publish_commands("team.creation.requested", teams_data)
+
+
+async def publish_team_deletion_requested(team_data: dict):
+    """
+        Publica uma mensagem indicando que a remoção de uma equipe foi solicitada
         e requer aprovação.
+        """
+    await publish_command("team.deletion.requested", team_data)
+
+
+async def publish_remove_member_requested(team_data: dict):
     """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        Publica uma mensagem indicando que a remoção de um membro foi solicitada
+        e requer aprovação.
+    """
+    await publish_command("member.removal.requested", team_data)
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                TEAMS_COMMANDS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
 
-            message_body = json.dumps(team_data).encode()
+async def publish_add_member_requested(team_data: dict):
+    """
+        Publica uma mensagem indicando que a adição de um membro foi solicitada
+        e requer aprovação.
+    """
+    await publish_command("member.add.requested", team_data)
 
-            routing_key = "member.add.requested"
 
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
+async def publish_remove_members_requested(members_data: list[dict]) -> int:
+    """
+    Publica de uma vez as solicitações de remoção de vários membros.
+    """
+    return await publish_commands("member.removal.requested", members_data)
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
+async def publish_add_members_requested(members_data: list[dict]) -> int:
+    """
+    Publica de uma vez as solicitações de adição de vários membros.
+    """
+    return await publish_commands("member.add.requested", members_data)
 
 
 if __name__ == "__main__":
-    pass
\ No newline at end of file
+    pass
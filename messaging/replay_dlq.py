@@ -0,0 +1,104 @@
+"""
+Reenvia mensagens da DLQ (teams_service.dlq) para as filas de origem, com limite de
+taxa para não sobrecarregar o consumidor e o banco logo após uma falha.
+
+Cada mensagem volta pelo exchange de reenfileiramento com a routing key do header
+x-original-queue e o contador de tentativas zerado; só é removida da DLQ depois que
+o broker confirma a republicação.
+
+Uso:
+
+    python -m messaging.replay_dlq --rate 20 --limit 500
+    python -m messaging.replay_dlq --queue teams_service.queue.member_add --dry-run
+"""
+import argparse
+import asyncio
+import time
+
+import aio_pika
+from pamqp.commands import Basic
+
+from messaging.publishers import RABBITMQ_URL
+from messaging.retry import (
+    DEAD_LETTER_QUEUE, REQUEUE_EXCHANGE, ATTEMPT_HEADER, ORIGINAL_QUEUE_HEADER, LAST_ERROR_HEADER, RetryPolicy
+)
+
+
+async def replay_dead_letters(rate: float, limit: int | None, only_queue: str | None, dry_run: bool) -> dict:
+    replayed = 0
+    skipped = 0
+    interval = 1 / rate if rate > 0 else 0
+
+    connection = await aio_pika.connect_robust(RABBITMQ_URL, timeout=15)
+    async with connection:
+        channel = await connection.channel(publisher_confirms=True)
+        dead_letter_queue = await channel.declare_queue(DEAD_LETTER_QUEUE, durable=True)
+        requeue_exchange = await channel.get_exchange(REQUEUE_EXCHANGE)
+
+        # Mensagens puladas ficam sem ack até o fim, para não serem lidas de novo nesta execução.
+        held_messages = []
+        next_send_at = time.monotonic()
+
+        try:
+            while limit is None or replayed < limit:
+                message = await dead_letter_queue.get(no_ack=False, fail=False)
+                if message is None:
+                    break
+
+                original_queue = RetryPolicy.original_queue_of(message, {})
+                if (only_queue and original_queue != only_queue) or dry_run:
+                    print(f"{'DRY-RUN' if dry_run else 'SKIP'}: {message.message_id} -> {original_queue} "
+                          f"({(message.headers or {}).get(LAST_ERROR_HEADER)})")
+                    held_messages.append(message)
+                    skipped += 1
+                    continue
+
+                delay = next_send_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_send_at = max(next_send_at, time.monotonic()) + interval
+
+                headers = {
+                    key: value for key, value in (message.headers or {}).items()
+                    if key not in (ATTEMPT_HEADER, LAST_ERROR_HEADER)
+                }
+                headers[ORIGINAL_QUEUE_HEADER] = original_queue
+
+                replay_message = aio_pika.Message(
+                    body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    message_id=message.message_id,
+                    correlation_id=message.correlation_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                )
+                confirmation = await requeue_exchange.publish(replay_message, routing_key=original_queue)
+
+                if not isinstance(confirmation, Basic.Ack):
+                    print(f"ERRO: broker não confirmou a republicação de {message.message_id}. Mantendo na DLQ.")
+                    held_messages.append(message)
+                    break
+
+                await message.ack()
+                replayed += 1
+        finally:
+            for message in held_messages:
+                await message.nack(requeue=True)
+
+    return {"replayed": replayed, "skipped": skipped}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10, help="Mensagens por segundo (0 = sem limite)")
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de mensagens a reenviar")
+    parser.add_argument("--queue", default=None, help="Reenvia apenas mensagens desta fila de origem")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas lista as mensagens, sem reenviar")
+    args = parser.parse_args()
+
+    result = asyncio.run(replay_dead_letters(args.rate, args.limit, args.queue, args.dry_run))
+    print(f"INFO: {result['replayed']} mensagem(ns) reenviada(s), {result['skipped']} mantida(s) na DLQ.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+
+import aio_pika
+
+from messaging.publishers import publisher
+from shared.log import get_logger
+
+logger = get_logger(__name__)
+
+# Atrasos (ms) de cada nível de retentativa; a tentativa N usa o nível N-1 e as
+# tentativas além da lista reutilizam o último nível.
+CONSUMER_RETRY_DELAYS_MS = [
+    int(delay) for delay in os.getenv("CONSUMER_RETRY_DELAYS_MS", "1000,5000,30000,120000").split(",") if delay.strip()
+]
+CONSUMER_MAX_ATTEMPTS = int(os.getenv("CONSUMER_MAX_ATTEMPTS", str(len(CONSUMER_RETRY_DELAYS_MS) + 1)))
+
+RETRY_EXCHANGE_PREFIX = "teams_service.retry"
+REQUEUE_EXCHANGE = "teams_service.requeue"
+DEAD_LETTER_EXCHANGE = "teams_service.dead_letter"
+DEAD_LETTER_QUEUE = "teams_service.dlq"
+
+ATTEMPT_HEADER = "x-attempt"
+ORIGINAL_QUEUE_HEADER = "x-original-queue"
+LAST_ERROR_HEADER = "x-last-error"
+
+# Erros de dados (inclusive JSON inválido) não se resolvem com o tempo: vão direto para a DLQ.
+PERMANENT_ERRORS = (ValueError,)
+
+
+def retry_exchange_name(level: int) -> str:
+    return f"{RETRY_EXCHANGE_PREFIX}.{level + 1}"
+
+
+class RetryPolicy:
+    """
+    Retentativas com atraso crescente e fila de mensagens mortas (DLQ).
+
+    Topologia: cada nível tem um exchange fanout e uma fila de espera com TTL cujo
+    dead-letter exchange é o REQUEUE_EXCHANGE. A mensagem é publicada no nível com a
+    routing key igual ao nome da fila de origem; ao expirar, volta por REQUEUE_EXCHANGE
+    para essa fila. A tentativa atual e a fila de origem ficam nos headers.
+    """
+
+    def __init__(self, delays_ms: list[int], max_attempts: int):
+        self.delays_ms = delays_ms
+        self.max_attempts = max_attempts
+
+    async def declare_topology(self, channel: aio_pika.abc.AbstractChannel) -> aio_pika.abc.AbstractExchange:
+        """
+        Declara exchanges e filas de retentativa e a DLQ. Retorna o REQUEUE_EXCHANGE,
+        ao qual cada fila de trabalho deve ser ligada com routing key igual ao seu nome.
+        """
+        requeue_exchange = await channel.declare_exchange(REQUEUE_EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=True)
+
+        for level, delay_ms in enumerate(self.delays_ms):
+            retry_exchange = await channel.declare_exchange(
+                retry_exchange_name(level),
+                aio_pika.ExchangeType.FANOUT,
+                durable=True
+            )
+            delay_queue = await channel.declare_queue(
+                retry_exchange_name(level),
+                durable=True,
+                arguments={
+                    "x-message-ttl": delay_ms,
+                    "x-dead-letter-exchange": REQUEUE_EXCHANGE,
+                }
+            )
+            await delay_queue.bind(retry_exchange)
+
+        dead_letter_exchange = await channel.declare_exchange(DEAD_LETTER_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True)
+        dead_letter_queue = await channel.declare_queue(DEAD_LETTER_QUEUE, durable=True)
+        await dead_letter_queue.bind(dead_letter_exchange)
+
+        return requeue_exchange
+
+    @staticmethod
+    def attempt_of(message: aio_pika.abc.AbstractIncomingMessage) -> int:
+        try:
+            return int((message.headers or {}).get(ATTEMPT_HEADER, 1))
+        except (TypeError, ValueError):
+            return 1
+
+    @staticmethod
+    def original_queue_of(message: aio_pika.abc.AbstractIncomingMessage, queue_by_routing_key: dict[str, str]) -> str:
+        original_queue = (message.headers or {}).get(ORIGINAL_QUEUE_HEADER)
+        if original_queue:
+            return original_queue.decode() if isinstance(original_queue, bytes) else str(original_queue)
+
+        # Mensagens reenfileiradas chegam com a routing key igual ao nome da fila.
+        return queue_by_routing_key.get(message.routing_key, message.routing_key)
+
+    @staticmethod
+    def copy_message(message: aio_pika.abc.AbstractIncomingMessage, headers: dict) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=message.body,
+            headers={**(message.headers or {}), **headers},
+            content_type=message.content_type,
+            message_id=message.message_id,
+            correlation_id=message.correlation_id,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        )
+
+    async def handle_failure(self, message: aio_pika.abc.AbstractIncomingMessage, error: Exception,
+                             queue_by_routing_key: dict[str, str]) -> None:
+        """
+        Agenda a próxima tentativa ou envia para a DLQ e só então confirma a mensagem
+        original. Se a republicação falhar, a mensagem volta para a fila de origem.
+        """
+        attempt = self.attempt_of(message)
+        original_queue = self.original_queue_of(message, queue_by_routing_key)
+        headers = {ORIGINAL_QUEUE_HEADER: original_queue, LAST_ERROR_HEADER: f"{type(error).__name__}: {error}"[:500]}
+
+        permanent = isinstance(error, PERMANENT_ERRORS)
+
+        try:
+            if permanent or attempt >= self.max_attempts or not self.delays_ms:
+                await publisher.publish(
+                    DEAD_LETTER_EXCHANGE,
+                    original_queue,
+                    self.copy_message(message, {**headers, ATTEMPT_HEADER: attempt})
+                )
+                logger.error("Mensagem enviada para a DLQ após %d tentativa(s): %s", attempt, error,
+                             extra={"event": "consumer.dead_lettered", "original_queue": original_queue})
+            else:
+                level = min(attempt, len(self.delays_ms)) - 1
+                await publisher.publish(
+                    retry_exchange_name(level),
+                    original_queue,
+                    self.copy_message(message, {**headers, ATTEMPT_HEADER: attempt + 1})
+                )
+                logger.warning("Tentativa %d falhou; nova tentativa em %d ms: %s", attempt, self.delays_ms[level], error,
+                               extra={"event": "consumer.retry_scheduled", "original_queue": original_queue})
+        except Exception as e:
+            logger.error("Falha ao agendar retentativa (%s). Devolvendo mensagem à fila.", e,
+                         extra={"event": "consumer.retry_failed"})
+            await message.nack(requeue=True)
+            return
+
+        await message.ack()
+
+
+retry_policy = RetryPolicy(CONSUMER_RETRY_DELAYS_MS, CONSUMER_MAX_ATTEMPTS)
@@ -1,260 +1,597 @@
 import uuid
 
-from shared.dependencies import get_db
+from sqlalchemy import select, insert, update, delete, exists, literal, cast, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from shared.dependencies import get_sync_db
 from teams.models import TeamMember
 from teams.models.teams import Team, TeamStatusEnum
 
-from messaging.audit_publisher import run_async_audit, generate_log_payload, model_to_dict
-
-
-def update_team_from_request_in_db(message_data: dict) -> dict:
-    db_gen = get_db()
-    db = next(db_gen)
+from messaging.audit_publisher import run_async_audit, generate_log_payload
+from messaging.cache_invalidation import team_cache_broadcaster
+from messaging.dedup import processed_messages
+from services.team_cache import team_cache
+from shared.log import get_logger
+
+logger = get_logger(__name__)
+
+TEAMS = Team.__table__
+TEAM_MEMBERS = TeamMember.__table__
+
+INSERT_BY_DIALECT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+MEMBER_REQUEST_TYPES = ("add_team_member", "remove_team_member")
+
+# Mudanças de status: (request_type, status da solicitação) -> (status de origem aceitos, novo status).
+TEAM_STATUS_TRANSITIONS = {
+    ("approve_team", "approved"): ((TeamStatusEnum.pendent,), TeamStatusEnum.active),
+    ("approve_team", "rejected"): ((TeamStatusEnum.pendent,), TeamStatusEnum.closed),
+    ("delete_team", "approved"): ((TeamStatusEnum.pendent, TeamStatusEnum.active), TeamStatusEnum.closed),
+}
+
+# Status em que a equipe precisa estar para cada tipo de solicitação e o erro quando não está.
+REQUIRED_TEAM_STATUS = {
+    "approve_team": (
+        (TeamStatusEnum.pendent,),
+        "Equipe {team_id} (status: {status}) não está pendente, não pode ser aprovada/rejeitada."
+    ),
+    "delete_team": (
+        (TeamStatusEnum.pendent, TeamStatusEnum.active),
+        "Equipe {team_id} (status: {status}) não pode ser fechada por esta operação."
+    ),
+    "add_team_member": (
+        (TeamStatusEnum.active,),
+        "Não é possível adicionar membro à equipe {team_id} (status: '{status}'). Deve estar ativa."
+    ),
+    "remove_team_member": (
+        (TeamStatusEnum.active,),
+        "Não é possível remover membro da equipe {team_id} (status: '{status}'). Deve estar ativa."
+    ),
+}
+
+
+class ConcurrentTransitionError(RuntimeError):
+    """
+    A instrução condicional não afetou a equipe, mas a releitura mostra que a transição
+    seria válida: outro consumidor a alterou no meio tempo. Não é permanente (não é
+    ValueError), então a mensagem volta pela fila de retentativa.
+    """
+
+
+def _parse_request(message_data: dict) -> dict:
+    """
+    Valida os campos obrigatórios da mensagem e converte o team_id para UUID.
+    Lança ValueError se a mensagem estiver incompleta ou inválida.
+    """
+    team_id_str = message_data.get("team_id")
+    campus_code_str = message_data.get("campus_code")
+    request_type_str = message_data.get("request_type")
+    status_str = message_data.get("status")
+    user_id_str = message_data.get("user_id")
+
+    if not team_id_str:
+        raise ValueError("'team_id' é obrigatório na mensagem")
+    if not campus_code_str:
+        raise ValueError("'campus_code' é obrigatório na mensagem")
+    if not request_type_str:
+        raise ValueError("'request_type' é obrigatório na mensagem")
+    if not status_str:
+        raise ValueError("'status' é obrigatório na mensagem")
 
     try:
-        print(f"DB_SYNC: Processando mensagem: {message_data}")
-
-        team_id_str = message_data.get("team_id")
-        campus_code_str = message_data.get("campus_code")
-        request_type_str = message_data.get("request_type")
-        status_str = message_data.get("status")
-        user_id_str = message_data.get("user_id")
-
-        if not team_id_str:
-            raise ValueError("'team_id' é obrigatório na mensagem")
-        if not campus_code_str:
-            raise ValueError("'campus_code' é obrigatório na mensagem")
-        if not request_type_str:
-            raise ValueError("'request_type' é obrigatório na mensagem")
-        if not status_str:
-            raise ValueError("'status' é obrigatório na mensagem")
-
-        try:
-            team_id_for_db = uuid.UUID(team_id_str)
-        except ValueError:
-            raise ValueError(f"team_id '{team_id_str}' não é um UUID válido")
-
-        if user_id_str is None:
-            if request_type_str in ["add_team_member", "remove_team_member"]:
-                raise ValueError(f"'user_id' é obrigatório para request_type '{request_type_str}'")
-
-        print(
-            f"DB_SYNC: Parsed data: team_id={team_id_for_db}, campus_code={campus_code_str}, request_type={request_type_str}, user_id={user_id_str}, request_status={status_str}")
-
-        team_instance: Team = db.query(Team).filter(
-            Team.id == team_id_for_db,
-            Team.campus_code == campus_code_str
-        ).first()
-
-        if not team_instance:
-            raise ValueError(f"Equipe {team_id_for_db} com campus_code {campus_code_str} não encontrada.")
-
-
-        if request_type_str == "approve_team":
-            if team_instance.status != TeamStatusEnum.pendent:
-                raise ValueError(
-                    f"Equipe {team_instance.id} (status: {team_instance.status}) não está pendente, não pode ser aprovada/rejeitada.")
-
-            if status_str == "approved":
-                team_instance.status = TeamStatusEnum.active
-
-                db.add(team_instance)
-                db.commit()
-
-                # audit teams.created
-                log_payload = generate_log_payload(
-                    event_type="teams.created",
-                    service_origin="teams_service",
-                    entity_type="team",
-                    entity_id=team_instance.id,
-                    operation_type="CREATE",
-                    user_registration="system",
-                    campus_code=team_instance.campus_code,
-                    new_data=model_to_dict(team_instance)
+        team_id_for_db = uuid.UUID(team_id_str)
+    except ValueError:
+        raise ValueError(f"team_id '{team_id_str}' não é um UUID válido")
+
+    if user_id_str is None:
+        if request_type_str in ["add_team_member", "remove_team_member"]:
+            raise ValueError(f"'user_id' é obrigatório para request_type '{request_type_str}'")
+
+    logger.debug(
+        "Dados da mensagem: team_id=%s, campus_code=%s, request_type=%s, user_id=%s, request_status=%s",
+        team_id_for_db, campus_code_str, request_type_str, user_id_str, status_str,
+        extra={"event": "crud.message_parsed"}
+    )
+
+    return {
+        "team_id": team_id_for_db,
+        "campus_code": campus_code_str,
+        "request_type": request_type_str,
+        "status": status_str,
+        "user_id": user_id_str,
+    }
+
+
+def _team_row(team_row) -> dict:
+    """Linha de `teams` (RETURNING ou SELECT) no mesmo formato de model_to_dict(team)."""
+    return {column.name: team_row[column.name] for column in TEAMS.columns}
+
+
+def _select_teams(db, team_ids, for_update: bool = False) -> dict:
+    """Carrega as equipes pedidas com uma consulta: team_id -> dados (None para as inexistentes)."""
+    teams = dict.fromkeys(team_ids)
+    query = select(TEAMS).where(TEAMS.c.id.in_(teams))
+    if for_update:
+        query = query.with_for_update()
+    for team_row in db.execute(query).mappings():
+        teams[team_row["id"]] = _team_row(team_row)
+    return teams
+
+
+def _get_team(db, request: dict, teams: dict) -> dict | None:
+    """Dados da equipe da mensagem, lidos do banco só na primeira vez que são necessários."""
+    if request["team_id"] not in teams:
+        teams.update(_select_teams(db, [request["team_id"]]))
+    return teams[request["team_id"]]
+
+
+def _team_in_status(request: dict, *statuses: TeamStatusEnum):
+    """Condição "a equipe da mensagem existe, é do campus e está em um dos status", para usar no WHERE."""
+    return exists().where(
+        TEAMS.c.id == request["team_id"],
+        TEAMS.c.campus_code == request["campus_code"],
+        TEAMS.c.status.in_([status.value for status in statuses])
+    )
+
+
+def _require_team(db, request: dict, teams: dict, *allowed_statuses: TeamStatusEnum, error: str) -> dict:
+    """
+    Explica por que a instrução condicional não afetou nenhuma linha (ou valida os casos
+    sem escrita). Lança ValueError com a mensagem de erro da transição se a equipe não
+    existir no campus ou não estiver em um dos status permitidos.
+    """
+    team = _get_team(db, request, teams)
+
+    if not team or team["campus_code"] != request["campus_code"]:
+        raise ValueError(f"Equipe {request['team_id']} com campus_code {request['campus_code']} não encontrada.")
+
+    if team["status"] not in [status.value for status in allowed_statuses]:
+        raise ValueError(error.format(team_id=team["id"], status=team["status"]))
+
+    return team
+
+
+def _member_exists(db, request: dict) -> bool:
+    return db.execute(
+        select(TEAM_MEMBERS.c.user_id).where(
+            TEAM_MEMBERS.c.team_id == request["team_id"],
+            TEAM_MEMBERS.c.user_id == request["user_id"]
+        )
+    ).first() is not None
+
+
+def _change_key(request: dict):
+    """O que a mensagem altera: a equipe (status) ou o par (equipe, membro)."""
+    if request["request_type"] in MEMBER_REQUEST_TYPES:
+        return request["team_id"], request["user_id"]
+    return request["team_id"]
+
+
+def _write_group_key(request: dict) -> tuple[str, str] | None:
+    """(request_type, status) das mensagens que escrevem; None para as que só leem (rejeitadas etc.)."""
+    key = (request["request_type"], request["status"])
+    if key in TEAM_STATUS_TRANSITIONS or (key[0] in MEMBER_REQUEST_TYPES and key[1] == "approved"):
+        return key
+    return None
+
+
+def _update_teams_status(requests: list[dict], from_statuses: tuple[TeamStatusEnum, ...], to_status: TeamStatusEnum):
+    """UPDATE teams SET status = ... WHERE (id, campus_code) IN (...) AND status IN (...) RETURNING *."""
+    return (
+        update(TEAMS)
+        .where(
+            tuple_(TEAMS.c.id, TEAMS.c.campus_code).in_([(request["team_id"], request["campus_code"]) for request in requests]),
+            TEAMS.c.status.in_([status.value for status in from_statuses])
+        )
+        .values(status=to_status.value)
+        .returning(*TEAMS.columns)
+    )
+
+
+def _insert_member_if_active(db, request: dict):
+    """
+    INSERT INTO team_members SELECT :team_id, :user_id WHERE <equipe ativa> RETURNING
+    team_id, user_id, para uma mensagem isolada (a equipe não foi lida nem bloqueada).
+
+    Postgres e SQLite ignoram o membro já existente com ON CONFLICT DO NOTHING; nos demais
+    dialetos a mesma condição vai no WHERE (NOT EXISTS). Nesse caso, uma inserção
+    concorrente do mesmo membro termina em IntegrityError, que é retentada.
+    """
+    dialect_name = db.get_bind().dialect.name
+    insert_function = INSERT_BY_DIALECT.get(dialect_name)
+
+    def typed_value(value, column):
+        # No Postgres, literais sem tipo no SELECT viram text; no SQLite, CAST(... AS UUID)
+        # tem afinidade numérica e estragaria o hex, então lá o valor vai sem CAST.
+        value = literal(value, column.type)
+        return value if dialect_name == "sqlite" else cast(value, column.type)
+
+    conditions = [_team_in_status(request, TeamStatusEnum.active)]
+    if insert_function is None:
+        conditions.append(~exists().where(
+            TEAM_MEMBERS.c.team_id == request["team_id"],
+            TEAM_MEMBERS.c.user_id == request["user_id"]
+        ))
+    member_row = select(
+        typed_value(request["team_id"], TEAM_MEMBERS.c.team_id),
+        typed_value(request["user_id"], TEAM_MEMBERS.c.user_id)
+    ).where(*conditions)
+
+    if insert_function is not None:
+        statement = insert_function(TEAM_MEMBERS).from_select(["team_id", "user_id"], member_row).on_conflict_do_nothing()
+    else:
+        statement = insert(TEAM_MEMBERS).from_select(["team_id", "user_id"], member_row)
+
+    return db.execute(statement.returning(TEAM_MEMBERS.c.team_id, TEAM_MEMBERS.c.user_id))
+
+
+def _insert_members_into_locked_teams(db, requests: list[dict], teams: dict):
+    """
+    Insere de uma vez os membros de um lote cujas equipes estão ativas em `teams`. As
+    equipes do lote foram lidas com FOR UPDATE (_apply_pending), então o status em `teams`
+    não muda até o commit. Retorna as linhas inseridas (team_id, user_id).
+    """
+    allowed_statuses, _ = REQUIRED_TEAM_STATUS["add_team_member"]
+    member_rows = [
+        {"team_id": request["team_id"], "user_id": request["user_id"]}
+        for request in requests
+        if teams[request["team_id"]]["status"] in [status.value for status in allowed_statuses]
+    ]
+    if not member_rows:
+        return []
+
+    insert_function = INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
+    if insert_function is not None:
+        statement = insert_function(TEAM_MEMBERS).on_conflict_do_nothing()
+    else:
+        existing = set(db.execute(
+            select(TEAM_MEMBERS.c.team_id, TEAM_MEMBERS.c.user_id).where(
+                tuple_(TEAM_MEMBERS.c.team_id, TEAM_MEMBERS.c.user_id).in_(
+                    [(row["team_id"], row["user_id"]) for row in member_rows]
+                )
+            )
+        ).tuples())
+        member_rows = [row for row in member_rows if (row["team_id"], row["user_id"]) not in existing]
+        if not member_rows:
+            return []
+        statement = insert(TEAM_MEMBERS)
+
+    return db.execute(statement.returning(TEAM_MEMBERS.c.team_id, TEAM_MEMBERS.c.user_id), member_rows)
+
+
+def _delete_members_if_active(requests: list[dict]):
+    """
+    DELETE FROM team_members WHERE (team_id, user_id) IN (...) AND team_id IN (<equipes
+    ativas do campus da mensagem>) RETURNING team_id, user_id.
+
+    A forma da instrução não depende do tamanho do grupo (IN com parâmetros expandidos), então
+    ela é compilada uma vez e reaproveitada do cache do SQLAlchemy.
+    """
+    return (
+        delete(TEAM_MEMBERS)
+        .where(
+            tuple_(TEAM_MEMBERS.c.team_id, TEAM_MEMBERS.c.user_id).in_(
+                [(request["team_id"], request["user_id"]) for request in requests]
+            ),
+            TEAM_MEMBERS.c.team_id.in_(
+                select(TEAMS.c.id).where(
+                    tuple_(TEAMS.c.id, TEAMS.c.campus_code).in_(
+                        [(request["team_id"], request["campus_code"]) for request in requests]
+                    ),
+                    TEAMS.c.status == TeamStatusEnum.active.value
                 )
+            )
+        )
+        .returning(TEAM_MEMBERS.c.team_id, TEAM_MEMBERS.c.user_id)
+    )
+
+
+def _write_group(db, request_type: str, status: str, requests: list[dict], teams: dict) -> set:
+    """
+    Executa a escrita de um grupo de mensagens do mesmo tipo e status e retorna as chaves
+    (_change_key) efetivamente alteradas. As equipes que mudaram de status são atualizadas
+    em `teams` com os dados do RETURNING.
+    """
+    if request_type == "add_team_member":
+        if len(requests) == 1:
+            return {tuple(row) for row in _insert_member_if_active(db, requests[0])}
+        return {tuple(row) for row in _insert_members_into_locked_teams(db, requests, teams)}
+
+    if request_type == "remove_team_member":
+        return {tuple(row) for row in db.execute(_delete_members_if_active(requests))}
+
+    from_statuses, to_status = TEAM_STATUS_TRANSITIONS[(request_type, status)]
+    changed = set()
+    for team_row in db.execute(_update_teams_status(requests, from_statuses, to_status)).mappings():
+        teams[team_row["id"]] = _team_row(team_row)
+        changed.add(team_row["id"])
+    return changed
+
+
+def _split_into_runs(pending: list[tuple[int, dict]]) -> list[list[tuple[int, dict]]]:
+    """
+    Divide as mensagens em trechos consecutivos sem dependência entre si: dentro de um
+    trecho, nenhuma mensagem lê ou altera o que outra altera (a mesma equipe, no caso de
+    mudança de status, ou o mesmo membro). Assim as escritas de um trecho podem ser
+    agrupadas por tipo sem mudar o resultado da aplicação em ordem.
+    """
+    runs, run = [], []
+    status_teams, member_teams, member_keys = set(), set(), set()
+
+    for index, request in pending:
+        team_id = request["team_id"]
+        is_member_request = request["request_type"] in MEMBER_REQUEST_TYPES
+
+        if is_member_request:
+            depends_on_run = team_id in status_teams or _change_key(request) in member_keys
+        else:
+            depends_on_run = team_id in status_teams or team_id in member_teams
 
-                run_async_audit(log_payload)
+        if depends_on_run:
+            runs.append(run)
+            run = []
+            status_teams, member_teams, member_keys = set(), set(), set()
 
-                message = "Equipe aprovada e ativada."
+        run.append((index, request))
+        if is_member_request:
+            member_teams.add(team_id)
+            member_keys.add(_change_key(request))
+        else:
+            status_teams.add(team_id)
 
-            elif status_str == "rejected":
-                team_instance.status = TeamStatusEnum.closed
+    if run:
+        runs.append(run)
+    return runs
 
-                db.add(team_instance)
-                db.commit()
 
-                message = "Equipe rejeitada e fechada."
+def _request_result(db, request: dict, changed: bool, teams: dict) -> tuple[dict, list[dict]]:
+    """
+    Resultado de uma mensagem depois das escritas do seu trecho, sem commitar. `changed`
+    diz se a escrita do grupo alterou a equipe/membro da mensagem; se não alterou,
+    a equipe é lida para escolher a mensagem de erro ou de resultado.
 
-            else:
-                message = f"Solicitação de aprovação/rejeição com status '{status_str}' não reconhecido. Nenhuma alteração na equipe."
+    `teams` guarda os dados das equipes já lidos (team_id -> dados, ver _get_team) e é
+    atualizado a cada mudança de status, para que as mensagens seguintes do mesmo lote
+    vejam o estado novo. Retorna o resultado da mensagem e os logs de auditoria, que só
+    devem ser publicados depois do commit.
+    """
+    request_type_str = request["request_type"]
+    status_str = request["status"]
+    user_id_str = request["user_id"]
+    audit_payloads = []
 
-            db.refresh(team_instance)
+    if request_type_str not in REQUIRED_TEAM_STATUS:
+        raise ValueError(f"Tipo de requisição '{request_type_str}' desconhecido.")
 
-            return {"team_id": str(team_instance.id), "status": team_instance.status, "message": message}
+    allowed_statuses, not_allowed_error = REQUIRED_TEAM_STATUS[request_type_str]
 
-        elif request_type_str == "delete_team":
-            if team_instance.status not in [TeamStatusEnum.pendent, TeamStatusEnum.active]:
-                raise ValueError(
-                    f"Equipe {team_instance.id} (status: {team_instance.status}) não pode ser fechada por esta operação.")
+    if request_type_str in MEMBER_REQUEST_TYPES:
+        adding = request_type_str == "add_team_member"
 
-            if status_str == "approved":
-                if team_instance.status == TeamStatusEnum.closed:
-                    message = f"Equipe {team_instance.id} já está fechada."
-
-                else:
-                    team_instance.status = TeamStatusEnum.closed
-
-                    db.add(team_instance)
-                    db.commit()
-
-                    # audit teams.deleted
-                    log_payload = generate_log_payload(
-                        event_type="teams.deleted",
-                        service_origin="teams_service",
-                        entity_type="team",
-                        entity_id=team_instance.id,
-                        operation_type="DELETE",
-                        user_registration="system",
-                        campus_code=team_instance.campus_code,
-                        old_data= model_to_dict(team_instance)
-                    )
-
-                    run_async_audit(log_payload)
-
-                    message = f"Equipe {team_instance.id} marcada como fechada."
-            elif status_str == "rejected":
-                message = f"Solicitação de deleção para equipe {team_instance.id} foi rejeitada. Nenhuma alteração."
-
-            else:
-                message = f"Solicitação de deleção com status '{status_str}' não reconhecido. Nenhuma alteração na equipe."
-
-            db.refresh(team_instance)
-
-            return {
-                "team_id": str(team_instance.id),
-                "status": team_instance.status,
-                "message": message
-            }
-
-        elif request_type_str == "add_team_member":
-            if team_instance.status != TeamStatusEnum.active:
-                raise ValueError(
-                    f"Não é possível adicionar membro à equipe {team_instance.id} (status: '{team_instance.status}'). Deve estar ativa.")
-
-            existing_member = db.query(TeamMember).filter(
-                TeamMember.user_id == user_id_str,
-                TeamMember.team_id == team_instance.id
-            ).first()
-
-            if existing_member:
+        if changed:
+            # A escrita só acontece com a equipe ativa no campus: os dados servem apenas ao log de auditoria.
+            team = _get_team(db, request, teams)
+        else:
+            # Nada mudou: equipe inexistente ou inativa (erro), membro já existente / ausente,
+            # ou solicitação rejeitada.
+            team = _require_team(db, request, teams, *allowed_statuses, error=not_allowed_error)
+            member_exists = _member_exists(db, request)
+
+            if adding and member_exists:
                 return {
-                    "team_id": str(team_instance.id),
+                    "team_id": str(team["id"]),
                     "user_id": str(user_id_str),
                     "message": "Membro já existe na equipe."
-                }
+                }, audit_payloads
+
+            if not adding and not member_exists:
+                return {
+                    "team_id": str(team["id"]),
+                    "user_id": user_id_str,
+                    "message": "Membro não encontrado para remoção."
+                }, audit_payloads
 
             if status_str == "approved":
-                new_member = TeamMember(user_id=user_id_str, team_id=team_instance.id)
-
-                old_data = model_to_dict(team_instance)
-
-                db.add(new_member)
-                db.commit()
-
-                # audit team_members.updated
-                log_payload = generate_log_payload(
-                    event_type="team.members.updated",
-                    service_origin="teams_service",
-                    entity_type="team_member",
-                    entity_id=new_member.id,
-                    operation_type="UPDATE",
-                    user_registration="system",
-                    campus_code=team_instance.campus_code,
-                    old_data=old_data,
-                    new_data=model_to_dict(team_instance)
+                # Equipe ativa e membro no estado esperado, mas a escrita condicional não o alterou.
+                raise ConcurrentTransitionError(
+                    f"Equipe {request['team_id']} mudou durante a {'adição' if adding else 'remoção'} do membro {user_id_str}."
                 )
 
-                run_async_audit(log_payload)
+        if changed:
+            # audit team_members.updated
+            audit_payloads.append(generate_log_payload(
+                event_type="team.members.updated",
+                service_origin="teams_service",
+                entity_type="team_member",
+                entity_id=user_id_str,
+                operation_type="UPDATE",
+                user_registration="system",
+                campus_code=team["campus_code"],
+                old_data=team,
+                new_data=team
+            ))
+
+            message = "Membro adicionado à equipe." if adding else "Membro removido da equipe."
+
+        elif status_str == "rejected":
+            message = "Solicitação de adição de membro rejeitada." if adding else "Solicitação de remoção de membro rejeitada."
 
-                message = "Membro adicionado à equipe."
+        else:
+            message = (
+                f"Status de solicitação '{status_str}' não reconhecido para "
+                f"{'adição' if adding else 'remoção'} de membro."
+            )
+
+        return {
+            "team_id": str(team["id"]),
+            "user_id": user_id_str,
+            "message": message,
+            "team_status": team["status"]
+        }, audit_payloads
+
+    if changed:
+        team = teams[request["team_id"]]
+    else:
+        team = _require_team(db, request, teams, *allowed_statuses, error=not_allowed_error)
+        if (request_type_str, status_str) in TEAM_STATUS_TRANSITIONS:
+            # A equipe está num status que permite a transição, mas o UPDATE não a alterou.
+            raise ConcurrentTransitionError(f"Equipe {request['team_id']} mudou de status durante a transição.")
+
+    if request_type_str == "approve_team":
+        if changed and status_str == "approved":
+            # audit teams.created
+            audit_payloads.append(generate_log_payload(
+                event_type="teams.created",
+                service_origin="teams_service",
+                entity_type="team",
+                entity_id=team["id"],
+                operation_type="CREATE",
+                user_registration="system",
+                campus_code=team["campus_code"],
+                new_data=team
+            ))
+
+            message = "Equipe aprovada e ativada."
+        elif changed:
+            message = "Equipe rejeitada e fechada."
+        else:
+            message = f"Solicitação de aprovação/rejeição com status '{status_str}' não reconhecido. Nenhuma alteração na equipe."
+
+    else:
+        if changed:
+            # audit teams.deleted
+            audit_payloads.append(generate_log_payload(
+                event_type="teams.deleted",
+                service_origin="teams_service",
+                entity_type="team",
+                entity_id=team["id"],
+                operation_type="DELETE",
+                user_registration="system",
+                campus_code=team["campus_code"],
+                old_data=team
+            ))
+
+            message = f"Equipe {team['id']} marcada como fechada."
+        elif status_str == "rejected":
+            message = f"Solicitação de deleção para equipe {team['id']} foi rejeitada. Nenhuma alteração."
+        else:
+            message = f"Solicitação de deleção com status '{status_str}' não reconhecido. Nenhuma alteração na equipe."
+
+    return {"team_id": str(team["id"]), "status": team["status"], "message": message}, audit_payloads
+
+
+def _apply_pending(db, pending: list[tuple[int, dict]]) -> list[tuple[int, dict, list[dict]]]:
+    """
+    Aplica as mensagens na mesma transação, com o mesmo resultado da aplicação uma a uma
+    em ordem: cada trecho independente (_split_into_runs) faz uma escrita por tipo de
+    transição e depois monta o resultado de cada mensagem.
+
+    Uma mensagem isolada usa só instruções condicionais e lê a equipe apenas quando precisa
+    dos dados. Em lotes, as equipes são lidas de uma vez com FOR UPDATE, o que permite inserir
+    os membros das equipes ativas num único INSERT; mudanças de status e remoções continuam
+    condicionais.
+    """
+    teams = {}
+    if len(pending) > 1:
+        teams = _select_teams(db, {request["team_id"] for _, request in pending}, for_update=True)
+
+    applied = []
+    for run in _split_into_runs(pending):
+        groups = {}
+        for _, request in run:
+            group_key = _write_group_key(request)
+            if group_key is None:
+                continue
+            if teams:
+                # Equipe inexistente ou de outro campus: a mensagem só produz o erro. Tirá-la
+                # do grupo mantém exatas as instruções que filtram por (equipe, campus) do grupo todo.
+                team = teams[request["team_id"]]
+                if not team or team["campus_code"] != request["campus_code"]:
+                    continue
+            groups.setdefault(group_key, []).append(request)
+
+        changed = set()
+        for (request_type, status), requests in groups.items():
+            changed |= _write_group(db, request_type, status, requests, teams)
+
+        for index, request in run:
+            applied.append((index, *_request_result(db, request, _change_key(request) in changed, teams)))
+
+    return applied
+
+
+def update_teams_from_requests_in_db(messages_data: list[dict], idempotency_keys: list[str | None] | None = None) -> list[dict]:
+    """
+    Processa um lote de mensagens em uma única transação: aplica as transições com o
+    resultado da ordem das mensagens, agrupando as escritas por tipo (_apply_pending), e
+    faz um único commit.
+
+    Mensagens cuja chave de idempotência já está registrada como processada são
+    ignoradas sem tocar nas tabelas de equipes; as demais chaves são registradas na
+    mesma transação.
+
+    Se qualquer mensagem falhar, o lote inteiro é desfeito e a exceção é propagada;
+    cabe ao chamador reprocessar as mensagens uma a uma para isolar a que falhou.
+    """
+    if idempotency_keys is None:
+        idempotency_keys = [None] * len(messages_data)
+
+    db_gen = get_sync_db()
+    db = next(db_gen)
 
-            elif status_str == "rejected":
-                message = "Solicitação de adição de membro rejeitada."
+    try:
+        logger.debug("Processando lote de %d mensagem(ns): %s", len(messages_data), messages_data,
+                     extra={"event": "crud.batch_started"})
 
-            else:
-                message = f"Status de solicitação '{status_str}' não reconhecido para adição de membro."
+        requests = [_parse_request(message_data) for message_data in messages_data]
 
-            return {
-                "team_id": str(team_instance.id),
-                "user_id": user_id_str,
-                "message": message,
-                "team_status": team_instance.status
-            }
+        already_processed = processed_messages.find_persisted(db, idempotency_keys)
+        pending = []
+        results = [None] * len(requests)
 
-        elif request_type_str == "remove_team_member":
-            if team_instance.status != TeamStatusEnum.active:
-                raise ValueError(
-                    f"Não é possível remover membro da equipe {team_instance.id} (status: '{team_instance.status}'). Deve estar ativa.")
+        for index, (request, key) in enumerate(zip(requests, idempotency_keys)):
+            if key in already_processed:
+                logger.info("Mensagem %s já processada. Ignorando.", key, extra={"event": "crud.duplicate_skipped"})
+                results[index] = {"idempotency_key": key, "message": "Mensagem duplicada ignorada."}
+                continue
 
-            member_to_remove = db.query(TeamMember).filter(
-                TeamMember.team_id == team_instance.id,
-                TeamMember.user_id == user_id_str
-            ).first()
+            if key is not None:
+                already_processed.add(key)
+            pending.append((index, request))
 
-            if not member_to_remove:
-                return {
-                    "team_id": str(team_instance.id),
-                    "user_id": user_id_str,
-                    "message": "Membro não encontrado para remoção."
-                }
+        applied = _apply_pending(db, pending)
 
-            if status_str == "approved":
-                old_data = model_to_dict(team_instance)
-                
-                db.delete(member_to_remove)
-                db.commit()
-
-                # audit team_members.updated
-
-                log_payload = generate_log_payload(
-                    event_type="team.members.updated",
-                    service_origin="teams_service",
-                    entity_type="team_member",
-                    entity_id=new_member.id,
-                    operation_type="UPDATE",
-                    user_registration="system",
-                    campus_code=team_instance.campus_code,
-                    old_data=old_data,
-                    new_data=model_to_dict(team_instance)
-                )
+        audit_payloads = []
+        for index, result, request_audit_payloads in applied:
+            results[index] = result
+            audit_payloads.extend(request_audit_payloads)
 
-                run_async_audit(log_payload)
+        processed_messages.persist(db, [idempotency_keys[index] for index, _ in pending])
 
-                message = "Membro removido da equipe."
+        db.commit()
 
-            elif status_str == "rejected":
-                message = "Solicitação de remoção de membro rejeitada."
+        processed_messages.remember(idempotency_keys)
 
-            else:
-                message = f"Status de solicitação '{status_str}' não reconhecido para remoção de membro."
+        # Equipes alteradas saem do cache de leitura desta réplica e, via broadcast, das demais.
+        changed_teams = list({(request["campus_code"], request["team_id"]) for _, request in pending})
+        team_cache.invalidate(changed_teams)
+        team_cache_broadcaster.broadcast(changed_teams)
 
-            return {
-                "team_id": str(team_instance.id),
-                "user_id": user_id_str,
-                "message": message,
-                "team_status": team_instance.status
-            }
+        for log_payload in audit_payloads:
+            run_async_audit(log_payload)
 
-        else:
-            raise ValueError(f"Tipo de requisição '{request_type_str}' desconhecido.")
+        return results
 
     except ValueError as ve:
         db.rollback()
-        print(f"DB_SYNC: Erro de dados ou validação: {ve}")
+        logger.warning("Erro de dados ou validação: %s", ve, extra={"event": "crud.validation_error"})
         raise
     except Exception as e:
         db.rollback()
-        print(f"DB_SYNC: Erro inesperado no banco: {e}")
+        logger.error("Erro inesperado no banco: %s", e, exc_info=True, extra={"event": "crud.database_error"})
         raise
     finally:
         try:
@@ -262,4 +599,10 @@ def update_team_from_request_in_db(message_data: dict) -> dict:
         except StopIteration:
             pass
         except Exception as e_close:
-            print(f"DB_SYNC: Erro ao fechar a sessão do banco: {e_close}")
\ No newline at end of file
+            logger.error("Erro ao fechar a sessão do banco: %s", e_close, extra={"event": "crud.session_close_error"})
+
+
+def update_team_from_request_in_db(message_data: dict, idempotency_key: str | None = None) -> dict:
+    logger.debug("Processando mensagem: %s", message_data, extra={"event": "crud.message_started"})
+
+    return update_teams_from_requests_in_db([message_data], [idempotency_key])[0]
@@ -0,0 +1,201 @@
+import os
+import time
+
+import httpx
+
+from shared.log import get_logger
+from shared.metrics import downstream_request_duration, downstream_requests
+
+logger = get_logger(__name__)
+
+AUTH_SERVICE = "authapi"
+COMPETITIONS_SERVICE = "competitionsapi"
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("DOWNSTREAM_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("DOWNSTREAM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("DOWNSTREAM_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("DOWNSTREAM_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Timeouts por serviço (em segundos). O de competições mantém os 30s usados anteriormente.
+SERVICE_TIMEOUTS = {
+    AUTH_SERVICE: float(os.getenv("AUTH_SERVICE_TIMEOUT", "5")),
+    COMPETITIONS_SERVICE: float(os.getenv("COMPETITIONS_SERVICE_TIMEOUT", "30")),
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Corpo de resposta que avisa o transporte quando é fechado (a conexão volta ao pool)."""
+
+    def __init__(self, wrapped: httpx.AsyncByteStream, on_close):
+        self.wrapped = wrapped
+        self.on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self.wrapped:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.wrapped.aclose()
+        finally:
+            if self.on_close is not None:
+                self.on_close()
+                self.on_close = None
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Envolve o transporte de um serviço e registra latência e resultado de cada
+    chamada (sucesso, erro 4xx/5xx, timeout ou erro de rede).
+
+    Também contabiliza o uso das conexões: requisições em andamento (até o corpo da
+    resposta ser fechado), o pico delas e quantas conexões TCP foram abertas, esta
+    última pela extensão pública "trace" do httpcore. Com o keep-alive funcionando,
+    connections_opened fica bem abaixo de requests.
+    """
+
+    def __init__(self, service: str, wrapped: httpx.AsyncBaseTransport):
+        self.service = service
+        self.wrapped = wrapped
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+        self.connections_opened = 0
+
+    def _request_finished(self) -> None:
+        self.active -= 1
+
+    def _traced(self, request: httpx.Request) -> None:
+        previous_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started_at = time.perf_counter()
+        outcome = "network_error"
+        self._traced(request)
+        self.requests += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        response = None
+        try:
+            response = await self.wrapped.handle_async_request(request)
+            if response.status_code >= 500:
+                outcome = "server_error"
+            elif response.status_code >= 400:
+                outcome = "client_error"
+            else:
+                outcome = "success"
+            # A requisição só termina quando o corpo é fechado e a conexão volta ao pool.
+            response.stream = _TrackedStream(response.stream, self._request_finished)
+            return response
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            if response is None:
+                self._request_finished()
+            downstream_request_duration.labels(self.service, outcome).observe(time.perf_counter() - started_at)
+            downstream_requests.labels(self.service, outcome).inc()
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "active": self.active,
+            "peak_active": self.peak_active,
+            "connections_opened": self.connections_opened,
+        }
+
+
+class DownstreamClients:
+    """
+    Um httpx.AsyncClient por serviço downstream, com escopo de aplicação.
+    Os clientes são criados no lifespan e reaproveitam conexões (keep-alive) entre
+    requisições, evitando DNS, handshake TCP e teardown a cada chamada.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._transports: dict[str, httpx.AsyncBaseTransport] = {}
+        self._instrumented: dict[str, InstrumentedTransport] = {}
+
+    def set_transport(self, service: str, transport: httpx.AsyncBaseTransport | None) -> None:
+        """
+        Substitui o transporte de um serviço (ex.: stand-ins locais em benchmarks).
+        Deve ser chamado antes de start().
+        """
+        if transport is None:
+            self._transports.pop(service, None)
+        else:
+            self._transports[service] = transport
+
+    def _build_client(self, service: str) -> httpx.AsyncClient:
+        http2 = HTTP2_ENABLED and _http2_available()
+        if HTTP2_ENABLED and not http2:
+            logger.warning("DOWNSTREAM_HTTP2 habilitado, mas o pacote 'h2' não está instalado. Usando HTTP/1.1.")
+
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+        transport = self._transports.get(service) or httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        self._instrumented[service] = InstrumentedTransport(service, transport)
+
+        return httpx.AsyncClient(
+            timeout=SERVICE_TIMEOUTS.get(service, 5.0),
+            transport=self._instrumented[service]
+        )
+
+    def start(self) -> None:
+        for service in SERVICE_TIMEOUTS:
+            self.get(service)
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        """
+        Retorna o cliente do serviço. Se ainda não existir (ex.: fora do lifespan),
+        ele é criado sob demanda e reaproveitado nas próximas chamadas.
+        """
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            client = self._build_client(service)
+            self._clients[service] = client
+        return client
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        self._instrumented.clear()
+
+    def stats(self) -> dict:
+        """Uso das conexões de cada cliente, contabilizado pelo InstrumentedTransport."""
+        stats = {}
+        for service, transport in self._instrumented.items():
+            stats[service] = {
+                **transport.stats(),
+                "max_connections": HTTP_MAX_CONNECTIONS,
+                "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                "timeout_s": SERVICE_TIMEOUTS.get(service),
+            }
+        return stats
+
+
+downstream_clients = DownstreamClients()
@@ -0,0 +1,69 @@
+import os
+import threading
+import uuid
+
+from shared.cache import TTLCache
+from shared.metrics import registry
+
+# Detalhe e membros das equipes, no formato de TeamResponse, por (campus_code, team_id).
+# As entradas são invalidadas pelo CRUD do consumidor a cada escrita (e nas demais
+# réplicas pelo broadcast de invalidação); o TTL é apenas uma rede de segurança
+# para uma invalidação perdida.
+TEAM_CACHE_MAX_SIZE = int(os.getenv("TEAM_CACHE_MAX_SIZE", "5000"))
+TEAM_CACHE_TTL = float(os.getenv("TEAM_CACHE_TTL", "300"))
+
+team_cache_invalidations = registry.counter(
+    "teams_team_cache_invalidations_total", "Invalidações do cache de equipes por origem (local/broadcast).",
+    ("source",)
+)
+
+
+class TeamDetailCache:
+    """
+    Cache do detalhe de cada equipe (com os membros).
+
+    Para não gravar um valor lido do banco antes de uma escrita concorrente, quem
+    consulta o banco guarda a geração vista antes da consulta (`generation`) e a
+    informa em `set`: se alguma invalidação aconteceu nesse meio tempo, o valor é descartado.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = TTLCache(max_size=max_size, ttl=ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(campus_code: str, team_id) -> tuple[str, str]:
+        return campus_code, str(team_id)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, campus_code: str, team_id: uuid.UUID) -> dict | None:
+        return self._entries.get(self.key(campus_code, team_id))
+
+    def set(self, detail: dict, generation: int) -> dict:
+        """Armazena o detalhe da equipe (ver services.team_reads.load_team_detail) e o retorna."""
+        with self._lock:
+            if generation == self._generation:
+                self._entries.set(self.key(detail["campus_code"], detail["id"]), detail)
+        return detail
+
+    def invalidate(self, keys, source: str = "local") -> None:
+        with self._lock:
+            self._generation += 1
+            for campus_code, team_id in keys:
+                self._entries.pop(self.key(campus_code, team_id))
+                team_cache_invalidations.labels(source).inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+team_cache = TeamDetailCache(max_size=TEAM_CACHE_MAX_SIZE, ttl=TEAM_CACHE_TTL)
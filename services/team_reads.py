@@ -0,0 +1,59 @@
+import uuid
+
+from sqlalchemy import select, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from teams.models import Team, TeamMember
+
+# Colunas de TeamResponse. As rotas de leitura montam as respostas direto dessas tuplas,
+# sem hidratar objetos ORM nem passar por from_attributes.
+TEAM_COLUMNS = (Team.id, Team.name, Team.abbreviation, Team.campus_code, Team.created_at, Team.status)
+
+
+def team_from_row(row, member_ids: list[str]) -> dict:
+    """Monta o dicionário de TeamResponse a partir de uma linha com TEAM_COLUMNS."""
+    team_id, name, abbreviation, campus_code, created_at, status = row
+    return {
+        "id": team_id,
+        "name": name,
+        "abbreviation": abbreviation,
+        "campus_code": campus_code,
+        "created_at": created_at,
+        "status": status,
+        "members": [{"user_id": member_id} for member_id in member_ids],
+    }
+
+
+async def load_member_ids(db: AsyncSession, team_ids: list[uuid.UUID]) -> dict[uuid.UUID, list[str]]:
+    """Matrículas dos membros de cada equipe, em uma única consulta."""
+    member_ids = {team_id: [] for team_id in team_ids}
+    if team_ids:
+        rows = await db.execute(
+            select(TeamMember.team_id, TeamMember.user_id)
+            .filter(TeamMember.team_id.in_(team_ids))
+            .order_by(TeamMember.team_id, TeamMember.user_id)
+        )
+        for team_id, user_id in rows:
+            member_ids[team_id].append(user_id)
+    return member_ids
+
+
+async def load_teams_from_rows(db: AsyncSession, rows) -> list[dict]:
+    """Completa as linhas com TEAM_COLUMNS com os membros de cada equipe."""
+    member_ids = await load_member_ids(db, [row[0] for row in rows])
+    return [team_from_row(row, member_ids[row[0]]) for row in rows]
+
+
+async def load_teams(db: AsyncSession, query: Select) -> list[dict]:
+    """
+    Executa `query` (um select(*TEAM_COLUMNS) com filtros, ordenação e limite) e retorna
+    as equipes com os membros: duas consultas, como o selectinload(Team.members).
+    """
+    return await load_teams_from_rows(db, (await db.execute(query)).all())
+
+
+async def load_team_detail(db: AsyncSession, campus_code: str, team_id: uuid.UUID) -> dict | None:
+    teams = await load_teams(
+        db, select(*TEAM_COLUMNS).filter(Team.id == team_id, Team.campus_code == campus_code)
+    )
+    return teams[0] if teams else None
@@ -1,33 +1,62 @@
 import httpx
+import os
 
-async def validate_members_with_auth_service(
+from services.http_clients import downstream_clients, AUTH_SERVICE
+from shared.cache import TTLCache
+from shared.log import get_logger
+
+logger = get_logger(__name__)
+
+MEMBER_CACHE_TTL = float(os.getenv("AUTH_MEMBER_CACHE_TTL", "300"))
+MEMBER_NEGATIVE_CACHE_TTL = float(os.getenv("AUTH_MEMBER_NEGATIVE_CACHE_TTL", "30"))
+MEMBER_CACHE_MAX_SIZE = int(os.getenv("AUTH_MEMBER_CACHE_MAX_SIZE", "10000"))
+
+# matrícula -> True (existe) / False (não existe no serviço de autenticação)
+member_existence_cache = TTLCache(max_size=MEMBER_CACHE_MAX_SIZE, ttl=MEMBER_CACHE_TTL)
+
+
+async def find_invalid_members_with_auth_service(
         member_ids: list[str],
         auth_service_url: str = "http://authapi:8000/api/v1/auth/users/"  # URL do endpoint de validação
-) -> tuple[bool, str]:
+) -> tuple[list[str] | None, str]:
     """
-    Chama o serviço de autenticação para validar uma lista de IDs de membros.
+    Chama o serviço de autenticação para validar uma lista de IDs de membros e retorna
+    os IDs inválidos. Apenas os IDs que não estão no cache de existência são enviados ao serviço.
+    Retorna (None, mensagem de erro) quando não é possível saber quais membros existem.
     """
 
-    payload = {"user_ids": member_ids}
+    known_members = {member_id: member_existence_cache.get(member_id) for member_id in member_ids}
+    uncached_ids = [member_id for member_id, exists in known_members.items() if exists is None]
+
+    if uncached_ids:
+        payload = {"user_ids": uncached_ids}
+
+        client = downstream_clients.get(AUTH_SERVICE)
 
-    async with httpx.AsyncClient() as client:
         try:
-            print(f"Chamando serviço de autenticação em: {auth_service_url} com payload: {payload}")
+            logger.debug("Chamando serviço de autenticação em: %s com payload: %s", auth_service_url, payload,
+                         extra={"event": "auth_service.request"})
             response = await client.post(auth_service_url, json=payload)
 
             response.raise_for_status()
 
             response_data = response.json()
-            print(f"Resposta do serviço de autenticação: {response_data}")
+            logger.debug("Resposta do serviço de autenticação: %s", response_data,
+                         extra={"event": "auth_service.response"})
 
             if response_data.get("all_exist") is True:
-                return True, "Todos os membros são válidos."
+                invalid_ids_from_auth = []
             else:
                 invalid_ids_from_auth = response_data.get("invalid_ids", [])
-                message = response_data.get("message", "Alguns membros são inválidos.")
-                if invalid_ids_from_auth:
-                    message = f"Membros inválidos ou não encontrados: {', '.join(invalid_ids_from_auth)}"
-                return False, message
+                if not invalid_ids_from_auth:
+                    # Sem a lista de inválidos não dá para saber quem existe: nada é cacheado.
+                    return None, response_data.get("message", "Alguns membros são inválidos.")
+
+            for member_id in uncached_ids:
+                exists = member_id not in invalid_ids_from_auth
+                member_existence_cache.set(
+                    member_id, exists, ttl=MEMBER_CACHE_TTL if exists else MEMBER_NEGATIVE_CACHE_TTL)
+                known_members[member_id] = exists
 
         except httpx.HTTPStatusError as e:
             error_message = f"Erro do serviço de autenticação ao validar membros: {e.response.status_code}."
@@ -37,14 +66,32 @@ async def validate_members_with_auth_service(
                     error_message += f" Detalhe: {error_detail}"
             except Exception:
                 error_message += f" Resposta: {e.response.text}"
-            print(error_message)
-            return False, error_message
+            logger.warning(error_message, extra={"event": "auth_service.http_error"})
+            return None, error_message
 
         except httpx.RequestError as e:
             error_message = f"Erro de rede ao contatar serviço de autenticação: {str(e)}"
-            print(error_message)
-            return False, error_message
+            logger.warning(error_message, extra={"event": "auth_service.request_error"})
+            return None, error_message
         except Exception as e:
             error_message = f"Erro inesperado ao validar membros: {str(e)}"
-            print(error_message)
-            return False, error_message
\ No newline at end of file
+            logger.error(error_message, exc_info=True, extra={"event": "auth_service.unexpected_error"})
+            return None, error_message
+
+    invalid_ids = [member_id for member_id, exists in known_members.items() if exists is False]
+    if invalid_ids:
+        return invalid_ids, f"Membros inválidos ou não encontrados: {', '.join(invalid_ids)}"
+
+    return [], "Todos os membros são válidos."
+
+
+async def validate_members_with_auth_service(
+        member_ids: list[str],
+        auth_service_url: str = "http://authapi:8000/api/v1/auth/users/"  # URL do endpoint de validação
+) -> tuple[bool, str]:
+    """
+    Chama o serviço de autenticação para validar uma lista de IDs de membros.
+    Apenas os IDs que não estão no cache de existência são enviados ao serviço.
+    """
+    invalid_ids, message = await find_invalid_members_with_auth_service(member_ids, auth_service_url)
+    return invalid_ids == [], message
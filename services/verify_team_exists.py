@@ -1,6 +1,11 @@
 import httpx
 from typing import Tuple, Dict, Any
 
+from services.http_clients import downstream_clients, COMPETITIONS_SERVICE
+from shared.log import get_logger
+
+logger = get_logger(__name__)
+
 async def verify_team_exists_with_competitions_service(
         team_id: str,
         auth_service_url: str,
@@ -15,50 +20,52 @@ async def verify_team_exists_with_competitions_service(
         "team_id": team_id
     }
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(auth_service_url, json=payload, headers={"Authorization": f"Bearer {access_token}"})
-            response.raise_for_status()
+    client = downstream_clients.get(COMPETITIONS_SERVICE)
 
-            response_data = response.json()
-            print(f"Resposta do serviço de competições: {response_data}")
+    try:
+        response = await client.post(auth_service_url, json=payload, headers={"Authorization": f"Bearer {access_token}"})
+        response.raise_for_status()
 
-            if response_data.get("can_be_inscribed") is True:
-                return True, {
-                    "message": response_data.get("message", "Sucesso"),
-                    "data": response_data.get("data", {})
-                }
-            else:
-                return False, {
-                    "message": response_data.get("message", "Competição não permite inscrições"),
-                    "data": response_data.get("data", {})
-                }
+        response_data = response.json()
+        logger.debug("Resposta do serviço de competições: %s", response_data,
+                     extra={"event": "competitions_service.response"})
 
-        except httpx.HTTPStatusError as e:
-            error_message = f"Erro do serviço de competição (Status {e.response.status_code})"
+        if response_data.get("can_be_inscribed") is True:
+            return True, {
+                "message": response_data.get("message", "Sucesso"),
+                "data": response_data.get("data", {})
+            }
+        else:
+            return False, {
+                "message": response_data.get("message", "Competição não permite inscrições"),
+                "data": response_data.get("data", {})
+            }
 
-            try:
-                error_data = e.response.json()
-                error_detail = error_data.get("detail") or error_data.get("message")
-                if error_detail:
-                    error_message += f": {error_detail}"
-            except Exception:
-                error_message += f": {e.response.text}"
+    except httpx.HTTPStatusError as e:
+        error_message = f"Erro do serviço de competição (Status {e.response.status_code})"
+
+        try:
+            error_data = e.response.json()
+            error_detail = error_data.get("detail") or error_data.get("message")
+            if error_detail:
+                error_message += f": {error_detail}"
+        except Exception:
+            error_message += f": {e.response.text}"
 
-            print(error_message)
-            return False, {"message": error_message}
+        logger.warning(error_message, extra={"event": "competitions_service.http_error"})
+        return False, {"message": error_message}
 
-        except httpx.TimeoutException:
-            error_message = "Timeout ao contatar serviço de competição"
-            print(error_message)
-            return False, {"message": error_message}
+    except httpx.TimeoutException:
+        error_message = "Timeout ao contatar serviço de competição"
+        logger.warning(error_message, extra={"event": "competitions_service.timeout"})
+        return False, {"message": error_message}
 
-        except httpx.RequestError as e:
-            error_message = f"Erro de rede ao contatar serviço de competição: {str(e)}"
-            print(error_message)
-            return False, {"message": error_message}
+    except httpx.RequestError as e:
+        error_message = f"Erro de rede ao contatar serviço de competição: {str(e)}"
+        logger.warning(error_message, extra={"event": "competitions_service.request_error"})
+        return False, {"message": error_message}
 
-        except Exception as e:
-            error_message = f"Erro inesperado ao validar competição: {str(e)}"
-            print(error_message)
-            return False, {"message": error_message}
\ No newline at end of file
+    except Exception as e:
+        error_message = f"Erro inesperado ao validar competição: {str(e)}"
+        logger.error(error_message, exc_info=True, extra={"event": "competitions_service.unexpected_error"})
+        return False, {"message": error_message}
\ No newline at end of file
@@ -0,0 +1,50 @@
+import asyncio
+
+from typing import Any, Awaitable
+
+
+async def gather_fail_fast(*awaitables: Awaitable[Any]) -> list[Any]:
+    """
+    Executa os awaitables concorrentemente e retorna os resultados na ordem de entrada.
+
+    Assim que qualquer um deles lança exceção, os que ainda estão rodando são cancelados
+    e a exceção é propagada. Se mais de um falhar no mesmo instante, prevalece o que veio
+    primeiro na lista de argumentos.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+
+        return [task.result() for task in tasks]
+
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def gather_in_order(*awaitables: Awaitable[Any]) -> list[Any]:
+    """
+    Executa os awaitables concorrentemente, mas avalia os resultados na ordem de entrada,
+    como se tivessem sido aguardados um após o outro: a exceção propagada é sempre a do
+    primeiro da lista que falhar, mesmo que um posterior tenha falhado antes. Só quando
+    um deles falha os seguintes são cancelados.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+
+    try:
+        return [await task for task in tasks]
+
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Também recolhe as exceções dos que falharam depois do primeiro erro.
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,18 +1,103 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, UniqueConstraint
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from dotenv import load_dotenv
 import os
 
+from shared.metrics import instrument_engine
+
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL")
 
+# Drivers assíncronos equivalentes aos drivers síncronos usados na URL principal.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_database_url(url: str) -> str:
+    """
+    Converte a URL síncrona do banco para o driver assíncrono equivalente
+    (ex.: postgresql:// -> postgresql+asyncpg://).
+    """
+    parsed_url = make_url(url)
+    async_driver = ASYNC_DRIVERS.get(parsed_url.drivername)
+
+    if async_driver is None:
+        return url
+
+    return parsed_url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
+SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv("SQLALCHEMY_ASYNC_DATABASE_URL") or to_async_database_url(
+    SQLALCHEMY_DATABASE_URL
+)
+
+# Engine síncrono: usado apenas onde não há event loop disponível
+# (consumidor RabbitMQ rodando em thread e migrações do Alembic).
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine, "consumer")
+
+# Engine assíncrono: usado por todas as rotas da API.
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    pool_pre_ping=True
+)
+
+instrument_engine(async_engine.sync_engine, "api")
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+Base = declarative_base()
+
+
+SQLITE_UNIQUE_VIOLATION_PREFIX = "UNIQUE constraint failed: "
+
+
+def unique_constraint_columns(constraint_name: str) -> str | None:
+    """Colunas da UniqueConstraint declarada nos modelos, no formato do SQLite: "tabela.coluna, ..."."""
+    for table in Base.metadata.tables.values():
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name == constraint_name:
+                return ", ".join(f"{table.name}.{column.name}" for column in constraint.columns)
+    return None
+
+
+def is_unique_violation(error: IntegrityError, *constraint_names: str) -> bool:
+    """
+    Indica se o IntegrityError foi causado pela violação de uma das constraints informadas.
+    Funciona com psycopg2 (diag.constraint_name), asyncpg (constraint_name na causa original)
+    e SQLite, cuja mensagem traz as colunas em vez do nome da constraint.
+    """
+    original_error = error.orig
+    violated = (
+        getattr(getattr(original_error, "diag", None), "constraint_name", None)
+        or getattr(getattr(original_error, "__cause__", None), "constraint_name", None)
+    )
+
+    if violated:
+        return violated in constraint_names
+
+    message = str(original_error)
+    if message.startswith(SQLITE_UNIQUE_VIOLATION_PREFIX):
+        violated_columns = message.removeprefix(SQLITE_UNIQUE_VIOLATION_PREFIX)
+        return any(unique_constraint_columns(name) == violated_columns for name in constraint_names)
 
-Base = declarative_base()
\ No newline at end of file
+    return any(name in message for name in constraint_names)
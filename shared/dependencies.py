@@ -1,9 +1,14 @@
-from shared.database import SessionLocal
+from shared.database import SessionLocal, AsyncSessionLocal
 
 
-def get_db():
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
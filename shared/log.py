@@ -0,0 +1,148 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+
+# Amostragem por evento, no formato "evento=taxa,evento=taxa" (taxa entre 0 e 1).
+# Ex.: LOG_SAMPLE_RATES="consumer.message_received=0.01,crud.message_parsed=0.1"
+LOG_SAMPLE_RATES = {
+    event.strip(): float(rate)
+    for event, _, rate in (item.partition("=") for item in os.getenv("LOG_SAMPLE_RATES", "").split(","))
+    if event.strip() and rate.strip()
+}
+
+# Atributos padrão do LogRecord; o que não estiver aqui veio de `extra` e vira campo estruturado.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "event", "sample_rate"}
+
+
+class EventSampler(logging.Filter):
+    """
+    Amostragem determinística por evento: com taxa 0.1, registra 1 a cada 10 ocorrências
+    de `event`. A taxa vem de `extra={"sample_rate": ...}` ou de LOG_SAMPLE_RATES.
+    Registros de WARNING para cima nunca são amostrados.
+    """
+
+    def __init__(self, sample_rates: dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self._counters: dict[str, itertools.count] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        event = getattr(record, "event", None)
+        rate = getattr(record, "sample_rate", None)
+        if rate is None:
+            rate = self.sample_rates.get(event)
+        if rate is None or rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+
+        counter = self._counters.get(event)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(event, itertools.count())
+
+        return next(counter) % round(1 / rate) == 0
+
+
+class DeferredFormattingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que não formata a mensagem na thread de quem loga: msg e args seguem
+    intactos para a thread do listener, que faz a interpolação e a escrita. Apenas o
+    traceback é convertido em texto aqui, pois depende dos frames atuais.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Nunca bloqueia quem loga: com a fila cheia o registro é descartado.
+            pass
+
+
+class StructuredFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos passados em `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "event", None):
+            entry["event"] = record.event
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+_configure_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging() -> None:
+    """
+    Instala no logger raiz um QueueHandler (com amostragem) cuja fila é esvaziada por
+    uma thread de fundo, responsável pela formatação e pela escrita em stdout.
+    Idempotente: chamado automaticamente por get_logger.
+    """
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if LOG_FORMAT == "json":
+            stream_handler.setFormatter(StructuredFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        queue_handler = DeferredFormattingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE))
+        queue_handler.addFilter(EventSampler(LOG_SAMPLE_RATES))
+
+        root_logger = logging.getLogger()
+        root_logger.addHandler(queue_handler)
+        root_logger.setLevel(LOG_LEVEL)
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Para o listener, escrevendo o que ainda estiver na fila."""
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(name)
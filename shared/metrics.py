@@ -0,0 +1,411 @@
+import bisect
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Iterable
+
+from shared.log import get_logger
+
+logger = get_logger(__name__)
+
+# Buckets (segundos) para latências de rotas, consultas e chamadas externas.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Perfilador SQL opcional (log de consultas lentas, resumo por requisição/mensagem): desligado por padrão.
+SQL_PROFILING_ENABLED = os.getenv("SQL_PROFILING", "false").lower() in ("1", "true", "yes")
+SQL_SLOW_QUERY_THRESHOLD = float(os.getenv("SQL_SLOW_QUERY_MS", "200")) / 1000
+# off: ignora orçamentos; warn: registra o estouro; raise: lança QueryBudgetExceeded (modo de teste).
+SQL_QUERY_BUDGET_MODE = os.getenv("SQL_QUERY_BUDGET_MODE", "warn").lower()
+SQL_PARAMETERS_MAX_LENGTH = 1000
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *label_values):
+        """Retorna (criando na primeira vez) a série para os valores de label informados."""
+        child = self._children.get(label_values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(label_values)
+                if child is None:
+                    child = self._children[label_values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for label_values, child in list(self._children.items()):
+            lines.extend(self._render_child(label_values, child))
+        return lines
+
+    def _render_child(self, label_values, child) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _render_child(self, label_values, child) -> list[str]:
+        return [f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, label_values, child) -> list[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total, count = child.sum, child.count
+
+        lines = []
+        cumulative = 0
+        for upper_bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.label_names, label_values, f'le="{_format_value(upper_bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+        labels = _format_labels(self.label_names, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class GaugeCollector:
+    """
+    Gauges calculados no momento da coleta a partir de uma função que retorna
+    {(valores de label...): valor}. Usado para expor estatísticas já mantidas por
+    outros componentes (caches, pipeline de auditoria, pools HTTP) sem custo por evento.
+    """
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str], collect: Callable[[], dict]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for label_values, value in self.collect().items():
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def gauge_collector(self, name: str, documentation: str, label_names: Iterable[str], collect: Callable[[], dict]) -> GaugeCollector:
+        return self.register(GaugeCollector(name, documentation, label_names, collect))
+
+    def render(self) -> str:
+        """Exposição no formato texto do Prometheus (version 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                # Um coletor com defeito não pode derrubar o endpoint inteiro.
+                continue
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Métricas da aplicação ---
+
+http_request_duration = registry.histogram(
+    "teams_http_request_duration_seconds", "Latência das requisições HTTP por rota.", ("method", "route", "status")
+)
+db_query_duration = registry.histogram(
+    "teams_db_query_duration_seconds", "Duração de cada consulta SQL por engine (api/consumer).", ("engine",)
+)
+db_queries_per_request = registry.histogram(
+    "teams_db_queries_per_request", "Consultas SQL executadas por requisição HTTP.", ("route",), buckets=COUNT_BUCKETS
+)
+db_time_per_request = registry.histogram(
+    "teams_db_time_per_request_seconds", "Tempo total em consultas SQL por requisição HTTP.", ("route",)
+)
+downstream_request_duration = registry.histogram(
+    "teams_downstream_request_duration_seconds", "Latência das chamadas aos serviços externos.", ("service", "outcome")
+)
+downstream_requests = registry.counter(
+    "teams_downstream_requests_total", "Chamadas aos serviços externos por resultado.", ("service", "outcome")
+)
+publish_duration = registry.histogram(
+    "teams_rabbitmq_publish_duration_seconds", "Latência de publicação (até a confirmação do broker).",
+    ("exchange", "routing_key")
+)
+publish_failures = registry.counter(
+    "teams_rabbitmq_publish_failures_total", "Publicações não confirmadas ou com erro.", ("exchange", "routing_key")
+)
+consumer_messages = registry.counter(
+    "teams_consumer_messages_total", "Mensagens consumidas por fila e resultado.", ("queue", "outcome")
+)
+consumer_handler_duration = registry.histogram(
+    "teams_consumer_handler_duration_seconds", "Tempo de processamento de cada mensagem (ou lote).", ("queue",)
+)
+
+
+# --- Contagem de consultas por unidade de trabalho (requisição ou mensagem) ---
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """
+    Consultas executadas em uma unidade de trabalho. As instruções só são guardadas com
+    SQL_PROFILING habilitado, para mostrar no aviso de orçamento estourado.
+    """
+
+    __slots__ = ("label", "count", "duration", "statements")
+
+    def __init__(self, label: str = "-"):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+        self.statements: list[str] = []
+
+
+current_query_stats: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("current_query_stats", default=None)
+
+
+def instrument_engine(engine, engine_label: str) -> None:
+    """
+    Registra listeners de before/after_cursor_execute que medem cada consulta e a
+    somam às estatísticas da requisição corrente (via contextvar). Com SQL_PROFILING,
+    também guardam a instrução e registram as consultas lentas.
+    """
+    from sqlalchemy import event
+
+    histogram = db_query_duration.labels(engine_label)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        histogram.observe(elapsed)
+
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+        if not SQL_PROFILING_ENABLED:
+            return
+
+        if stats is not None:
+            stats.statements.append(statement)
+
+        if elapsed >= SQL_SLOW_QUERY_THRESHOLD:
+            logger.warning(
+                "Consulta lenta (%.1f ms) em %s: %s | parâmetros: %.*r",
+                elapsed * 1000, stats.label if stats else "-", statement,
+                SQL_PARAMETERS_MAX_LENGTH, parameters,
+                extra={"event": "sql.slow_query", "duration_ms": round(elapsed * 1000, 3)}
+            )
+
+
+def log_query_stats(stats: QueryStats) -> None:
+    if SQL_PROFILING_ENABLED:
+        logger.info(
+            "%s: %d consulta(s) SQL em %.1f ms", stats.label, stats.count, stats.duration * 1000,
+            extra={"event": "sql.profile", "queries": stats.count, "db_time_ms": round(stats.duration * 1000, 3)}
+        )
+
+
+def check_query_budget(stats: QueryStats, budget: int | None) -> None:
+    if budget is None or SQL_QUERY_BUDGET_MODE == "off" or stats.count <= budget:
+        return
+
+    message = f"{stats.label} executou {stats.count} consultas SQL (orçamento: {budget})."
+    if stats.statements:
+        message += f" Consultas: {stats.statements}"
+
+    if SQL_QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+
+    logger.warning(message, extra={"event": "sql.query_budget_exceeded"})
+
+
+@contextlib.contextmanager
+def profile_sql(label: str, budget: int | None = None):
+    """
+    Agrupa as consultas executadas dentro do bloco (inclusive em threads iniciadas
+    com asyncio.to_thread, que herdam o contexto) e registra o resumo ao final. As
+    consultas continuam somadas às estatísticas de quem estava medindo antes do bloco.
+    """
+    if not SQL_PROFILING_ENABLED and budget is None:
+        yield None
+        return
+
+    outer_stats = current_query_stats.get()
+    stats = QueryStats(label)
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+        if outer_stats is not None:
+            outer_stats.count += stats.count
+            outer_stats.duration += stats.duration
+            outer_stats.statements.extend(stats.statements)
+
+    log_query_stats(stats)
+    check_query_budget(stats, budget)
+
+
+def query_budget(max_queries: int):
+    """
+    Declara o número máximo de consultas SQL de um endpoint. A função não é
+    envolvida; o valor é lido pelo MetricsMiddleware a partir da rota.
+    """
+
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: mede a latência por rota (o template, ex.: /api/v1/teams/{team_id})
+    e as consultas SQL feitas durante a requisição, e verifica o orçamento de consultas
+    declarado na rota com @query_budget.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = current_query_stats.set(stats)
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            current_query_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            if route is not None:
+                stats.label = f"{scope['method']} {route_path}"
+
+            http_request_duration.labels(scope["method"], route_path, str(status_holder[0])).observe(elapsed)
+            db_queries_per_request.labels(route_path).observe(stats.count)
+            db_time_per_request.labels(route_path).observe(stats.duration)
+
+        log_query_stats(stats)
+        check_query_budget(stats, getattr(scope.get("endpoint"), "__query_budget__", None))
@@ -0,0 +1,27 @@
+import base64
+import json
+import uuid
+
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, team_id: uuid.UUID) -> str:
+    """
+    Gera um cursor opaco a partir da chave de ordenação (created_at, id)
+    do último item de uma página.
+    """
+    raw = json.dumps([created_at.isoformat(), str(team_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decodifica um cursor gerado por encode_cursor.
+    Lança ValueError se o cursor estiver malformado.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_str, team_id_str = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at_str), uuid.UUID(team_id_str)
+    except Exception:
+        raise ValueError("Cursor inválido")
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, UUID, ForeignKey, String
+from sqlalchemy import Column, UUID, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 
 from shared.database import Base
@@ -8,6 +8,9 @@ from shared.database import Base
 
 class TeamMember(Base):
     __tablename__ = 'team_members'
+    __table_args__ = (
+        Index('ix_team_members_user_id', 'user_id'),
+    )
 
     team_id: uuid.UUID = Column(UUID(as_uuid=True), ForeignKey('teams.id'), primary_key=True)
     user_id: str = Column(String, primary_key=True)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, UUID, String, DateTime, Table, ForeignKey
+from sqlalchemy import Column, UUID, String, DateTime, Table, ForeignKey, Index, UniqueConstraint
 
 from datetime import datetime, timezone
 
@@ -21,6 +21,12 @@ class TeamStatusEnum(str, Enum):
 
 class Team(Base):
     __tablename__ = "teams"
+    __table_args__ = (
+        UniqueConstraint("campus_code", "name", name="uq_teams_campus_code_name"),
+        UniqueConstraint("campus_code", "abbreviation", name="uq_teams_campus_code_abbreviation"),
+        Index("ix_teams_campus_code_created_at_id", "campus_code", "created_at", "id"),
+        Index("ix_teams_campus_code_status_created_at_id", "campus_code", "status", "created_at", "id"),
+    )
 
     id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: str = Column(String(100), nullable=False)
@@ -36,4 +42,7 @@ class Team(Base):
     )
     campus_code: str = Column(String(100), nullable=False)
 
-    members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan")
\ No newline at end of file
+    # O elenco nunca é carregado sob demanda, evitando um SELECT por equipe: as rotas de
+    # leitura carregam os membros de todas as equipes numa consulta só
+    # (services/team_reads.load_member_ids).
+    members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan", lazy="raise_on_sql")
\ No newline at end of file
@@ -1,30 +1,42 @@
 import uuid
 from datetime import datetime, timezone
+from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi.responses import ORJSONResponse
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth import get_current_user
-from messaging.publishers import publish_remove_member_requested, publish_add_member_requested
-from services.validate_members_http import validate_members_with_auth_service
+from messaging.publishers import publish_remove_member_requested, publish_add_member_requested, \
+    publish_remove_members_requested, publish_add_members_requested
+from services.team_cache import team_cache
+from services.team_reads import load_team_detail
+from services.validate_members_http import validate_members_with_auth_service, find_invalid_members_with_auth_service
 from shared.auth_utils import has_role
+from shared.concurrency import gather_fail_fast
 from shared.dependencies import get_db
 
 from shared.exceptions import NotFound, Conflict
+from shared.log import get_logger
+from shared.metrics import query_budget
 from teams.models.teams import Team
 
 from teams.models.team_member import TeamMember
 
 
-from teams.schemas.team_members import TeamMemberCreateRequest, TeamMemberDeleteRequest
+from teams.schemas.team_members import TeamMemberCreateRequest, TeamMemberDeleteRequest, TeamMemberBatchRequest, \
+    TeamMemberBatchResponse, TeamRosterMemberResponse, TeamMemberRequestAcceptedResponse
 
 from messaging.audit_publisher import run_async_audit, generate_log_payload, model_to_dict
 
+logger = get_logger(__name__)
+
 # Manteremos os 'responses' porque são úteis para as ferramentas interativas
 # como /docs e /redoc, mesmo que o Sphinx não os use para gerar os blocos de JSON.
 responses_get_members = {
-    200: {"description": "Membros da equipe retornados com sucesso."},
+    200: {"model": List[TeamRosterMemberResponse], "description": "Membros da equipe retornados com sucesso."},
     403: {"description": "O usuário não tem permissão para visualizar os membros."},
     404: {"description": "A equipe com o ID fornecido não foi encontrada."}
 }
@@ -41,6 +53,15 @@ responses_remove_member = {
     403: {"description": "O usuário solicitante não tem permissão para remover membros."},
     404: {"description": "A equipe ou o membro não foram encontrados."}
 }
+responses_batch_members = {
+    202: {"description": "Ao menos uma adição ou remoção foi aceita e enviada para aprovação."},
+    400: {"description": "Nenhuma operação foi aceita, o lote é inválido ou falta o motivo das remoções."},
+    503: {"description": "Nenhuma operação foi aceita porque o envio das solicitações não foi confirmado."},
+    403: {"description": "O usuário solicitante não tem permissão para alterar os membros."},
+    404: {"description": "A equipe com o ID fornecido não foi encontrada."}
+}
+
+MAX_BATCH_MEMBERS = 100
 
 router = APIRouter(
     prefix="/api/v1/teams/{team_id}/members",
@@ -49,9 +70,9 @@ router = APIRouter(
 
 
 @router.get("/", responses=responses_get_members)
-async def get_team_members_by_team_id(team_id: str,
-                                      response: Response,
-                                      db: Session = Depends(get_db),
+@query_budget(2)
+async def get_team_members_by_team_id(team_id: uuid.UUID,
+                                      db: AsyncSession = Depends(get_db),
                                       current_user: dict = Depends(get_current_user)):
     """
     Get Team Members By Team Id
@@ -69,15 +90,11 @@ async def get_team_members_by_team_id(team_id: str,
        [
          {
            "user_id": "20231012030011",
-           "team_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
-           "created_at": "2025-08-04T21:14:25.123Z",
-           "updated_at": "2025-08-04T21:14:25.123Z"
+           "team_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6"
          },
          {
            "user_id": "20231012030015",
-           "team_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
-           "created_at": "2025-08-04T21:15:00.456Z",
-           "updated_at": "2025-08-04T21:15:00.456Z"
+           "team_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6"
          }
        ]
 
@@ -85,17 +102,21 @@ async def get_team_members_by_team_id(team_id: str,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    team: Team = db.query(Team).filter(
-        Team.id == team_id, Team.campus_code == campus_code).first()  # type: ignore
+    team_detail = team_cache.get(campus_code, team_id)
+    if team_detail is None:
+        cache_generation = team_cache.generation
+        team_detail = await load_team_detail(db, campus_code, team_id)
 
-    if not team:
-        raise NotFound("Equipe")
+        if not team_detail:
+            raise NotFound("Equipe")
 
-    if has_role(groups, "Jogador", "Organizador"):
-        members = team.members
+        team_cache.set(team_detail, cache_generation)
 
-        response.status_code = status.HTTP_200_OK
-        return members
+    if has_role(groups, "Jogador", "Organizador"):
+        return ORJSONResponse([
+            {"user_id": member["user_id"], "team_id": team_detail["id"]}
+            for member in team_detail["members"]
+        ])
 
     else:
         raise HTTPException(
@@ -104,12 +125,14 @@ async def get_team_members_by_team_id(team_id: str,
         )
 
 
-@router.post("/", responses=responses_add_member, status_code=status.HTTP_202_ACCEPTED)
+@router.post("/", response_model=TeamMemberRequestAcceptedResponse, responses=responses_add_member,
+             status_code=status.HTTP_202_ACCEPTED)
+@query_budget(3)
 async def add_team_member_to_team(team_id: uuid.UUID,
                                   team_member_request: TeamMemberCreateRequest,
                                   response: Response,
                                   request_object: Request,
-                                  db: Session = Depends(get_db),
+                                  db: AsyncSession = Depends(get_db),
                                   current_user: dict = Depends(get_current_user)):
     """
     Add Team Member To Team
@@ -142,16 +165,19 @@ async def add_team_member_to_team(team_id: uuid.UUID,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    team: Team = db.query(Team).filter(
-        Team.id == team_id, Team.campus_code == campus_code).first()  # type: ignore
+    team: Team = (await db.execute(
+        select(Team).filter(Team.id == team_id, Team.campus_code == campus_code)
+    )).scalars().first()  # type: ignore
 
     if not team:
         raise NotFound("Equipe")
 
-    existing_member = db.query(TeamMember).filter(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == team_member_request.user_id
-    ).first()
+    existing_member = (await db.execute(
+        select(TeamMember).filter(
+            TeamMember.team_id == team_id,
+            TeamMember.user_id == team_member_request.user_id
+        )
+    )).scalars().first()
 
     if existing_member:
         raise Conflict("Membro já está na equipe.")
@@ -170,10 +196,12 @@ async def add_team_member_to_team(team_id: uuid.UUID,
         raise HTTPException(status_code=400, detail=validation_message)
 
     if has_role(groups, "Jogador", "Organizador"):
-        existing_member_requester = db.query(TeamMember).filter(
-            TeamMember.team_id == team_id,
-            TeamMember.user_id == user_id
-        ).first()
+        existing_member_requester = (await db.execute(
+            select(TeamMember).filter(
+                TeamMember.team_id == team_id,
+                TeamMember.user_id == user_id
+            )
+        )).scalars().first()
 
         if existing_member_requester:
             add_member_message_data = {
@@ -206,13 +234,15 @@ async def add_team_member_to_team(team_id: uuid.UUID,
         )
 
 
-@router.delete("/{team_member_id}", responses=responses_remove_member)
+@router.delete("/{team_member_id}", response_model=TeamMemberRequestAcceptedResponse,
+               responses=responses_remove_member)
+@query_budget(3)
 async def remove_team_member_from_team(team_id: uuid.UUID,
                                        team_member_request: TeamMemberDeleteRequest,
                                        team_member_id: str,
                                        response: Response,
                                        request_object: Request,
-                                       db: Session = Depends(get_db),
+                                       db: AsyncSession = Depends(get_db),
                                        current_user: dict = Depends(get_current_user)):
     """
     Remove Team Member From Team
@@ -245,23 +275,28 @@ async def remove_team_member_from_team(team_id: uuid.UUID,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    team: Team = db.query(Team).filter(
-        Team.id == team_id, Team.campus_code == campus_code).first()  # type: ignore
+    team: Team = (await db.execute(
+        select(Team).filter(Team.id == team_id, Team.campus_code == campus_code)
+    )).scalars().first()  # type: ignore
 
     if not team:
         raise NotFound("Equipe")
 
-    member: TeamMember = db.query(TeamMember).filter(TeamMember.user_id == team_member_id,
-                                                     TeamMember.team_id == team_id).first()
+    member: TeamMember = (await db.execute(
+        select(TeamMember).filter(TeamMember.user_id == team_member_id,
+                                  TeamMember.team_id == team_id)
+    )).scalars().first()
 
     if not member:
         raise NotFound("Membro")
 
     if has_role(groups, "Jogador", "Organizador"):
-        existing_member_requester = db.query(TeamMember).filter(
-            TeamMember.team_id == team_id,
-            TeamMember.user_id == user_id
-        ).first()
+        existing_member_requester = (await db.execute(
+            select(TeamMember).filter(
+                TeamMember.team_id == team_id,
+                TeamMember.user_id == user_id
+            )
+        )).scalars().first()
 
         if existing_member_requester:
             if not team_member_request.reason or not team_member_request.reason.strip():
@@ -299,3 +334,218 @@ async def remove_team_member_from_team(team_id: uuid.UUID,
             status_code=403,
             detail="Você não tem permissão para remover esse membro."
         )
+
+
+@router.post("/batch", response_model=TeamMemberBatchResponse, responses=responses_batch_members)
+@query_budget(2)
+async def change_team_members_in_batch(team_id: uuid.UUID,
+                                       batch_request: TeamMemberBatchRequest,
+                                       response: Response,
+                                       db: AsyncSession = Depends(get_db),
+                                       current_user: dict = Depends(get_current_user)):
+    """
+    Change Team Members In Batch
+
+    Envia, de uma vez, solicitações para adicionar e remover vários membros de uma equipe
+    (ex.: ao montar o elenco), com um resultado por usuário.
+
+    - **Autenticação**: Requer um token de usuário válido.
+    - **Autorização**: O usuário solicitante deve ser membro da equipe e pertencer aos grupos 'Jogador' ou 'Organizador'.
+    - **Validação**: Os usuários a adicionar são validados em uma única chamada ao serviço de
+      autenticação; quem já é ou não é membro da equipe é verificado em uma única consulta.
+    - **Corpo da Requisição**: `reason` (motivo) é obrigatório quando há remoções e vale para todas elas.
+    - As solicitações aceitas são publicadas em lote. Se o broker não confirmar todas as
+      solicitações de uma operação (adição ou remoção), todas as daquela operação voltam como
+      não aceitas, para serem reenviadas.
+    - Responde 202 se ao menos uma solicitação foi aceita, 503 se nenhuma foi aceita porque o
+      envio não foi confirmado e 400 caso contrário.
+
+    **Exemplo de Corpo da Requisição (Payload):**
+
+    .. code-block:: json
+
+       {
+         "add": ["20231012030020", "20231012030021"],
+         "remove": ["20231012030015"],
+         "reason": "Reformulação do elenco."
+       }
+
+    **Exemplo de Resposta (202 Accepted):**
+
+    .. code-block:: json
+
+       {
+         "team_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
+         "accepted": 2,
+         "rejected": 1,
+         "results": [
+           {
+             "user_id": "20231012030020",
+             "operation": "add",
+             "accepted": true,
+             "message": "Solicitação de adição de membro enviada para aprovação!"
+           },
+           {
+             "user_id": "20231012030021",
+             "operation": "add",
+             "accepted": false,
+             "message": "Membro já está na equipe."
+           },
+           {
+             "user_id": "20231012030015",
+             "operation": "remove",
+             "accepted": true,
+             "message": "Solicitação de remoção de membro enviada para aprovação!"
+           }
+         ]
+       }
+    """
+    user_id = current_user["user_matricula"]
+    campus_code = current_user["campus"]
+    groups = current_user["groups"]
+
+    to_add = list(dict.fromkeys(batch_request.add))
+    to_remove = list(dict.fromkeys(batch_request.remove))
+
+    if not to_add and not to_remove:
+        raise HTTPException(
+            status_code=400, detail="Informe pelo menos um membro para adicionar ou remover.")
+
+    if len(to_add) + len(to_remove) > MAX_BATCH_MEMBERS:
+        raise HTTPException(
+            status_code=400, detail=f"O lote pode ter no máximo {MAX_BATCH_MEMBERS} membros")
+
+    if to_remove and (not batch_request.reason or not batch_request.reason.strip()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Motivo da remoção é obrigatório."
+        )
+
+    team: Team = (await db.execute(
+        select(Team).filter(Team.id == team_id, Team.campus_code == campus_code)
+    )).scalars().first()  # type: ignore
+
+    if not team:
+        raise NotFound("Equipe")
+
+    if not has_role(groups, "Jogador", "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para alterar os membros dessa equipe."
+        )
+
+    # Quem, entre o solicitante e os usuários do lote, já é membro da equipe: uma única consulta.
+    current_members = set((await db.execute(
+        select(TeamMember.user_id).filter(
+            TeamMember.team_id == team_id,
+            TeamMember.user_id.in_({user_id, *to_add, *to_remove})
+        )
+    )).scalars().all())
+
+    if user_id not in current_members:
+        raise HTTPException(
+            status_code=403,
+            detail="Você não está nessa equipe pra alterar os membros."
+        )
+
+    in_both = set(to_add) & set(to_remove)
+    rejections: dict[tuple[str, str], str] = {}
+
+    for member_id in to_add:
+        if member_id in in_both:
+            rejections[("add", member_id)] = "O usuário não pode ser adicionado e removido na mesma solicitação."
+        elif member_id in current_members:
+            rejections[("add", member_id)] = "Membro já está na equipe."
+
+    for member_id in to_remove:
+        if member_id in in_both:
+            rejections[("remove", member_id)] = "O usuário não pode ser adicionado e removido na mesma solicitação."
+        elif member_id not in current_members:
+            rejections[("remove", member_id)] = "Membro não encontrado."
+
+    candidates_to_add = [member_id for member_id in to_add if ("add", member_id) not in rejections]
+    if candidates_to_add:
+        invalid_ids, validation_message = await find_invalid_members_with_auth_service(
+            member_ids=candidates_to_add,
+            auth_service_url="http://authapi:8000/api/v1/auth/users/"
+        )
+
+        if invalid_ids is None:
+            raise HTTPException(status_code=400, detail=validation_message)
+
+        for member_id in invalid_ids:
+            rejections[("add", member_id)] = "Membro inválido ou não encontrado."
+
+    accepted_add = [member_id for member_id in to_add if ("add", member_id) not in rejections]
+    accepted_remove = [member_id for member_id in to_remove if ("remove", member_id) not in rejections]
+
+    created_at = datetime.now(timezone.utc).isoformat()
+    confirmed_add, confirmed_remove = await gather_fail_fast(
+        publish_add_members_requested([
+            {
+                "team_id": str(team.id),
+                "user_id": member_id,
+                "request_type": "add_team_member",
+                "campus_code": team.campus_code,
+                "status": "pendent",
+                "created_at": created_at
+            }
+            for member_id in accepted_add
+        ]),
+        publish_remove_members_requested([
+            {
+                "team_id": str(team.id),
+                "user_id": member_id,
+                "request_type": "remove_team_member",
+                "reason": batch_request.reason,
+                "campus_code": team.campus_code,
+                "status": "pendent",
+                "created_at": created_at
+            }
+            for member_id in accepted_remove
+        ])
+    )
+
+    # O broker só informa quantas mensagens confirmou, não quais: se faltar alguma, todas as
+    # solicitações daquela operação são dadas como não aceitas e devem ser reenviadas.
+    unconfirmed = False
+    for operation, member_ids, confirmed in (("add", accepted_add, confirmed_add),
+                                             ("remove", accepted_remove, confirmed_remove)):
+        if confirmed < len(member_ids):
+            unconfirmed = True
+            logger.error(
+                "Broker confirmou %d de %d solicitações '%s' do lote de membros da equipe %s",
+                confirmed, len(member_ids), operation, team.id,
+                extra={"event": "team_members.batch_publish_unconfirmed"}
+            )
+            for member_id in member_ids:
+                rejections[(operation, member_id)] = (
+                    "Não foi possível confirmar o envio da solicitação. Tente novamente."
+                )
+
+    accepted_add = [member_id for member_id in accepted_add if ("add", member_id) not in rejections]
+    accepted_remove = [member_id for member_id in accepted_remove if ("remove", member_id) not in rejections]
+
+    accepted_messages = {
+        "add": "Solicitação de adição de membro enviada para aprovação!",
+        "remove": "Solicitação de remoção de membro enviada para aprovação!",
+    }
+    results = [
+        {
+            "user_id": member_id,
+            "operation": operation,
+            "accepted": (operation, member_id) not in rejections,
+            "message": rejections.get((operation, member_id), accepted_messages[operation])
+        }
+        for operation, member_ids in (("add", to_add), ("remove", to_remove))
+        for member_id in member_ids
+    ]
+
+    accepted = len(accepted_add) + len(accepted_remove)
+    if accepted:
+        response.status_code = status.HTTP_202_ACCEPTED
+    elif unconfirmed:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    else:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return {"team_id": team.id, "accepted": accepted, "rejected": len(rejections), "results": results}
@@ -1,32 +1,58 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status, Response, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Literal, Optional
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+import csv
+import io
+import re
 import uuid
+from urllib.parse import quote
+
+import orjson
 
 from datetime import datetime, timezone
 
 from auth import get_current_user, get_current_user_optional
-from messaging.publishers import publish_team_creation_requested, publish_team_deletion_requested
-from services.validate_members_http import validate_members_with_auth_service
+from messaging.publishers import publish_team_creation_requested, publish_team_creations_requested, \
+    publish_team_deletion_requested
+from services.validate_members_http import validate_members_with_auth_service, find_invalid_members_with_auth_service
+from services.team_cache import team_cache
+from services.team_reads import TEAM_COLUMNS, load_teams_from_rows, load_team_detail
 from services.verify_team_exists import verify_team_exists_with_competitions_service
 from shared.auth_utils import has_role
+from shared.concurrency import gather_fail_fast, gather_in_order
 
+from shared.database import is_unique_violation, AsyncSessionLocal
 from shared.dependencies import get_db
 from shared.exceptions import NotFound, Conflict
+from shared.log import get_logger
+from shared.pagination import encode_cursor, decode_cursor
+from shared.metrics import query_budget
 from teams.models import TeamMember
 from teams.models.teams import Team, TeamStatusEnum
 from teams.schemas.teams import TeamResponse, TeamCreateRequest, TeamUpdateRequest, TeamCreationAcceptedResponse, \
-    TeamDeleteRequest
-
-import logging
+    TeamDeleteRequest, TeamListResponse, TeamBulkCreateResponse, TeamDeletionAcceptedResponse
 
 from messaging.audit_publisher import run_async_audit, generate_log_payload, model_to_dict
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+TEAM_UNIQUE_CONSTRAINTS = ("uq_teams_campus_code_name", "uq_teams_campus_code_abbreviation")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+MAX_BULK_TEAMS = 100
+
+# Linhas (equipe x membro) buscadas por vez do cursor do servidor na exportação.
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_CSV_COLUMNS = ("id", "name", "abbreviation", "campus_code", "status", "created_at", "members")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
 
 router = APIRouter(
     prefix="/api/v1/teams",
@@ -34,11 +60,60 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=List[TeamResponse])
+def registered_team_uuids(api_data: dict) -> set[uuid.UUID]:
+    """
+    Equipes já inscritas na competição, segundo a resposta do competitionsapi. Lança
+    ValueError se algum valor não for um UUID: ignorá-lo deixaria passar membros que já
+    estão em outra equipe da competição.
+    """
+    team_uuids = set()
+    for team_uuid in api_data.get("team_uuids") or []:
+        try:
+            team_uuids.add(uuid.UUID(str(team_uuid)))
+        except ValueError:
+            logger.warning("UUID de equipe inválido na resposta do serviço de competições: %r", team_uuid,
+                           extra={"event": "competitions_service.invalid_team_uuid"})
+            raise ValueError("Resposta inválida do serviço de competições: UUID de equipe inválido.")
+    return team_uuids
+
+
+def visible_teams_filters(current_user: Optional[dict], campus: Optional[str],
+                          status: Optional[TeamStatusEnum]) -> list:
+    """
+    Filtros das equipes visíveis para o usuário, usados pela listagem e pela exportação:
+    jogadores veem apenas as equipes de que fazem parte no seu campus, os demais usuários
+    autenticados todas as do seu campus e quem não está autenticado as do campus informado.
+    """
+    if current_user:
+        filters = [Team.campus_code == current_user["campus"]]
+
+        if has_role(current_user["groups"], "Jogador"):
+            filters.append(Team.id.in_(
+                select(TeamMember.team_id).filter(TeamMember.user_id == current_user["user_matricula"])
+            ))
+
+    else:
+        if not campus:
+            raise HTTPException(
+                status_code=400, detail="Campus deve ser informado se não estiver autenticado")
+        filters = [Team.campus_code == campus]
+
+    if status:
+        filters.append(Team.status == status.value)
+
+    return filters
+
+
+@router.get("/", responses={200: {"model": TeamListResponse}})
+@query_budget(2)
 async def get_teams_by_campus(status: Optional[TeamStatusEnum] = Query(None, description="Filtrar equipes por status"),
                               campus: Optional[str] = Query(
                                   None, description="Filtrar equipes por campus"),
-                              db: Session = Depends(get_db),
+                              limit: int = Query(
+                                  DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Quantidade máxima de equipes por página"),
+                              cursor: Optional[str] = Query(
+                                  None, description="Cursor `next_cursor` retornado pela página anterior"),
+                              db: AsyncSession = Depends(get_db),
                               current_user: Optional[dict] = Depends(get_current_user_optional)):
     """
     List Teams By Campus
@@ -49,75 +124,210 @@ async def get_teams_by_campus(status: Optional[TeamStatusEnum] = Query(None, des
     - **Usuário autenticado (Jogador)**: Lista apenas as equipes das quais o usuário faz parte no seu campus.
     - **Usuário autenticado (não Jogador)**: Lista todas as equipes do campus do usuário.
     - É possível filtrar por status da equipe (ex: `approved`, `pending`).
+    - A listagem é paginada por cursor, em ordem de criação (`created_at`, `id`). Para obter a
+      próxima página, repita a requisição enviando o `next_cursor` recebido no parâmetro `cursor`.
+      Quando `next_cursor` for `null`, não há mais páginas.
 
     **Exemplo de Resposta:**
 
     .. code-block:: json
 
-       [
-         {
-           "id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
-           "name": "Titãs do Futsal",
-           "abbreviation": "TTF",
-           "status": "approved",
-           "campus_code": "NAT-CN",
-           "members": [
-             {
-               "user_id": "20231012030011"
-             },
-             {
-               "user_id": "20231012030015"
-             }
-           ]
-         },
-         {
-           "id": "b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7",
-           "name": "Guerreiros do Vôlei",
-           "abbreviation": "GDV",
-           "status": "pending",
-           "campus_code": "NAT-CN",
-           "members": [
-             {
-               "user_id": "20241012030020"
-             }
-           ]
-         }
-       ]
+       {
+         "items": [
+           {
+             "id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
+             "name": "Titãs do Futsal",
+             "abbreviation": "TTF",
+             "status": "approved",
+             "campus_code": "NAT-CN",
+             "members": [
+               {
+                 "user_id": "20231012030011"
+               },
+               {
+                 "user_id": "20231012030015"
+               }
+             ]
+           },
+           {
+             "id": "b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7",
+             "name": "Guerreiros do Vôlei",
+             "abbreviation": "GDV",
+             "status": "pending",
+             "campus_code": "NAT-CN",
+             "members": [
+               {
+                 "user_id": "20241012030020"
+               }
+             ]
+           }
+         ],
+         "next_cursor": "WyIyMDI1LTA4LTA0VDIxOjE0OjI1LjEyMyswMDowMCIsImIyYzNkNGU1Il0"
+       }
     """
-    if current_user:
-        campus_code = current_user["campus"]
-        user_id = current_user["user_matricula"]
-        groups = current_user["groups"]
-
-        if has_role(groups, "Jogador"):
-            query = (
-                db.query(Team)
-                .join(Team.members)
-                .filter(
-                    Team.campus_code == campus_code,
-                    TeamMember.user_id == user_id
-                )
-            )
-        else:
-            query = db.query(Team).filter(Team.campus_code == campus_code)
+    query = select(*TEAM_COLUMNS).filter(*visible_teams_filters(current_user, campus, status))
 
-    else:
-        if not campus:
-            raise HTTPException(
-                status_code=400, detail="Campus deve ser informado se não estiver autenticado")
-        query = db.query(Team).filter(Team.campus_code == campus)
+    if cursor:
+        try:
+            cursor_created_at, cursor_team_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    if status:
-        query = query.filter(Team.status == status.value)
+        query = query.filter(tuple_(Team.created_at, Team.id) > tuple_(cursor_created_at, cursor_team_id))
+
+    # Busca um item a mais que o limite apenas para saber se existe próxima página.
+    rows = (await db.execute(
+        query
+        .order_by(Team.created_at, Team.id)
+        .limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    # Os itens já têm o formato de TeamResponse: são renderizados direto, sem validação em tempo de execução;
+    # o schema fica documentado em `responses` e é conferido em tests/test_response_schemas.py.
+    teams = await load_teams_from_rows(db, rows)
+    return ORJSONResponse({"items": teams, "next_cursor": next_cursor})
+
+
+async def stream_team_rows(filters: list) -> AsyncIterator[list[tuple[tuple, list[str]]]]:
+    """
+    Lê as equipes e seus membros de um cursor do servidor, EXPORT_CHUNK_SIZE linhas por
+    vez, e produz a cada bloco a lista de equipes completas (dados da equipe, membros).
+
+    A consulta é um LEFT JOIN ordenado por equipe: os membros de uma equipe vêm em linhas
+    consecutivas e a última equipe de um bloco só é emitida no bloco seguinte, quando se
+    sabe que ela terminou. A sessão é aberta aqui porque o corpo da resposta é gerado
+    depois que a rota (e o get_db) já retornou.
+    """
+    query = (
+        select(Team.id, Team.name, Team.abbreviation, Team.campus_code, Team.status, Team.created_at,
+               TeamMember.user_id)
+        .outerjoin(TeamMember, TeamMember.team_id == Team.id)
+        .filter(*filters)
+        .order_by(Team.created_at, Team.id, TeamMember.user_id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        current_team, current_members = None, []
+
+        async for rows in result.partitions():
+            teams = []
+            for *team, member_id in rows:
+                team = tuple(team)
+                if current_team is not None and team[0] != current_team[0]:
+                    teams.append((current_team, current_members))
+                    current_members = []
+                current_team = team
+                if member_id is not None:
+                    current_members.append(member_id)
+
+            if teams:
+                yield teams
+
+        if current_team is not None:
+            yield [(current_team, current_members)]
+
+
+def encode_teams_ndjson(teams: list[tuple[tuple, list[str]]]) -> bytes:
+    # orjson, como o ORJSONResponse das demais rotas: UUID e datetime saem no mesmo formato da listagem.
+    return b"".join(
+        orjson.dumps({
+            "id": team_id,
+            "name": name,
+            "abbreviation": abbreviation,
+            "campus_code": campus_code,
+            "status": team_status,
+            "created_at": created_at,
+            "members": [{"user_id": member_id} for member_id in members],
+        }) + b"\n"
+        for (team_id, name, abbreviation, campus_code, team_status, created_at), members in teams
+    )
+
+
+def encode_teams_csv(teams: list[tuple[tuple, list[str]]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for (team_id, name, abbreviation, campus_code, team_status, created_at), members in teams:
+        writer.writerow([team_id, name, abbreviation, campus_code, team_status, created_at.isoformat(),
+                         ";".join(members)])
+    return buffer.getvalue()
+
+
+def export_content_disposition(campus_code: str, format: str) -> str:
+    """
+    Content-Disposition da exportação. O campus vem da URL quando não há autenticação:
+    `filename` recebe uma versão só com caracteres seguros (sem aspas, CR/LF etc.) e o
+    nome completo vai codificado em `filename*` (RFC 6266).
+    """
+    filename = f"teams-{campus_code}.{format}"
+    fallback_filename = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return f"attachment; filename=\"{fallback_filename}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+@router.get("/export", response_class=StreamingResponse)
+@query_budget(1)
+async def export_teams(format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato da exportação"),
+                       status: Optional[TeamStatusEnum] = Query(None, description="Filtrar equipes por status"),
+                       campus: Optional[str] = Query(
+                           None, description="Filtrar equipes por campus"),
+                       current_user: Optional[dict] = Depends(get_current_user_optional)):
+    """
+    Export Teams
+
+    Exporta as equipes com seus membros em NDJSON (uma equipe por linha, no mesmo formato
+    de `GET /api/v1/teams/`) ou CSV (uma equipe por linha, com os membros separados por `;`).
+
+    - A visibilidade é a mesma da listagem: jogadores exportam apenas as suas equipes, os
+      demais usuários autenticados todas as do seu campus e, sem autenticação, o parâmetro
+      `campus` é obrigatório.
+    - A resposta é enviada em streaming, na ordem de criação, à medida que as equipes são
+      lidas do banco: o uso de memória não depende do tamanho do campus.
+
+    **Exemplo de Resposta (NDJSON):**
 
-    return query.all()
+    .. code-block:: text
 
+       {"id":"a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6","name":"Titãs do Futsal","abbreviation":"TTF","campus_code":"NAT-CN","status":"active","created_at":"2025-08-04T21:14:25.123000+00:00","members":[{"user_id":"20231012030011"}]}
+       {"id":"b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7","name":"Guerreiros do Vôlei","abbreviation":"GDV","campus_code":"NAT-CN","status":"pendent","created_at":"2025-08-04T21:20:00+00:00","members":[]}
+
+    **Exemplo de Resposta (CSV):**
+
+    .. code-block:: text
+
+       id,name,abbreviation,campus_code,status,created_at,members
+       a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6,Titãs do Futsal,TTF,NAT-CN,active,2025-08-04T21:14:25.123000+00:00,20231012030011;20231012030015
+    """
+    filters = visible_teams_filters(current_user, campus, status)
+    encode = encode_teams_csv if format == "csv" else encode_teams_ndjson
+    campus_code = current_user["campus"] if current_user else campus
+
+    async def body() -> AsyncIterator[str | bytes]:
+        if format == "csv":
+            # O cabeçalho sai antes da consulta: o cliente recebe o primeiro byte imediatamente.
+            yield ",".join(EXPORT_CSV_COLUMNS) + "\r\n"
+
+        async for teams in stream_team_rows(filters):
+            yield encode(teams)
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": export_content_disposition(campus_code, format)}
+    )
 
-@router.post("/")
+
+@router.post("/", response_model=TeamCreationAcceptedResponse)
+@query_budget(3)
 async def create_team_in_campus(team_request: TeamCreateRequest,
                                 response: Response,
                                 request_object: Request,
-                                db: Session = Depends(get_db),
+                                db: AsyncSession = Depends(get_db),
                                 current_user: dict = Depends(get_current_user)):
     """
     Create Team In Campus
@@ -125,9 +335,9 @@ async def create_team_in_campus(team_request: TeamCreateRequest,
     Cria uma nova equipe e envia para aprovação. O processo envolve múltiplas validações:
 
     - Valida se os membros existem no serviço de autenticação.
-    - Verifica se o nome ou abreviação já existem no campus.
     - Consulta o serviço de competições para validar a inscrição.
     - Verifica se os membros já não estão em outra equipe na mesma competição.
+    - Garante que o nome e a abreviação sejam únicos no campus (constraints do banco, checadas na inserção).
     - Publica uma mensagem para um processo de aprovação assíncrono.
 
     **Exemplo de Corpo da Requisição (Payload):**
@@ -167,50 +377,50 @@ async def create_team_in_campus(team_request: TeamCreateRequest,
         raise HTTPException(
             status_code=400, detail="ID da competição é obrigatório")
 
-    auth_service_url = "http://authapi:8000/api/v1/auth/users/"
-    are_members_valid, validation_message = await validate_members_with_auth_service(
-        member_ids=team_request.members,
-        auth_service_url=auth_service_url
-    )
+    temp_team_id = uuid.uuid4()
 
-    if not are_members_valid:
-        raise HTTPException(status_code=400, detail=validation_message)
+    async def check_members():
+        auth_service_url = "http://authapi:8000/api/v1/auth/users/"
+        are_members_valid, validation_message = await validate_members_with_auth_service(
+            member_ids=team_request.members,
+            auth_service_url=auth_service_url
+        )
 
-    team_exists = db.query(Team).filter(
-        or_(
-            Team.name == team_request.name,
-            Team.abbreviation == team_request.abbreviation,
-        ),
-        Team.campus_code == campus_code
-    ).first()
+        if not are_members_valid:
+            raise HTTPException(status_code=400, detail=validation_message)
 
-    if team_exists:
-        raise Conflict(
-            "Nome ou abreviação já existem em outra equipe do campus")
+    async def check_competition() -> dict:
+        team_can_subscribe, teams_data = await verify_team_exists_with_competitions_service(
+            team_id=str(temp_team_id),
+            auth_service_url=f"http://competitionsapi:8007/api/v1/competitions/{team_request.competition_id}/teams/",
+            access_token=current_user["access_token"]
+        )
 
-    temp_team_id = str(uuid.uuid4())
+        if not team_can_subscribe:
+            error_message = teams_data.get(
+                'message', 'Erro desconhecido ao verificar competição')
+            raise HTTPException(
+                status_code=400, detail=f"Não foi possível inscrever a equipe: {error_message}")
 
-    team_can_subscribe, teams_data = await verify_team_exists_with_competitions_service(
-        team_id=temp_team_id,
-        auth_service_url=f"http://competitionsapi:8007/api/v1/competitions/{team_request.competition_id}/teams/",
-        access_token=current_user["access_token"]
-    )
+        return teams_data
 
-    if not team_can_subscribe:
-        error_message = teams_data.get(
-            'message', 'Erro desconhecido ao verificar competição')
-        raise HTTPException(
-            status_code=400, detail=f"Não foi possível inscrever a equipe: {error_message}")
+    # As verificações nos serviços de autenticação e de competições rodam em paralelo, mas são
+    # avaliadas na ordem original: um erro nos membros prevalece e só ele cancela a consulta
+    # à competição.
+    _, teams_data = await gather_in_order(check_members(), check_competition())
 
-    existing_team_uuids = []
-    if teams_data.get("data") and teams_data["data"].get("team_uuids"):
-        existing_team_uuids = teams_data["data"]["team_uuids"]
+    try:
+        existing_team_uuids = registered_team_uuids(teams_data.get("data") or {})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
 
     if existing_team_uuids:
-        conflicting_members = db.query(TeamMember).filter(
-            TeamMember.team_id.in_(existing_team_uuids),
-            TeamMember.user_id.in_(team_request.members)
-        ).all()
+        conflicting_members = (await db.execute(
+            select(TeamMember).filter(
+                TeamMember.team_id.in_(existing_team_uuids),
+                TeamMember.user_id.in_(team_request.members)
+            )
+        )).scalars().all()
 
         if conflicting_members:
             conflicting_user_ids = [
@@ -243,10 +453,18 @@ async def create_team_in_campus(team_request: TeamCreateRequest,
 
         try:
             db.add(new_team)
-            db.commit()
-            db.refresh(new_team)
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if is_unique_violation(e, *TEAM_UNIQUE_CONSTRAINTS):
+                raise Conflict(
+                    "Nome ou abreviação já existem em outra equipe do campus")
+            raise HTTPException(
+                status_code=500,
+                detail="Erro ao criar equipe no banco de dados"
+            )
         except Exception:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail="Erro ao criar equipe no banco de dados"
@@ -279,10 +497,318 @@ async def create_team_in_campus(team_request: TeamCreateRequest,
         )
 
 
-@router.get("/{team_id}")
-async def get_team_by_id(team_id: str,
-                         response: Response,
-                         db: Session = Depends(get_db),
+@router.post("/bulk", response_model=TeamBulkCreateResponse)
+@query_budget(4)
+async def create_teams_in_campus_bulk(teams_request: List[TeamCreateRequest],
+                                      response: Response,
+                                      db: AsyncSession = Depends(get_db),
+                                      current_user: dict = Depends(get_current_user)):
+    """
+    Create Teams In Campus (Bulk)
+
+    Cadastra várias equipes de uma vez (ex.: organizadores no início de uma competição) e as
+    envia para aprovação. As validações são as mesmas de `POST /api/v1/teams/`, feitas em lote:
+
+    - Uma única chamada ao serviço de autenticação valida os membros de todas as equipes.
+    - Uma consulta ao serviço de competições por competição presente no lote. A API de
+      competições recebe um único `team_id` por chamada: é enviado o id da primeira equipe
+      nova daquela competição, e a resposta (inscrição permitida, equipes já inscritas e
+      mínimo de membros) vale para todas as equipes do lote na mesma competição. Como os ids
+      são novos, nenhum deles pode estar inscrito ainda, e a resposta seria a mesma para
+      qualquer um.
+    - Conflitos de nome/abreviação e de membros já inscritos em outra equipe da competição,
+      inclusive entre equipes do próprio lote, são verificados com uma consulta cada.
+    - As equipes aceitas são gravadas em uma única transação e as solicitações de aprovação
+      são publicadas em lote.
+
+    Cada equipe é aceita ou rejeitada individualmente e os resultados vêm na ordem do corpo
+    da requisição. Dentro do lote, a primeira equipe a usar um nome, uma abreviação ou um
+    membro fica com ele. Responde 202 se ao menos uma equipe foi aceita e 400 caso contrário.
+    Se o broker não confirmar todas as solicitações de aprovação, as equipes aceitas continuam
+    cadastradas (pendentes), mas a mensagem de cada uma avisa que o envio não foi confirmado.
+
+    **Exemplo de Corpo da Requisição (Payload):**
+
+    .. code-block:: json
+
+       [
+         {
+           "name": "Fúria do Basquete",
+           "abbreviation": "FDB",
+           "competition_id": "c1d2e3f4-a5b6-7890-1234-567890abcdef",
+           "members": ["20231012030011", "20231012030015"]
+         },
+         {
+           "name": "Titãs do Futsal",
+           "abbreviation": "TTF",
+           "competition_id": "c1d2e3f4-a5b6-7890-1234-567890abcdef",
+           "members": ["20231012030015", "20241012030022"]
+         }
+       ]
+
+    **Exemplo de Resposta (202 Accepted):**
+
+    .. code-block:: json
+
+       {
+         "accepted": 1,
+         "rejected": 1,
+         "results": [
+           {
+             "index": 0,
+             "name": "Fúria do Basquete",
+             "accepted": true,
+             "team_id": "d4e5f6a7-b8c9-d0e1-f2a3-b4c5d6e7f8a9",
+             "message": "Solicitação de criação de equipe enviada para aprovação!"
+           },
+           {
+             "index": 1,
+             "name": "Titãs do Futsal",
+             "accepted": false,
+             "team_id": null,
+             "message": "Os seguintes membros já estão em outra equipe deste lote: 20231012030015"
+           }
+         ]
+       }
+    """
+    campus_code = current_user["campus"]
+    groups = current_user["groups"]
+
+    if not has_role(groups, "Jogador", "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para criar essas equipes."
+        )
+
+    if not teams_request:
+        raise HTTPException(
+            status_code=400, detail="Informe pelo menos uma equipe")
+
+    if len(teams_request) > MAX_BULK_TEAMS:
+        raise HTTPException(
+            status_code=400, detail=f"O lote pode ter no máximo {MAX_BULK_TEAMS} equipes")
+
+    team_ids = [uuid.uuid4() for _ in teams_request]
+    rejections: dict[int, str] = {}
+
+    def reject(index: int, message: str) -> None:
+        # Vale o primeiro motivo encontrado, na mesma ordem das validações da criação individual.
+        rejections.setdefault(index, message)
+
+    for index, team_request in enumerate(teams_request):
+        if not team_request.members:
+            reject(index, "A equipe deve ter pelo menos um membro")
+        elif len(set(team_request.members)) != len(team_request.members):
+            reject(index, "A equipe não pode ter membros repetidos")
+
+    all_members = list(dict.fromkeys(member for team_request in teams_request for member in team_request.members))
+
+    # A API de competições aceita um único team_id por chamada: a primeira equipe nova de cada
+    # competição a representa (ver a docstring).
+    representative_team_ids = {}
+    for index, team_request in enumerate(teams_request):
+        representative_team_ids.setdefault(team_request.competition_id, team_ids[index])
+    competition_ids = list(representative_team_ids)
+
+    async def check_members() -> set[str]:
+        if not all_members:
+            return set()
+
+        invalid_ids, validation_message = await find_invalid_members_with_auth_service(
+            member_ids=all_members,
+            auth_service_url="http://authapi:8000/api/v1/auth/users/"
+        )
+
+        if invalid_ids is None:
+            raise HTTPException(status_code=400, detail=validation_message)
+
+        return set(invalid_ids)
+
+    async def check_competition(competition_id: uuid.UUID) -> tuple[bool, dict]:
+        return await verify_team_exists_with_competitions_service(
+            team_id=str(representative_team_ids[competition_id]),
+            auth_service_url=f"http://competitionsapi:8007/api/v1/competitions/{competition_id}/teams/",
+            access_token=current_user["access_token"]
+        )
+
+    invalid_members, *competition_checks = await gather_fail_fast(
+        check_members(), *(check_competition(competition_id) for competition_id in competition_ids)
+    )
+
+    # competition_id -> (erro que rejeita todas as suas equipes, equipes já inscritas, mínimo de membros)
+    competitions: dict[uuid.UUID, tuple[Optional[str], set[uuid.UUID], Optional[int]]] = {}
+    for competition_id, (team_can_subscribe, teams_data) in zip(competition_ids, competition_checks):
+        api_data = teams_data.get("data") or {}
+        min_members = api_data.get("min_members_per_team")
+        try:
+            existing_team_uuids, invalid_team_uuids_error = registered_team_uuids(api_data), None
+        except ValueError as e:
+            existing_team_uuids, invalid_team_uuids_error = set(), str(e)
+
+        if not team_can_subscribe:
+            error_message = teams_data.get('message', 'Erro desconhecido ao verificar competição')
+            competition_error = f"Não foi possível inscrever a equipe: {error_message}"
+        elif invalid_team_uuids_error:
+            competition_error = invalid_team_uuids_error
+        elif not api_data:
+            competition_error = "Erro: 'data' não encontrado na resposta da API."
+        elif min_members is None:
+            competition_error = "Erro: 'min_members_per_team' não encontrado."
+        else:
+            competition_error = None
+
+        competitions[competition_id] = (competition_error, existing_team_uuids, min_members)
+
+    for index, team_request in enumerate(teams_request):
+        invalid_ids = [member for member in team_request.members if member in invalid_members]
+        if invalid_ids:
+            reject(index, f"Membros inválidos ou não encontrados: {', '.join(invalid_ids)}")
+
+        competition_error = competitions[team_request.competition_id][0]
+        if competition_error:
+            reject(index, competition_error)
+
+    # Membros do lote já inscritos em equipes das competições, em uma única consulta.
+    existing_team_uuids = set().union(*(existing for _, existing, _ in competitions.values()))
+    enrolled_members: dict[uuid.UUID, set[str]] = {}
+    if existing_team_uuids and all_members:
+        enrolled_rows = (await db.execute(
+            select(TeamMember.team_id, TeamMember.user_id).filter(
+                TeamMember.team_id.in_(existing_team_uuids),
+                TeamMember.user_id.in_(all_members)
+            )
+        )).all()
+
+        for team_id, user_id in enrolled_rows:
+            enrolled_members.setdefault(team_id, set()).add(user_id)
+
+    for index, team_request in enumerate(teams_request):
+        _, existing, min_members = competitions[team_request.competition_id]
+        enrolled = set().union(*(enrolled_members.get(team_id, set()) for team_id in existing))
+        conflicting_user_ids = [member for member in team_request.members if member in enrolled]
+        if conflicting_user_ids:
+            reject(index,
+                   f"Os seguintes membros já estão em outras equipes desta competição: {', '.join(conflicting_user_ids)}")
+
+        if min_members is not None and len(team_request.members) < min_members:
+            reject(index, f"A equipe precisa ter pelo menos {min_members} membros")
+
+    # Nomes e abreviações já usados no campus, em uma única consulta.
+    taken_names, taken_abbreviations = set(), set()
+    candidates = [index for index in range(len(teams_request)) if index not in rejections]
+    if candidates:
+        taken_rows = (await db.execute(
+            select(Team.name, Team.abbreviation).filter(
+                Team.campus_code == campus_code,
+                or_(
+                    Team.name.in_({teams_request[index].name for index in candidates}),
+                    Team.abbreviation.in_({teams_request[index].abbreviation for index in candidates})
+                )
+            )
+        )).all()
+
+        taken_names = {name for name, _ in taken_rows}
+        taken_abbreviations = {abbreviation for _, abbreviation in taken_rows}
+
+    # Conflitos entre as equipes do próprio lote: quem aparece primeiro fica com o nome, a
+    # abreviação e os membros.
+    claimed_members: dict[uuid.UUID, set[str]] = {}
+    for index in candidates:
+        team_request = teams_request[index]
+        if team_request.name in taken_names or team_request.abbreviation in taken_abbreviations:
+            reject(index, "Nome ou abreviação já existem em outra equipe do campus")
+            continue
+
+        claimed = claimed_members.setdefault(team_request.competition_id, set())
+        conflicting_user_ids = [member for member in team_request.members if member in claimed]
+        if conflicting_user_ids:
+            reject(index,
+                   f"Os seguintes membros já estão em outra equipe deste lote: {', '.join(conflicting_user_ids)}")
+            continue
+
+        taken_names.add(team_request.name)
+        taken_abbreviations.add(team_request.abbreviation)
+        claimed.update(team_request.members)
+
+    new_teams = [
+        Team(
+            id=team_ids[index],
+            name=team_request.name,
+            abbreviation=team_request.abbreviation,
+            campus_code=campus_code,
+            members=[TeamMember(user_id=user_id)
+                     for user_id in team_request.members]
+        )
+        for index, team_request in enumerate(teams_request) if index not in rejections
+    ]
+
+    if new_teams:
+        try:
+            db.add_all(new_teams)
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if is_unique_violation(e, *TEAM_UNIQUE_CONSTRAINTS):
+                # Outra requisição gravou o mesmo nome/abreviação depois da verificação.
+                raise Conflict(
+                    "Nome ou abreviação já existem em outra equipe do campus")
+            raise HTTPException(
+                status_code=500,
+                detail="Erro ao criar equipes no banco de dados"
+            )
+        except Exception:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail="Erro ao criar equipes no banco de dados"
+            )
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        confirmed = await publish_team_creations_requested([
+            {
+                "team_id": str(team_ids[index]),
+                "request_type": "approve_team",
+                "campus_code": campus_code,
+                "status": "pendent",
+                "competition_id": str(team_request.competition_id),
+                "created_at": created_at
+            }
+            for index, team_request in enumerate(teams_request) if index not in rejections
+        ])
+    else:
+        confirmed = 0
+
+    accepted_message = "Solicitação de criação de equipe enviada para aprovação!"
+    if confirmed < len(new_teams):
+        # O broker só informa quantas mensagens confirmou, não quais: todas as equipes
+        # gravadas ficam marcadas como pendentes de confirmação.
+        logger.error(
+            "Broker confirmou %d de %d solicitações de aprovação do cadastro em lote (equipes: %s)",
+            confirmed, len(new_teams), ", ".join(str(team.id) for team in new_teams),
+            extra={"event": "teams.bulk_publish_unconfirmed"}
+        )
+        accepted_message = ("Equipe cadastrada, mas o envio da solicitação de aprovação não foi confirmado. "
+                            "Ela permanece pendente.")
+
+    results = [
+        {
+            "index": index,
+            "name": team_request.name,
+            "accepted": index not in rejections,
+            "team_id": team_ids[index] if index not in rejections else None,
+            "message": rejections.get(index, accepted_message)
+        }
+        for index, team_request in enumerate(teams_request)
+    ]
+
+    response.status_code = status.HTTP_202_ACCEPTED if new_teams else status.HTTP_400_BAD_REQUEST
+    return {"accepted": len(new_teams), "rejected": len(rejections), "results": results}
+
+
+@router.get("/{team_id}", responses={200: {"model": TeamResponse}})
+@query_budget(2)
+async def get_team_by_id(team_id: uuid.UUID,
+                         db: AsyncSession = Depends(get_db),
                          current_user: dict = Depends(get_current_user)):
     """
     Get Team By Id
@@ -313,15 +839,18 @@ async def get_team_by_id(team_id: str,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    team: Team = db.query(Team).filter(
-        Team.id == team_id, Team.campus_code == campus_code).first()  # type: ignore
+    team_detail = team_cache.get(campus_code, team_id)
+    if team_detail is None:
+        cache_generation = team_cache.generation
+        team_detail = await load_team_detail(db, campus_code, team_id)
 
-    if not team:
-        raise NotFound("Equipe")
+        if not team_detail:
+            raise NotFound("Equipe")
+
+        team_cache.set(team_detail, cache_generation)
 
     if has_role(groups, "Jogador", "Organizador"):
-        response.status_code = status.HTTP_200_OK
-        return team
+        return ORJSONResponse(team_detail)
 
     else:
         raise HTTPException(
@@ -330,12 +859,13 @@ async def get_team_by_id(team_id: str,
         )
 
 
-@router.delete("/{team_id}")
-async def delete_team_by_id(team_id: str,
+@router.delete("/{team_id}", response_model=TeamDeletionAcceptedResponse)
+@query_budget(1)
+async def delete_team_by_id(team_id: uuid.UUID,
                             team_request: TeamDeleteRequest,
                             response: Response,
                             request_object: Request,
-                            db: Session = Depends(get_db),
+                            db: AsyncSession = Depends(get_db),
                             current_user: dict = Depends(get_current_user)):
     """
     Delete Team By Id
@@ -365,8 +895,9 @@ async def delete_team_by_id(team_id: str,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    team: Team = db.query(Team).filter(
-        Team.id == team_id, Team.campus_code == campus_code).first()  # type: ignore
+    team: Team = (await db.execute(
+        select(Team).filter(Team.id == team_id, Team.campus_code == campus_code)
+    )).scalars().first()  # type: ignore
 
     if not team:
         raise NotFound("Equipe")
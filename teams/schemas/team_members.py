@@ -2,14 +2,46 @@ from pydantic import BaseModel
 
 import uuid
 
+from typing import List, Literal, Optional
+
 
 class TeamMemberResponse(BaseModel):
     user_id: str
 
 
+class TeamRosterMemberResponse(BaseModel):
+    user_id: str
+    team_id: uuid.UUID
+
+
+class TeamMemberRequestAcceptedResponse(BaseModel):
+    message: str
+    team_id: uuid.UUID
+    member_id: str
+
+
 class TeamMemberDeleteRequest(BaseModel):
     reason: str
 
 
 class TeamMemberCreateRequest(BaseModel):
-    user_id: str
\ No newline at end of file
+    user_id: str
+
+class TeamMemberBatchRequest(BaseModel):
+    add: List[str] = []
+    remove: List[str] = []
+    reason: Optional[str] = None
+
+
+class TeamMemberBatchItemResult(BaseModel):
+    user_id: str
+    operation: Literal["add", "remove"]
+    accepted: bool
+    message: str
+
+
+class TeamMemberBatchResponse(BaseModel):
+    team_id: uuid.UUID
+    accepted: int
+    rejected: int
+    results: List[TeamMemberBatchItemResult]
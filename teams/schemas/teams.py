@@ -24,11 +24,35 @@ class TeamResponse(BaseModel):
     }
 
 
+class TeamListResponse(BaseModel):
+    items: List[TeamResponse]
+    next_cursor: Optional[str] = None
+
+
 class TeamCreationAcceptedResponse(BaseModel):
     message: str
     team_id: uuid.UUID
 
 
+class TeamDeletionAcceptedResponse(BaseModel):
+    message: str
+    team_id: uuid.UUID
+
+
+class TeamBulkCreateItemResult(BaseModel):
+    index: int
+    name: str
+    accepted: bool
+    team_id: Optional[uuid.UUID] = None
+    message: str
+
+
+class TeamBulkCreateResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[TeamBulkCreateItemResult]
+
+
 class TeamDeleteRequest(BaseModel):
     reason: Optional[str]
 
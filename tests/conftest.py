@@ -0,0 +1,103 @@
+import os
+import tempfile
+import uuid
+
+os.environ.setdefault(
+    "SQLALCHEMY_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'teams_service_tests.db')}"
+)
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+# Toda rota que passar do orçamento declarado com @query_budget falha o teste.
+os.environ.setdefault("SQL_QUERY_BUDGET_MODE", "raise")
+
+import httpx
+import pytest
+from jose import jwt
+from sqlalchemy import event
+
+from benchmarks.stand_ins import AuthServiceStandIn, CompetitionsServiceStandIn, PublisherStandIn
+from main import app
+from messaging.publishers import publisher
+from services.http_clients import downstream_clients, AUTH_SERVICE, COMPETITIONS_SERVICE
+from services.team_cache import team_cache
+from services.validate_members_http import member_existence_cache
+from shared.database import Base, engine, SessionLocal, async_engine
+from teams.models import Team, TeamMember
+from teams.models.teams import TeamStatusEnum
+
+CAMPUS_CODE = "TEST"
+
+
+def build_token(user_id: str, groups: list[str]) -> str:
+    claims = {"matricula": user_id, "campus": CAMPUS_CODE, "groups": groups}
+    return jwt.encode(claims, os.environ["JWT_SECRET_KEY"], algorithm="HS256")
+
+
+def seed_teams(teams: int, members_per_team: int) -> list[tuple[uuid.UUID, list[str]]]:
+    """Recria as tabelas com `teams` equipes ativas em CAMPUS_CODE, cada uma com seus membros."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    team_cache.clear()
+
+    seeded = []
+    with SessionLocal() as db:
+        for i in range(teams):
+            team_id = uuid.uuid4()
+            member_ids = [f"{i:06d}{j:02d}" for j in range(members_per_team)]
+            db.add(Team(
+                id=team_id,
+                name=f"Equipe {i}",
+                abbreviation=f"{i:03d}",
+                campus_code=CAMPUS_CODE,
+                status=TeamStatusEnum.active,
+                members=[TeamMember(user_id=member_id) for member_id in member_ids]
+            ))
+            seeded.append((team_id, member_ids))
+        db.commit()
+
+    return seeded
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def sql_statements():
+    """Lista das instruções SQL executadas pelas rotas (engine assíncrono) durante o teste."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def downstream_stand_ins(monkeypatch):
+    """Substitui o authapi, o competitionsapi e a publicação no RabbitMQ por stand-ins em processo."""
+    member_existence_cache.clear()
+    publisher_stand_in = PublisherStandIn()
+    monkeypatch.setattr(publisher, "publish", publisher_stand_in.publish)
+    monkeypatch.setattr(publisher, "publish_many", publisher_stand_in.publish_many)
+    monkeypatch.setattr(publisher, "publish_each", publisher_stand_in.publish_each)
+
+    downstream_clients.set_transport(AUTH_SERVICE, AuthServiceStandIn().transport())
+    downstream_clients.set_transport(COMPETITIONS_SERVICE, CompetitionsServiceStandIn().transport())
+    await downstream_clients.close()
+
+    yield publisher_stand_in
+
+    downstream_clients.set_transport(AUTH_SERVICE, None)
+    downstream_clients.set_transport(COMPETITIONS_SERVICE, None)
+    await downstream_clients.close()
@@ -0,0 +1,83 @@
+"""
+Pipeline de auditoria em lote: logs não confirmados pelo broker são reenviados até
+max_attempts tentativas e, depois disso, descartados com registro em ERROR.
+"""
+import json
+import logging
+
+import pytest
+
+from messaging.audit_publisher import AuditPipeline
+from messaging.publishers import publisher
+
+pytestmark = pytest.mark.anyio
+
+
+def log_payload(entity_id: str) -> dict:
+    return {"event_type": "team.updated", "entity_type": "team", "entity_id": entity_id, "correlation_id": entity_id}
+
+
+def new_pipeline(max_attempts: int = 3) -> AuditPipeline:
+    return AuditPipeline(max_size=100, batch_size=10, flush_interval=10, max_attempts=max_attempts)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Broker falso: registra as tentativas por entity_id e confirma só os ids em `confirm`."""
+    state = {"attempts": [], "confirm": set(), "fail": False}
+
+    async def publish_each(exchange_name, messages):
+        if state["fail"]:
+            raise ConnectionError("broker indisponível")
+        entity_ids = [json.loads(message.body)[0][0]["entity_id"] for _, message in messages]
+        state["attempts"].append(entity_ids)
+        return [entity_id in state["confirm"] for entity_id in entity_ids]
+
+    monkeypatch.setattr(publisher, "publish_each", publish_each)
+    return state
+
+
+async def test_unconfirmed_logs_are_retried_in_the_next_cycle(broker):
+    pipeline = new_pipeline()
+    broker["confirm"] = {"a"}
+    for entity_id in ("a", "b"):
+        pipeline.submit(log_payload(entity_id))
+
+    await pipeline._drain()
+    assert broker["attempts"] == [["a", "b"]]
+
+    broker["confirm"] = {"a", "b", "c"}
+    pipeline.submit(log_payload("c"))
+    await pipeline._drain()
+
+    assert broker["attempts"] == [["a", "b"], ["b", "c"]]
+    stats = pipeline.stats()
+    assert (stats["published"], stats["retried"], stats["failed"]) == (3, 1, 0)
+
+
+async def test_logs_are_dropped_with_error_after_max_attempts(broker, caplog):
+    pipeline = new_pipeline(max_attempts=2)
+    broker["fail"] = True
+    pipeline.submit(log_payload("a"))
+
+    with caplog.at_level(logging.ERROR, logger="messaging.audit_publisher"):
+        await pipeline._drain()
+        await pipeline._drain()
+        await pipeline._drain()
+
+    assert pipeline.stats()["retried"] == 1
+    assert pipeline.stats()["failed"] == 1
+    assert pipeline.stats()["published"] == 0
+    dropped = [record for record in caplog.records if getattr(record, "event", None) == "audit.dropped"]
+    assert len(dropped) == 1
+    assert "correlation_id a" in dropped[0].getMessage()
+
+
+async def test_stop_retries_pending_logs_before_giving_up(broker):
+    pipeline = new_pipeline(max_attempts=3)
+    pipeline.submit(log_payload("a"))
+
+    await pipeline.stop()
+
+    assert broker["attempts"] == [["a"], ["a"], ["a"]]
+    assert pipeline.stats()["failed"] == 1
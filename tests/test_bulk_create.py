@@ -0,0 +1,64 @@
+import uuid
+
+import pytest
+
+from benchmarks.stand_ins import CompetitionsServiceStandIn
+from messaging.publishers import publisher
+from services.http_clients import downstream_clients, COMPETITIONS_SERVICE
+from tests.conftest import build_token, seed_teams
+
+pytestmark = pytest.mark.anyio
+
+
+def bulk_payload(teams: int) -> list[dict]:
+    competition_id = str(uuid.uuid4())
+    return [
+        {"name": f"Lote {i}", "abbreviation": f"L{i:02d}", "competition_id": competition_id, "members": [f"bulk-{i}"]}
+        for i in range(teams)
+    ]
+
+
+async def create_bulk(client, payload: list[dict]):
+    headers = {"Authorization": f"Bearer {build_token('organizer', ['Organizador'])}"}
+    return await client.post("/api/v1/teams/bulk", headers=headers, json=payload)
+
+
+async def test_bulk_create_publishes_one_approval_per_team(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+
+    response = await create_bulk(client, bulk_payload(3))
+
+    assert response.status_code == 202
+    assert response.json()["accepted"] == 3
+    assert downstream_stand_ins.published == 3
+    assert all(result["message"] == "Solicitação de criação de equipe enviada para aprovação!"
+               for result in response.json()["results"])
+
+
+async def test_bulk_create_marks_unconfirmed_approvals(client, downstream_stand_ins, monkeypatch):
+    seed_teams(0, members_per_team=0)
+
+    async def confirm_one(exchange_name, messages):
+        return 1
+
+    monkeypatch.setattr(publisher, "publish_many", confirm_one)
+
+    response = await create_bulk(client, bulk_payload(3))
+
+    assert response.status_code == 202
+    results = response.json()["results"]
+    assert all(result["accepted"] and result["team_id"] for result in results)
+    assert all("não foi confirmado" in result["message"] for result in results)
+
+
+async def test_bulk_create_rejects_competition_with_invalid_team_uuid(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+    downstream_clients.set_transport(COMPETITIONS_SERVICE, CompetitionsServiceStandIn(team_uuids=[42, "x"]).transport())
+    await downstream_clients.close()
+
+    response = await create_bulk(client, bulk_payload(2))
+
+    assert response.status_code == 400
+    assert [result["accepted"] for result in response.json()["results"]] == [False, False]
+    assert all("UUID de equipe inválido" in result["message"] for result in response.json()["results"])
+    assert downstream_stand_ins.published == 0
@@ -0,0 +1,212 @@
+"""
+Concorrência e retentativa do consumidor: ordem por equipe no TeamPartitionedDispatcher,
+lotes do BatchingConsumer (tamanho, janela e reprocessamento individual) e o roteamento
+da RetryPolicy entre as filas de atraso e a DLQ.
+"""
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from benchmarks.stand_ins import InMemoryIncomingMessage
+from messaging import consumers
+from messaging.publishers import publisher
+from messaging.retry import (
+    RetryPolicy, retry_exchange_name, ATTEMPT_HEADER, ORIGINAL_QUEUE_HEADER, DEAD_LETTER_EXCHANGE
+)
+from services.crud import ConcurrentTransitionError
+
+pytestmark = pytest.mark.anyio
+
+
+def incoming(team_id="team-a", routing_key=consumers.MEMBER_ADD_REQUEST_ROUTING_KEY, headers=None, **data):
+    body = {"team_id": team_id, "campus_code": "TEST", "request_type": "add_team_member", "status": "approved", **data}
+    return InMemoryIncomingMessage(json.dumps(body).encode(), routing_key, headers=headers)
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Mensagens republicadas pela política de retentativa: (exchange, routing key, headers)."""
+    sent = []
+
+    async def publish(exchange_name, routing_key, message):
+        sent.append((exchange_name, routing_key, dict(message.headers)))
+
+    monkeypatch.setattr(publisher, "publish", publish)
+    return sent
+
+
+async def test_dispatcher_keeps_team_order_and_runs_teams_in_parallel():
+    events = []
+    running = set()
+    max_running = 0
+
+    async def handler(message):
+        nonlocal max_running
+        data = json.loads(message.body)
+        running.add(message)
+        max_running = max(max_running, len(running))
+        events.append(("start", data["team_id"], data["user_id"]))
+        # As primeiras mensagens de cada equipe demoram mais: sem a cadeia por equipe, a ordem se inverteria.
+        await asyncio.sleep(0.03 if data["user_id"] == "0" else 0.001)
+        events.append(("end", data["team_id"], data["user_id"]))
+        running.discard(message)
+
+    dispatcher = consumers.TeamPartitionedDispatcher(handler, concurrency=10)
+    messages = [incoming(team, user_id=str(position)) for position in range(3) for team in ("team-a", "team-b")]
+    await asyncio.gather(*(dispatcher.on_message(message) for message in messages))
+
+    for team in ("team-a", "team-b"):
+        team_events = [(kind, user_id) for kind, event_team, user_id in events if event_team == team]
+        assert team_events == [(kind, str(position)) for position in range(3) for kind in ("start", "end")]
+    assert max_running == 2
+    assert dispatcher.active_partitions == 0
+
+
+async def test_dispatcher_respects_concurrency_limit():
+    running = 0
+    max_running = 0
+
+    async def handler(message):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    dispatcher = consumers.TeamPartitionedDispatcher(handler, concurrency=2)
+    await asyncio.gather(*(dispatcher.on_message(incoming(f"team-{index}", user_id="u")) for index in range(6)))
+
+    assert max_running == 2
+
+
+@pytest.fixture
+def crud_calls(monkeypatch):
+    """Substitui as funções de CRUD do consumidor e registra os lotes e mensagens recebidos."""
+    calls = {"batch": [], "single": [], "fail_batch": False, "fail_users": set()}
+
+    def apply_batch(messages_data, idempotency_keys):
+        calls["batch"].append([data["user_id"] for data in messages_data])
+        if calls["fail_batch"]:
+            raise ValueError("lote inválido")
+        return [{} for _ in messages_data]
+
+    def apply_one(data, idempotency_key):
+        calls["single"].append(data["user_id"])
+        if data["user_id"] in calls["fail_users"]:
+            raise ValueError("mensagem inválida")
+        return {}
+
+    monkeypatch.setattr(consumers, "update_teams_from_requests_in_db", apply_batch)
+    monkeypatch.setattr(consumers, "update_team_from_request_in_db", apply_one)
+    return calls
+
+
+async def test_batch_flushes_when_full(crud_calls):
+    consumer = consumers.BatchingConsumer(max_size=3, max_wait=10)
+    messages = [incoming(user_id=str(index)) for index in range(3)]
+
+    for message in messages:
+        await consumer.on_message(message)
+    await consumer.close()
+
+    assert crud_calls["batch"] == [["0", "1", "2"]]
+    assert [message.outcome for message in messages] == ["ack"] * 3
+
+
+async def test_batch_flushes_after_window(crud_calls):
+    consumer = consumers.BatchingConsumer(max_size=10, max_wait=0.02)
+    messages = [incoming(user_id=str(index)) for index in range(2)]
+
+    for message in messages:
+        await consumer.on_message(message)
+    assert crud_calls["batch"] == []
+
+    await asyncio.sleep(0.05)
+    await consumer.close()
+
+    assert crud_calls["batch"] == [["0", "1"]]
+    assert [message.outcome for message in messages] == ["ack"] * 2
+
+
+async def test_failed_batch_is_reprocessed_one_by_one(crud_calls, published):
+    crud_calls["fail_batch"] = True
+    crud_calls["fail_users"] = {"1"}
+    consumer = consumers.BatchingConsumer(max_size=3, max_wait=10)
+    messages = [incoming(user_id=str(index)) for index in range(3)]
+
+    for message in messages:
+        await consumer.on_message(message)
+    await consumer.close()
+
+    assert crud_calls["batch"] == [["0", "1", "2"]]
+    assert crud_calls["single"] == ["0", "1", "2"]
+    assert [message.outcome for message in messages] == ["ack"] * 3
+    assert [(exchange, routing_key) for exchange, routing_key, _ in published] == [
+        (DEAD_LETTER_EXCHANGE, consumers.MEMBER_ADD_REQUEST_QUEUE)
+    ]
+
+
+@pytest.mark.parametrize("attempt, expected_exchange, expected_attempt", [
+    (None, retry_exchange_name(0), 2),
+    (2, retry_exchange_name(1), 3),
+    (3, retry_exchange_name(1), 4),
+    (4, DEAD_LETTER_EXCHANGE, 4),
+], ids=["first", "second", "past_last_level", "max_attempts"])
+async def test_retry_header_selects_delay_queue_then_dlq(published, attempt, expected_exchange, expected_attempt):
+    policy = RetryPolicy(delays_ms=[100, 1000], max_attempts=4)
+    if attempt is None:
+        message = incoming()
+    else:
+        # Reentregue pelo REQUEUE_EXCHANGE: a routing key é o nome da fila de origem.
+        message = incoming(routing_key=consumers.MEMBER_ADD_REQUEST_QUEUE, headers={
+            ATTEMPT_HEADER: attempt, ORIGINAL_QUEUE_HEADER: consumers.MEMBER_ADD_REQUEST_QUEUE
+        })
+
+    await policy.handle_failure(message, ConcurrentTransitionError("corrida"), consumers.QUEUE_BY_ROUTING_KEY)
+
+    [(exchange, routing_key, headers)] = published
+    assert (exchange, routing_key) == (expected_exchange, consumers.MEMBER_ADD_REQUEST_QUEUE)
+    assert headers[ATTEMPT_HEADER] == expected_attempt
+    assert headers[ORIGINAL_QUEUE_HEADER] == consumers.MEMBER_ADD_REQUEST_QUEUE
+    assert message.outcome == "ack"
+
+
+async def test_permanent_error_goes_straight_to_dlq(published):
+    policy = RetryPolicy(delays_ms=[100, 1000], max_attempts=4)
+    message = incoming()
+
+    await policy.handle_failure(message, ValueError("dados inválidos"), consumers.QUEUE_BY_ROUTING_KEY)
+
+    assert [(exchange, headers[ATTEMPT_HEADER]) for exchange, _, headers in published] == [(DEAD_LETTER_EXCHANGE, 1)]
+    assert message.outcome == "ack"
+
+
+async def test_message_is_requeued_when_retry_publish_fails(monkeypatch):
+    async def broken_publish(exchange_name, routing_key, message):
+        raise ConnectionError("broker indisponível")
+
+    monkeypatch.setattr(publisher, "publish", broken_publish)
+    message = incoming()
+
+    await RetryPolicy(delays_ms=[100], max_attempts=2).handle_failure(
+        message, RuntimeError("db"), consumers.QUEUE_BY_ROUTING_KEY
+    )
+
+    assert message.outcome == "nack"
+
+
+async def test_consumer_failure_is_scheduled_for_retry(monkeypatch, published):
+    def apply_one(data, idempotency_key):
+        raise RuntimeError("db indisponível")
+
+    monkeypatch.setattr(consumers, "update_team_from_request_in_db", apply_one)
+    message = incoming(str(uuid.uuid4()), routing_key=consumers.TEAM_CREATION_REQUEST_ROUTING_KEY)
+
+    await consumers.on_message(message)
+
+    [(exchange, routing_key, headers)] = published
+    assert (exchange, routing_key) == (retry_exchange_name(0), consumers.TEAM_CREATION_REQUEST_QUEUE)
+    assert headers[ATTEMPT_HEADER] == 2
+    assert message.outcome == "ack"
@@ -0,0 +1,85 @@
+"""
+POST /api/v1/teams/ consulta o authapi e o competitionsapi em paralelo, mas avalia os
+resultados na ordem original: primeiro os membros, depois a competição.
+"""
+import uuid
+
+import pytest
+
+from benchmarks.stand_ins import AuthServiceStandIn, CompetitionsServiceStandIn
+from services.http_clients import downstream_clients, AUTH_SERVICE, COMPETITIONS_SERVICE
+from tests.conftest import build_token, seed_teams
+
+pytestmark = pytest.mark.anyio
+
+COMPETITION_ERROR = "Não foi possível inscrever a equipe"
+
+
+async def create_team(client, members: list[str]):
+    headers = {"Authorization": f"Bearer {build_token('organizer', ['Organizador'])}"}
+    return await client.post("/api/v1/teams/", headers=headers, json={
+        "name": "Nova equipe", "abbreviation": "NOV", "competition_id": str(uuid.uuid4()), "members": members,
+    })
+
+
+async def install_stand_ins(auth: AuthServiceStandIn, competitions: CompetitionsServiceStandIn) -> None:
+    downstream_clients.set_transport(AUTH_SERVICE, auth.transport())
+    downstream_clients.set_transport(COMPETITIONS_SERVICE, competitions.transport())
+    await downstream_clients.close()
+
+
+async def test_invalid_members_cancel_competition_check(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+    competitions = CompetitionsServiceStandIn(latency=5)
+    await install_stand_ins(AuthServiceStandIn(invalid_ids={"ghost"}), competitions)
+
+    response = await create_team(client, ["ghost"])
+
+    assert response.status_code == 400
+    assert COMPETITION_ERROR not in response.json()["detail"]
+    assert competitions.cancelled == 1
+
+
+async def test_members_error_wins_over_earlier_competition_error(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+    await install_stand_ins(AuthServiceStandIn(invalid_ids={"ghost"}, latency=0.05),
+                            CompetitionsServiceStandIn(error_rate=1))
+
+    response = await create_team(client, ["ghost"])
+
+    assert response.status_code == 400
+    assert COMPETITION_ERROR not in response.json()["detail"]
+
+
+async def test_competition_error_after_valid_members(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+    auth = AuthServiceStandIn(latency=0.05)
+    await install_stand_ins(auth, CompetitionsServiceStandIn(error_rate=1))
+
+    response = await create_team(client, ["player"])
+
+    assert response.status_code == 400
+    assert COMPETITION_ERROR in response.json()["detail"]
+    assert auth.cancelled == 0
+
+
+async def test_invalid_team_uuid_from_competitions_is_bad_gateway(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+    await install_stand_ins(AuthServiceStandIn(),
+                            CompetitionsServiceStandIn(team_uuids=[str(uuid.uuid4()), "não-é-uuid"]))
+
+    response = await create_team(client, ["player"])
+
+    assert response.status_code == 502
+    assert downstream_stand_ins.published == 0
+
+
+async def test_duplicate_abbreviation_is_conflict(client, downstream_stand_ins):
+    seed_teams(0, members_per_team=0)
+    await install_stand_ins(AuthServiceStandIn(), CompetitionsServiceStandIn())
+
+    first = await create_team(client, ["player"])
+    duplicate = await create_team(client, ["other-player"])
+
+    assert first.status_code == 202
+    assert duplicate.status_code == 409
@@ -0,0 +1,134 @@
+"""
+services/crud aplica um lote de mensagens agrupando as escritas por tipo
+(_split_into_runs/_write_group): o resultado e o estado final têm de ser os mesmos da
+aplicação uma a uma, em ordem.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+import services.crud as crud
+from shared.database import Base, engine, SessionLocal
+from teams.models import Team, TeamMember
+from teams.models.teams import TeamStatusEnum
+
+CAMPUS = "TEST"
+
+PENDENT, ACTIVE, CLOSED, OTHER_ACTIVE = (uuid.uuid4() for _ in range(4))
+
+
+@pytest.fixture(autouse=True)
+def audits(monkeypatch):
+    published = []
+    monkeypatch.setattr(crud, "run_async_audit", published.append)
+    return published
+
+
+def seed():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        for index, (team_id, status) in enumerate([
+            (PENDENT, TeamStatusEnum.pendent),
+            (ACTIVE, TeamStatusEnum.active),
+            (CLOSED, TeamStatusEnum.closed),
+            (OTHER_ACTIVE, TeamStatusEnum.active),
+        ]):
+            db.add(Team(id=team_id, name=f"Equipe {index}", abbreviation=f"{index:03d}", campus_code=CAMPUS,
+                        status=status, members=[TeamMember(user_id="m1")]))
+        db.commit()
+
+
+def state():
+    with SessionLocal() as db:
+        teams = db.scalars(select(Team).options(selectinload(Team.members)).order_by(Team.id))
+        return [(team.id, team.status, sorted(member.user_id for member in team.members)) for team in teams]
+
+
+def message(team_id, request_type, status="approved", user_id=None):
+    data = {"team_id": str(team_id), "campus_code": CAMPUS, "request_type": request_type, "status": status}
+    if user_id is not None:
+        data["user_id"] = user_id
+    return data
+
+
+BATCH = [
+    # Depende da mensagem anterior: o membro só entra depois da aprovação no mesmo lote.
+    message(PENDENT, "approve_team"),
+    message(PENDENT, "add_team_member", user_id="u1"),
+    # Inserções duplicadas: membro já existente e o mesmo membro novo duas vezes.
+    message(ACTIVE, "add_team_member", user_id="m1"),
+    message(ACTIVE, "add_team_member", user_id="u2"),
+    message(ACTIVE, "add_team_member", user_id="u2"),
+    message(OTHER_ACTIVE, "add_team_member", user_id="u2"),
+    message(ACTIVE, "remove_team_member", user_id="u2"),
+    message(ACTIVE, "remove_team_member", user_id="u2"),
+    message(ACTIVE, "add_team_member", "rejected", user_id="u3"),
+    message(ACTIVE, "remove_team_member", "pending", user_id="m1"),
+    message(ACTIVE, "delete_team", "unknown"),
+    message(OTHER_ACTIVE, "delete_team", "rejected"),
+    message(OTHER_ACTIVE, "delete_team"),
+]
+
+
+@pytest.mark.parametrize("insert_by_dialect", [crud.INSERT_BY_DIALECT, {}], ids=["on_conflict", "generic"])
+def test_batch_matches_one_at_a_time(monkeypatch, audits, insert_by_dialect):
+    monkeypatch.setattr(crud, "INSERT_BY_DIALECT", insert_by_dialect)
+
+    seed()
+    one_at_a_time = [crud.update_team_from_request_in_db(data) for data in BATCH]
+    expected_state, expected_audits = state(), [audit["event_type"] for audit in audits]
+
+    audits.clear()
+    seed()
+    assert crud.update_teams_from_requests_in_db(BATCH) == one_at_a_time
+    assert state() == expected_state
+    assert [audit["event_type"] for audit in audits] == expected_audits
+
+    assert one_at_a_time[1]["message"] == "Membro adicionado à equipe."
+    assert one_at_a_time[2]["message"] == one_at_a_time[4]["message"] == "Membro já existe na equipe."
+    assert one_at_a_time[7]["message"] == "Membro não encontrado para remoção."
+
+
+def test_split_into_runs_breaks_on_dependencies():
+    requests = [crud._parse_request(data) for data in BATCH[:8]]
+    runs = crud._split_into_runs(list(enumerate(requests)))
+
+    assert [[index for index, _ in run] for run in runs] == [[0], [1, 2, 3], [4, 5], [6], [7]]
+
+
+def test_invalid_message_rolls_back_the_batch():
+    seed()
+    before = state()
+
+    with pytest.raises(ValueError):
+        crud.update_teams_from_requests_in_db([
+            message(PENDENT, "approve_team"),
+            message(CLOSED, "add_team_member", user_id="u1"),
+        ])
+
+    assert state() == before
+
+
+@pytest.mark.parametrize("data", [
+    message(PENDENT, "approve_team"),
+    message(ACTIVE, "delete_team"),
+    message(ACTIVE, "add_team_member", user_id="u1"),
+    message(ACTIVE, "remove_team_member", user_id="m1"),
+], ids=lambda data: data["request_type"])
+@pytest.mark.parametrize("batch", [False, True], ids=["single", "batch"])
+def test_lost_conditional_write_is_retryable(monkeypatch, data, batch):
+    """A escrita não alterou nada, mas a releitura mostra a transição válida: outro consumidor venceu a corrida."""
+    seed()
+    before = state()
+    monkeypatch.setattr(crud, "_write_group", lambda *args: set())
+
+    with pytest.raises(crud.ConcurrentTransitionError):
+        if batch:
+            crud.update_teams_from_requests_in_db([data, message(OTHER_ACTIVE, "delete_team", "rejected")])
+        else:
+            crud.update_team_from_request_in_db(data)
+
+    assert state() == before
@@ -0,0 +1,121 @@
+"""
+Deduplicação do consumidor (messaging/dedup): ordem das chaves de idempotência, TTL da
+camada em memória, tabela processed_messages e o efeito no CRUD.
+"""
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+import services.crud as crud
+from messaging.dedup import ProcessedMessageStore, idempotency_key_for
+from messaging.models import ProcessedMessage
+from shared.database import Base, engine, SessionLocal
+from teams.models import Team
+from teams.models.teams import TeamStatusEnum
+
+CAMPUS = "TEST"
+
+
+def incoming(message_id=None, headers=None, redelivered=False):
+    return SimpleNamespace(message_id=message_id, headers=headers, redelivered=redelivered)
+
+
+def new_store(ttl=60.0, persistent=True, purge_interval=3600.0) -> ProcessedMessageStore:
+    return ProcessedMessageStore(max_size=100, ttl=ttl, persistent=persistent,
+                                 retention=timedelta(hours=1), purge_interval=purge_interval)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    store = new_store()
+    monkeypatch.setattr(crud, "processed_messages", store)
+    monkeypatch.setattr(crud, "run_async_audit", lambda payload: None)
+    return store
+
+
+@pytest.mark.parametrize("message, data, expected", [
+    (incoming("amqp-id", {"x-idempotency-key": "header"}), {"idempotency_key": "body"}, "amqp-id"),
+    (incoming(None, {"x-idempotency-key": b"header"}), {"idempotency_key": "body"}, "header"),
+    (incoming(None, {}), {"idempotency_key": "body"}, "body"),
+    (incoming(None, None), {"team_id": "x"}, None),
+    (incoming(None, None, redelivered=True), {"team_id": "x"}, None),
+], ids=["message_id", "header", "body_field", "no_key", "no_key_redelivered"])
+def test_key_priority(message, data, expected):
+    assert idempotency_key_for(message, data) == expected
+
+
+def test_recent_keys_expire_after_ttl(monkeypatch):
+    store = new_store(ttl=10.0, persistent=False)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    store.remember(["a", None])
+    assert store.seen_recently("a")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert not store.seen_recently("a")
+
+
+def test_table_store_persists_and_purges(store):
+    with SessionLocal() as db:
+        store.persist(db, ["a", "b", None])
+        db.commit()
+        assert store.find_persisted(db, ["a", "c", None]) == {"a"}
+
+        db.get(ProcessedMessage, "b").processed_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        db.commit()
+
+        store._last_purge = 0.0
+        store.persist(db, [])
+        db.commit()
+        assert set(db.scalars(select(ProcessedMessage.idempotency_key))) == {"a"}
+
+
+def test_memory_only_store_skips_the_table(store):
+    memory_only = new_store(persistent=False)
+    with SessionLocal() as db:
+        memory_only.persist(db, ["a"])
+        db.commit()
+        assert memory_only.find_persisted(db, ["a"]) == set()
+        assert db.scalars(select(ProcessedMessage)).first() is None
+
+
+def seed_team() -> uuid.UUID:
+    team_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.add(Team(id=team_id, name="Equipe", abbreviation="EQP", campus_code=CAMPUS, status=TeamStatusEnum.active))
+        db.commit()
+    return team_id
+
+
+def member_message(team_id, request_type):
+    return {"team_id": str(team_id), "campus_code": CAMPUS, "request_type": request_type,
+            "status": "approved", "user_id": "u1"}
+
+
+def test_crud_skips_a_key_already_processed(store):
+    team_id = seed_team()
+
+    first = crud.update_team_from_request_in_db(member_message(team_id, "add_team_member"), "key-1")
+    again = crud.update_team_from_request_in_db(member_message(team_id, "remove_team_member"), "key-1")
+
+    assert first["message"] == "Membro adicionado à equipe."
+    assert again == {"idempotency_key": "key-1", "message": "Mensagem duplicada ignorada."}
+    assert store.seen_recently("key-1")
+
+
+def test_identical_events_without_key_are_all_applied(store):
+    team_id = seed_team()
+    add, remove = member_message(team_id, "add_team_member"), member_message(team_id, "remove_team_member")
+
+    results = [crud.update_team_from_request_in_db(data, None) for data in (add, remove, add)]
+
+    assert [result["message"] for result in results] == [
+        "Membro adicionado à equipe.", "Membro removido da equipe.", "Membro adicionado à equipe."
+    ]
@@ -0,0 +1,64 @@
+"""
+Exportação das equipes (GET /api/v1/teams/export): conteúdo NDJSON e CSV e o
+Content-Disposition montado a partir do campus.
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from tests.conftest import CAMPUS_CODE, seed_teams
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ndjson_lines_match_the_list_items(client):
+    seed_teams(3, members_per_team=2)
+
+    listed = await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE})
+    exported = await client.get("/api/v1/teams/export", params={"campus": CAMPUS_CODE})
+
+    assert exported.status_code == 200
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    assert exported.text.endswith("\n")
+    assert [json.loads(line) for line in exported.text.splitlines()] == listed.json()["items"]
+
+
+async def test_csv_has_header_and_one_row_per_team(client):
+    seeded = seed_teams(2, members_per_team=2)
+
+    response = await client.get("/api/v1/teams/export", params={"campus": CAMPUS_CODE, "format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "name", "abbreviation", "campus_code", "status", "created_at", "members"]
+    assert [(row[0], row[3], row[6]) for row in rows[1:]] == [
+        (str(team_id), CAMPUS_CODE, ";".join(member_ids)) for team_id, member_ids in seeded
+    ]
+
+
+async def test_empty_campus_exports_only_the_csv_header(client):
+    seed_teams(0, members_per_team=0)
+
+    response = await client.get("/api/v1/teams/export", params={"campus": CAMPUS_CODE, "format": "csv"})
+
+    assert response.text == "id,name,abbreviation,campus_code,status,created_at,members\r\n"
+
+
+@pytest.mark.parametrize("campus, expected", [
+    ("TEST", 'attachment; filename="teams-TEST.ndjson"; filename*=UTF-8\'\'teams-TEST.ndjson'),
+    ('A"; x="1\r\nSet-Cookie: a=b', "attachment; filename=\"teams-A___x__1__Set-Cookie__a_b.ndjson\"; "
+                                   "filename*=UTF-8''teams-A%22%3B%20x%3D%221%0D%0ASet-Cookie%3A%20a%3Db.ndjson"),
+    ("NAT-CN São", "attachment; filename=\"teams-NAT-CN_S_o.ndjson\"; "
+                   "filename*=UTF-8''teams-NAT-CN%20S%C3%A3o.ndjson"),
+], ids=["plain", "quote_and_crlf", "non_ascii"])
+async def test_content_disposition_is_sanitized(client, campus, expected):
+    seed_teams(0, members_per_team=0)
+
+    response = await client.get("/api/v1/teams/export", params={"campus": campus})
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == expected
+    assert "set-cookie" not in response.headers
@@ -0,0 +1,89 @@
+"""
+Contadores de uso das conexões do InstrumentedTransport (DownstreamClients.stats):
+requisições, requisições em andamento e conexões TCP abertas.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from services.http_clients import DownstreamClients, InstrumentedTransport
+
+pytestmark = pytest.mark.anyio
+
+SERVICE = "localapi"
+
+
+@pytest.fixture
+async def keepalive_server():
+    """Servidor HTTP/1.1 mínimo com keep-alive; retorna a URL base e quantas conexões aceitou."""
+    accepted = []
+
+    async def handle(reader, writer):
+        accepted.append(writer)
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # O cliente fechou a conexão.
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()
+    yield f"http://{host}:{port}", accepted
+    server.close()
+    await server.wait_closed()
+
+
+async def test_connections_are_reused_between_requests(keepalive_server):
+    base_url, accepted = keepalive_server
+    transport = InstrumentedTransport(SERVICE, httpx.AsyncHTTPTransport())
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url) as client:
+        for _ in range(3):
+            assert (await client.get("/")).text == "ok"
+
+    assert transport.stats() == {"requests": 3, "active": 0, "peak_active": 1, "connections_opened": 1}
+    assert len(accepted) == 1
+
+
+async def test_streamed_response_is_active_until_closed(keepalive_server):
+    base_url, _ = keepalive_server
+    transport = InstrumentedTransport(SERVICE, httpx.AsyncHTTPTransport())
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url) as client:
+        async with client.stream("GET", "/") as first, client.stream("GET", "/") as second:
+            assert transport.stats()["active"] == 2
+            await first.aread()
+            await second.aread()
+
+    assert transport.stats() == {"requests": 2, "active": 0, "peak_active": 2, "connections_opened": 2}
+
+
+async def test_failed_request_is_not_left_active():
+    def refuse(request):
+        raise httpx.ConnectError("recusada", request=request)
+
+    transport = InstrumentedTransport(SERVICE, httpx.MockTransport(refuse))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://localapi/")
+
+    assert transport.stats()["active"] == 0
+    assert transport.stats()["requests"] == 1
+
+
+async def test_downstream_clients_report_their_transports():
+    clients = DownstreamClients()
+    clients.set_transport(SERVICE, httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    await clients.get(SERVICE).get("http://localapi/")
+
+    assert clients.stats()[SERVICE]["requests"] == 1
+    await clients.close()
+    assert clients.stats() == {}
@@ -0,0 +1,45 @@
+import pytest
+
+from messaging.publishers import publisher
+from tests.conftest import build_token, seed_teams
+
+pytestmark = pytest.mark.anyio
+
+
+async def change_members(client, team_id, member_id: str, add: list[str], remove: list[str]):
+    headers = {"Authorization": f"Bearer {build_token(member_id, ['Jogador'])}"}
+    return await client.post(f"/api/v1/teams/{team_id}/members/batch", headers=headers,
+                             json={"add": add, "remove": remove, "reason": "teste"})
+
+
+async def test_unconfirmed_operation_is_not_accepted(client, downstream_stand_ins, monkeypatch):
+    (team_id, member_ids), = seed_teams(1, members_per_team=3)
+
+    async def confirm_removals_only(exchange_name, messages):
+        routing_keys = {routing_key for routing_key, _ in messages}
+        return len(messages) if routing_keys == {"member.removal.requested"} else 0
+
+    monkeypatch.setattr(publisher, "publish_many", confirm_removals_only)
+
+    response = await change_members(client, team_id, member_ids[0], add=["new-1", "new-2"], remove=[member_ids[1]])
+
+    assert response.status_code == 202
+    assert {(result["operation"], result["accepted"]) for result in response.json()["results"]} == {
+        ("add", False), ("remove", True)
+    }
+    assert response.json()["accepted"] == 1
+
+
+async def test_nothing_confirmed_returns_503(client, downstream_stand_ins, monkeypatch):
+    (team_id, member_ids), = seed_teams(1, members_per_team=3)
+
+    async def confirm_nothing(exchange_name, messages):
+        return 0
+
+    monkeypatch.setattr(publisher, "publish_many", confirm_nothing)
+
+    response = await change_members(client, team_id, member_ids[0], add=["new-1"], remove=[member_ids[1]])
+
+    assert response.status_code == 503
+    assert response.json()["accepted"] == 0
+    assert response.json()["rejected"] == 2
@@ -0,0 +1,104 @@
+"""
+Paginação por cursor da listagem de equipes: ordem (created_at, id), desempate pelo id,
+cursores inválidos e limites de `limit`.
+"""
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from shared.database import Base, engine, SessionLocal
+from shared.pagination import encode_cursor
+from teams.models.teams import Team, TeamStatusEnum
+from teams.routers.teams_router import MAX_PAGE_SIZE
+from tests.conftest import CAMPUS_CODE
+
+pytestmark = pytest.mark.anyio
+
+CREATED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def seed_with_timestamps(timestamps: list[datetime]) -> list[uuid.UUID]:
+    """Recria as tabelas com uma equipe por timestamp e retorna os IDs na ordem (created_at, id)."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    teams = [(created_at, uuid.uuid4()) for created_at in timestamps]
+    with SessionLocal() as db:
+        for index, (created_at, team_id) in enumerate(teams):
+            db.add(Team(id=team_id, name=f"Equipe {index}", abbreviation=f"{index:03d}", campus_code=CAMPUS_CODE,
+                        status=TeamStatusEnum.active, created_at=created_at))
+        db.commit()
+
+    return [team_id for _, team_id in sorted(teams, key=lambda team: (team[0], team[1].hex))]
+
+
+async def walk_pages(client, limit: int) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        params = {"campus": CAMPUS_CODE, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+
+        response = await client.get("/api/v1/teams/", params=params)
+        assert response.status_code == 200
+
+        pages.append([item["id"] for item in response.json()["items"]])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+async def test_pages_follow_next_cursor(client):
+    expected = seed_with_timestamps([CREATED_AT + timedelta(minutes=minute) for minute in range(7)])
+
+    pages = await walk_pages(client, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [team_id for page in pages for team_id in page] == [str(team_id) for team_id in expected]
+
+
+async def test_identical_created_at_is_ordered_by_id(client):
+    expected = seed_with_timestamps([CREATED_AT] * 5 + [CREATED_AT + timedelta(seconds=1)])
+
+    pages = await walk_pages(client, limit=2)
+
+    assert [team_id for page in pages for team_id in page] == [str(team_id) for team_id in expected]
+
+
+def encoded(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "não-é-base64!",
+    encoded("não é json"),
+    encoded('{"created_at": "2025-01-01T12:00:00"}'),
+    encoded("[1, 2]"),
+    encoded('["2025-01-01T12:00:00", "não-é-uuid"]'),
+    encoded('["ontem", "8f0b1c52-3b1e-4b8e-9d43-2f1f9e1f0c11"]'),
+    encoded('["2025-01-01T12:00:00", "8f0b1c52-3b1e-4b8e-9d43-2f1f9e1f0c11", "extra"]'),
+    encode_cursor(CREATED_AT, uuid.uuid4())[:-3],
+], ids=["not_base64", "not_json", "object", "wrong_types", "bad_uuid", "bad_date", "extra_field", "truncated"])
+async def test_invalid_cursor_returns_400(client, cursor):
+    seed_with_timestamps([CREATED_AT])
+
+    response = await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE, "cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor inválido"
+
+
+@pytest.mark.parametrize("limit, expected_status", [
+    (0, 422), (1, 200), (MAX_PAGE_SIZE, 200), (MAX_PAGE_SIZE + 1, 422),
+])
+async def test_limit_bounds(client, limit, expected_status):
+    seed_with_timestamps([CREATED_AT, CREATED_AT])
+
+    response = await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE, "limit": limit})
+
+    assert response.status_code == expected_status
+    if expected_status == 200:
+        assert len(response.json()["items"]) == min(limit, 2)
+        assert (response.json()["next_cursor"] is None) == (limit >= 2)
@@ -0,0 +1,75 @@
+"""
+Com SQL_QUERY_BUDGET_MODE=raise (ver conftest), o MetricsMiddleware lança
+QueryBudgetExceeded quando uma rota executa mais consultas que o declarado em
+@query_budget. Cada teste percorre um fluxo feliz da rota.
+"""
+import uuid
+
+import pytest
+
+from shared import metrics
+from shared.metrics import QueryBudgetExceeded
+from teams.routers.teams_router import get_teams_by_campus
+from tests.conftest import CAMPUS_CODE, build_token, seed_teams
+
+pytestmark = pytest.mark.anyio
+
+
+def auth_headers(user_id: str, groups=("Jogador",)) -> dict:
+    return {"Authorization": f"Bearer {build_token(user_id, list(groups))}"}
+
+
+async def test_budget_mode_is_raise():
+    assert metrics.SQL_QUERY_BUDGET_MODE == "raise"
+
+
+async def test_read_routes_stay_within_budget(client):
+    (team_id, member_ids), *_ = seed_teams(5, members_per_team=3)
+    headers = auth_headers(member_ids[0])
+
+    assert (await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE})).status_code == 200
+    assert (await client.get("/api/v1/teams/", headers=headers)).status_code == 200
+    assert (await client.get("/api/v1/teams/export", headers=headers)).status_code == 200
+    assert (await client.get(f"/api/v1/teams/{team_id}", headers=headers)).status_code == 200
+    assert (await client.get(f"/api/v1/teams/{team_id}/members/", headers=headers)).status_code == 200
+
+
+async def test_write_routes_stay_within_budget(client, downstream_stand_ins):
+    seeded = seed_teams(3, members_per_team=3)
+    team_id, member_ids = seeded[0]
+    headers = auth_headers(member_ids[0])
+
+    response = await client.post("/api/v1/teams/", headers=headers, json={
+        "name": "Nova equipe", "abbreviation": "NOV", "competition_id": str(uuid.uuid4()), "members": ["new-1", "new-2"],
+    })
+    assert response.status_code == 202
+
+    response = await client.post("/api/v1/teams/bulk", headers=headers, json=[
+        {"name": f"Lote {i}", "abbreviation": f"L{i:02d}", "competition_id": str(uuid.uuid4()), "members": [f"bulk-{i}"]}
+        for i in range(3)
+    ])
+    assert response.status_code == 202
+
+    response = await client.post(f"/api/v1/teams/{team_id}/members/", headers=headers, json={"user_id": "added-1"})
+    assert response.status_code == 202
+
+    response = await client.request("DELETE", f"/api/v1/teams/{team_id}/members/{member_ids[1]}", headers=headers,
+                                    json={"reason": "teste"})
+    assert response.status_code == 200
+
+    response = await client.post(f"/api/v1/teams/{team_id}/members/batch", headers=headers,
+                                 json={"add": ["added-2", "added-3"], "remove": [member_ids[2]], "reason": "teste"})
+    assert response.status_code == 202
+
+    other_team_id, other_member_ids = seeded[1]
+    response = await client.request("DELETE", f"/api/v1/teams/{other_team_id}",
+                                    headers=auth_headers(other_member_ids[0]), json={"reason": "teste"})
+    assert response.status_code == 202
+
+
+async def test_route_over_budget_raises(client, monkeypatch):
+    seed_teams(3, members_per_team=3)
+    monkeypatch.setattr(get_teams_by_campus, "__query_budget__", 1)
+
+    with pytest.raises(QueryBudgetExceeded):
+        await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE})
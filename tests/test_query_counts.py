@@ -0,0 +1,64 @@
+"""
+As rotas de leitura carregam os membros de todas as equipes numa consulta só
+(services/team_reads.load_member_ids): o número de instruções não pode crescer com a
+quantidade de equipes nem de membros.
+"""
+import pytest
+
+from services.team_cache import team_cache
+from tests.conftest import CAMPUS_CODE, build_token, seed_teams
+
+SIZES = (3, 60)
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_query_count_is_constant(client, sql_statements):
+    counts = {}
+    for size in SIZES:
+        seed_teams(size, members_per_team=size)
+        sql_statements.clear()
+
+        response = await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE, "limit": 100})
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == size
+        counts[size] = len(sql_statements)
+
+    assert counts == {size: 2 for size in SIZES}
+
+
+async def test_detail_query_count_is_constant(client, sql_statements):
+    counts = {}
+    for size in SIZES:
+        seeded = seed_teams(size, members_per_team=size)
+        team_id, member_ids = seeded[-1]
+        headers = {"Authorization": f"Bearer {build_token(member_ids[0], ['Jogador'])}"}
+        team_cache.clear()
+        sql_statements.clear()
+
+        response = await client.get(f"/api/v1/teams/{team_id}", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json()["members"]) == size
+        counts[size] = len(sql_statements)
+
+    assert counts == {size: 2 for size in SIZES}
+
+
+async def test_members_query_count_is_constant(client, sql_statements):
+    counts = {}
+    for size in SIZES:
+        seeded = seed_teams(size, members_per_team=size)
+        team_id, member_ids = seeded[-1]
+        headers = {"Authorization": f"Bearer {build_token(member_ids[0], ['Jogador'])}"}
+        team_cache.clear()
+        sql_statements.clear()
+
+        response = await client.get(f"/api/v1/teams/{team_id}/members/", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        counts[size] = len(sql_statements)
+
+    assert counts == {size: 2 for size in SIZES}
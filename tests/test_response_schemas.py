@@ -0,0 +1,51 @@
+"""
+As rotas de leitura renderizam os dicionários de services/team_reads direto pelo
+ORJSONResponse, sem a validação do response_model: estes testes garantem que o JSON
+devolvido continua exatamente no formato dos schemas documentados no OpenAPI.
+"""
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from teams.schemas.team_members import TeamRosterMemberResponse
+from teams.schemas.teams import TeamListResponse, TeamResponse
+from tests.conftest import CAMPUS_CODE, build_token, seed_teams
+
+pytestmark = pytest.mark.anyio
+
+
+def assert_matches_schema(model, payload):
+    adapter = TypeAdapter(model)
+    assert adapter.dump_python(adapter.validate_python(payload), mode="json") == payload
+
+
+async def test_list_matches_team_list_response(client):
+    seed_teams(3, members_per_team=2)
+
+    response = await client.get("/api/v1/teams/", params={"campus": CAMPUS_CODE, "limit": 2})
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is not None
+    assert_matches_schema(TeamListResponse, response.json())
+
+
+async def test_detail_matches_team_response(client):
+    team_id, member_ids = seed_teams(1, members_per_team=2)[0]
+    headers = {"Authorization": f"Bearer {build_token(member_ids[0], ['Jogador'])}"}
+
+    response = await client.get(f"/api/v1/teams/{team_id}", headers=headers)
+
+    assert response.status_code == 200
+    assert_matches_schema(TeamResponse, response.json())
+
+
+async def test_members_match_team_roster_member_response(client):
+    team_id, member_ids = seed_teams(1, members_per_team=2)[0]
+    headers = {"Authorization": f"Bearer {build_token(member_ids[0], ['Jogador'])}"}
+
+    response = await client.get(f"/api/v1/teams/{team_id}/members/", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert_matches_schema(List[TeamRosterMemberResponse], response.json())